@@ -25,3 +25,73 @@ export function getMatchReport(resumeFile, jobId) {
     },
   })
 }
+
+function buildStreamUrl(path, params) {
+  const base = import.meta.env.VITE_API_BASE_URL || '/'
+  const url = new URL(path.replace(/^\//, ''), new URL(base.endsWith('/') ? base : `${base}/`, window.location.origin))
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      url.searchParams.set(key, value)
+    }
+  })
+  return url.toString()
+}
+
+function openEventStream(path, params, handlers) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(buildStreamUrl(path, params))
+    let settled = false
+    const finish = (callback, value) => {
+      if (settled) return
+      settled = true
+      source.close()
+      callback(value)
+    }
+
+    Object.entries(handlers).forEach(([event, handler]) => {
+      source.addEventListener(event, (evt) => handler(JSON.parse(evt.data)))
+    })
+    source.addEventListener('done', (evt) => finish(resolve, JSON.parse(evt.data)))
+    source.addEventListener('error', (evt) => {
+      let message = 'STREAM_FAILED'
+      if (evt.data) {
+        try {
+          message = JSON.parse(evt.data).detail || message
+        } catch {
+          // 连接层错误没有数据体
+        }
+      }
+      finish(reject, { message })
+    })
+  })
+}
+
+export function streamRecommendations(resumeFile, topK, { onRecommendations, onToken } = {}) {
+  if (!resumeFile) {
+    return Promise.reject(new Error('MISSING_RESUME_FILE'))
+  }
+
+  return openEventStream(
+    '/match/auto/stream',
+    { resume_file: resumeFile, top_k: topK },
+    {
+      recommendations: (data) => onRecommendations?.(data),
+      token: (data) => onToken?.(data.delta),
+    }
+  )
+}
+
+export function streamMatchReport(resumeFile, jobId, { onMatch, onToken } = {}) {
+  if (!resumeFile || !jobId) {
+    return Promise.reject(new Error('MISSING_REPORT_PARAMS'))
+  }
+
+  return openEventStream(
+    '/match/single/stream',
+    { resume_file: resumeFile, job_id: jobId },
+    {
+      match: (data) => onMatch?.(data),
+      token: (data) => onToken?.(data.delta),
+    }
+  )
+}
@@ -1,6 +1,6 @@
 import { defineStore } from 'pinia'
 import { uploadResume } from '@/api/upload'
-import { getMatchReport, getRecommendations } from '@/api/match'
+import { streamMatchReport, streamRecommendations } from '@/api/match'
 
 export const useResumeStore = defineStore('resume', {
   state: () => ({
@@ -63,10 +63,18 @@ export const useResumeStore = defineStore('resume', {
       this.loading.recommendations = true
       this.clearError()
       try {
-        const { data } = await getRecommendations(this.resumeFile, topK)
-        this.recommendations = data.recommendations || []
-        this.recommendationSummary = data.summary || ''
-        return data
+        this.recommendationSummary = ''
+        const done = await streamRecommendations(this.resumeFile, topK, {
+          onRecommendations: (data) => {
+            this.recommendations = data.recommendations || []
+            this.loading.recommendations = false
+          },
+          onToken: (delta) => {
+            this.recommendationSummary += delta
+          },
+        })
+        this.recommendationSummary = done.summary || ''
+        return { recommendations: this.recommendations, summary: this.recommendationSummary }
       } catch (error) {
         this.recommendations = []
         this.recommendationSummary = ''
@@ -76,7 +84,7 @@ export const useResumeStore = defineStore('resume', {
         this.loading.recommendations = false
       }
     },
-    async fetchReport(jobId) {
+    async fetchReport(jobId, onUpdate) {
       if (!this.resumeFile) {
         const error = new Error('RESUME_NOT_AVAILABLE')
         this.error = error
@@ -93,7 +101,19 @@ export const useResumeStore = defineStore('resume', {
       this.loading.report = true
       this.clearError()
       try {
-        const { data } = await getMatchReport(this.resumeFile, jobId)
+        let partial = null
+        const data = await streamMatchReport(this.resumeFile, jobId, {
+          onMatch: (match) => {
+            partial = { ...match, analysis: '' }
+            this.loading.report = false
+            onUpdate?.({ ...partial })
+          },
+          onToken: (delta) => {
+            if (!partial) return
+            partial.analysis += delta
+            onUpdate?.({ ...partial })
+          },
+        })
         this.reportCache.set(jobId, data)
         return data
       } catch (error) {
@@ -0,0 +1,55 @@
+"""检索接口共用的岗位过滤参数，以及 Chroma 过滤前的知识库字段检查。"""
+
+import logging
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import Query
+
+from app.services.job_filters import JobFilter, date_to_ts
+from app.services.langchain_clients import knowledge_base_version
+from app.services.registry import registry
+
+
+logger = logging.getLogger(__name__)
+
+FILTER_FIELDS_MISSING = "知识库缺少地点/截止时间过滤所需的元数据（loc_<城市>、deadline_ts），请重新运行 scripts/ETL.py 重建知识库"
+_FIELDS_CHECK_KEY = "filter_fields_check"
+
+
+def job_filter_params(
+    location: Optional[list[str]] = Query(None, description="工作地点，可重复传入或用顿号/逗号分隔，满足任一即可"),
+    industry: Optional[list[str]] = Query(None, description="行业大类，可重复传入"),
+    batch: Optional[list[str]] = Query(None, description="招聘批次，可重复传入"),
+    deadline_after: Optional[date] = Query(None, description="截止时间不早于该日期（YYYY-MM-DD）"),
+    deadline_before: Optional[date] = Query(None, description="截止时间不晚于该日期（YYYY-MM-DD）"),
+) -> JobFilter:
+    """把查询参数转换为 `JobFilter`，由检索层下推为 Chroma `where` 子句或内存索引掩码。"""
+
+    return JobFilter(
+        locations=location or [],
+        industries=industry or [],
+        batches=batch or [],
+        deadline_from=date_to_ts(deadline_after) if deadline_after else None,
+        deadline_to=date_to_ts(deadline_before) if deadline_before else None,
+    )
+
+
+def require_filter_fields(collection: Any, job_filter: Optional[JobFilter]) -> None:
+    """Chroma 按地点/截止时间过滤前，确认知识库由写入规范化字段的 ETL 构建（阻塞调用）。
+
+    旧知识库上的 `where` 查询不会报错，只会静默返回 0 条；每个知识库版本只抽查一条记录，
+    缺失时记录警告并抛出 RuntimeError，调用方按检索失败返回并提示重新运行 ETL。
+    """
+    if job_filter is None or not job_filter.uses_normalized_fields:
+        return
+    version = knowledge_base_version()
+    checked: Optional[tuple[str, bool]] = registry.get(_FIELDS_CHECK_KEY)
+    if checked is None or checked[0] != version:
+        metadatas = collection.get(limit=1, include=["metadatas"]).get("metadatas") or []
+        ready = not metadatas or "deadline_ts" in (metadatas[0] or {})
+        if not ready:
+            logger.warning(FILTER_FIELDS_MISSING)
+        checked = registry.replace(_FIELDS_CHECK_KEY, (version, ready))
+    if not checked[1]:
+        raise RuntimeError(FILTER_FIELDS_MISSING)
@@ -1,7 +1,15 @@
 from fastapi import APIRouter
 
 from app.services.embedding_utils import get_embedding_cache_stats
+from app.services.embedding_store import get_embedding_store_stats
+from app.services.registry import registry
+from app.services.job_index import get_job_index_stats
+from app.services.keyword_index import get_keyword_index_stats
+from app.services.resume_jobs import get_resume_job_stats
+from app.services.resume_store import get_resume_store_stats
 from app.api.routes_match import get_match_cache_stats
+from app.services.semantic_cache import get_semantic_cache_stats
+from app.services.report_generator import get_report_stats
 
 router = APIRouter()
 
@@ -15,5 +23,20 @@ async def cache_diagnostics():
     """返回服务端缓存命中情况，便于观察策略效果。"""
     return {
         "embedding": get_embedding_cache_stats(),
+        "embedding_store": get_embedding_store_stats(),
+        "resume_store": get_resume_store_stats(),
         "match": get_match_cache_stats(),
+        "semantic": get_semantic_cache_stats(),
+        "reports": get_report_stats(),
+    }
+
+
+@router.get("/diagnostics/pools")
+async def pool_diagnostics():
+    """返回进程级共享客户端、连接池、内存索引与后台简历任务状态。"""
+    return {
+        **registry.stats(),
+        "job_index": get_job_index_stats(),
+        "keyword_index": get_keyword_index_stats(),
+        "resume_jobs": get_resume_job_stats(),
     }
@@ -1,61 +1,241 @@
-"""知识库检索接口，提供岗位查询与列表功能。"""
+"""知识库检索接口，提供岗位查询、分页列表与流式导出功能。"""
 
-from fastapi import APIRouter, Query, HTTPException
+import base64
+import json
+from typing import Iterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.core.config import settings
 from app.services import get_vector_store
+from app.services.job_filters import JobFilter
+from app.services.keyword_index import get_keyword_index
+from app.services.langchain_clients import knowledge_base_version
+from app.api.filters import job_filter_params, require_filter_fields
 
 router = APIRouter(prefix="/kb", tags=["Knowledge base"])
 
+# 倒数排名融合（RRF）常数：越大则名次靠后的结果权重衰减越慢
+RRF_K = 60
+
+
+def _job_record(meta: dict, document: str, score: Optional[float] = None) -> dict:
+    record = {
+        "job_id": meta.get("job_id"),
+        "company": meta.get("company"),
+        "title": meta.get("title"),
+        "location": meta.get("location"),
+        "deadline": meta.get("deadline"),
+        "batch": meta.get("batch"),
+        "industry": meta.get("industry"),
+        "document": document,
+    }
+    if score is not None:
+        record["score"] = round(score, 6)
+    return record
+
+
+def _vector_ranking(q: str, k: int, job_filter: JobFilter) -> list[tuple[dict, str]]:
+    """向量检索，返回按相似度排序的 (元数据, 分块文本)；过滤条件作为 Chroma `where` 下推。"""
+    vector_store = get_vector_store()
+    try:
+        require_filter_fields(vector_store._collection, job_filter)  # type: ignore[attr-defined]
+        docs = vector_store.similarity_search(q, k=k, filter=job_filter.to_where())
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=502, detail=f"向量检索失败: {exc}") from exc
+
+    return [(item.metadata or {}, item.page_content) for item in docs]
+
+
+def _keyword_ranking(q: str, k: int, job_filter: JobFilter) -> list[tuple[dict, str, float]]:
+    """本地 BM25 检索，返回 (元数据, 岗位文本, 分数)。"""
+    try:
+        index = get_keyword_index()
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=502, detail=f"关键词索引加载失败: {exc}") from exc
+    return [(index.metadatas[row], index.documents[row], score) for row, score in index.search(q, k, job_filter)]
+
+
 @router.get("/query")
-def query_jobs(q: str = Query(..., description="搜索关键词"), top_k: int = 5):
+def query_jobs(
+    q: str = Query(..., description="搜索关键词"),
+    top_k: int = 5,
+    mode: Literal["vector", "keyword", "hybrid"] = Query("vector", description="检索方式：vector / keyword / hybrid"),
+    job_filter: JobFilter = Depends(job_filter_params),
+):
     """按照关键词检索岗位信息。
 
     Args:
         q (str): 搜索关键词。
         top_k (int): 返回的岗位数量。
+        mode (str): ``vector`` 为语义检索（需调用 Embedding 接口）；``keyword`` 仅查本地 BM25 倒排索引；
+            ``hybrid`` 对两路结果做倒数排名融合（RRF）。
+        job_filter (JobFilter): 地点 / 行业 / 批次 / 截止时间过滤条件，在检索阶段下推。
 
     Returns:
-        dict: 包含检索关键词与命中结果。
+        dict: 包含检索关键词与命中结果（keyword / hybrid 模式附带 ``score``）。
     """
 
-    vector_store = get_vector_store()
+    if mode == "vector":
+        output = [_job_record(meta, document) for meta, document in _vector_ranking(q, top_k, job_filter)]
+        return {"query": q, "mode": mode, "results": output}
+
+    if mode == "keyword":
+        output = [_job_record(meta, document, score) for meta, document, score in _keyword_ranking(q, top_k, job_filter)]
+        return {"query": q, "mode": mode, "results": output}
+
+    # 两路各多取一些候选再融合，避免只在单路出现的岗位被截断
+    candidates = max(top_k * 4, 20)
+    fused: dict[str, list] = {}
+    for rank, (meta, document, _) in enumerate(_keyword_ranking(q, candidates, job_filter)):
+        fused[meta.get("job_id")] = [meta, document, 1.0 / (RRF_K + rank + 1)]
+    vector_jobs: list[tuple[dict, str]] = []
+    seen: set = set()
+    for meta, document in _vector_ranking(q, candidates, job_filter):
+        # 同一岗位的多个分块只按最靠前的一个计名次
+        if meta.get("job_id") not in seen:
+            seen.add(meta.get("job_id"))
+            vector_jobs.append((meta, document))
+    for rank, (meta, document) in enumerate(vector_jobs):
+        entry = fused.setdefault(meta.get("job_id"), [meta, document, 0.0])
+        entry[2] += 1.0 / (RRF_K + rank + 1)
+
+    ranked = sorted(fused.values(), key=lambda entry: entry[2], reverse=True)[:top_k]
+    output = [_job_record(meta, document, score) for meta, document, score in ranked]
+    return {"query": q, "mode": mode, "results": output}
+
+
+def _collection_include(include_documents: bool, include_embeddings: bool) -> list[str]:
+    include = ["metadatas"]
+    if include_documents:
+        include.append("documents")
+    if include_embeddings:
+        include.append("embeddings")
+    return include
+
+
+def _encode_cursor(offset: int, version: str) -> str:
+    payload = json.dumps({"offset": offset, "version": version}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str]:
     try:
-        docs = vector_store.similarity_search(q, k=top_k)
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=502, detail=f"向量检索失败: {exc}") from exc
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return int(payload["offset"]), str(payload["version"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="无效的分页游标") from exc
+
+
+def _read_page(offset: int, limit: int, include: list[str], where: Optional[dict]) -> list[dict]:
+    """按偏移读取一页记录，整理为 {id, meta[, document][, embedding]}。"""
+    collection = get_vector_store()._collection  # type: ignore[attr-defined]
+    page = collection.get(limit=limit, offset=offset, include=include, where=where)
+    ids = page.get("ids") or []
+    metadatas = page.get("metadatas") or [None] * len(ids)
+    documents = page.get("documents")
+    embeddings = page.get("embeddings")
 
-    output = []
-    for item in docs:
-        meta = item.metadata or {}
-        output.append({
-            "job_id": meta.get("job_id"),
-            "company": meta.get("company"),
-            "title": meta.get("title"),
-            "location": meta.get("location"),
-            "deadline": meta.get("deadline"),
-            "batch": meta.get("batch"),
-            "industry": meta.get("industry"),
-            "document": item.page_content,
-        })
+    records = []
+    for position, record_id in enumerate(ids):
+        record = {"id": record_id, "meta": metadatas[position] or {}}
+        if documents is not None:
+            record["document"] = documents[position]
+        if embeddings is not None:
+            record["embedding"] = [float(value) for value in embeddings[position]]
+        records.append(record)
+    return records
 
-    return {"query": q, "results": output}
+
+def _ndjson_line(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
 
 
 @router.get("/list")
-def list_jobs(limit: int = 10):
-    """列出向量库中的岗位元数据。
+def list_jobs(
+    limit: int = Query(10, ge=1, le=settings.kb_page_max_size, description="每页记录数"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor；为空时从头开始"),
+    include_documents: bool = Query(False, description="是否返回分块文本"),
+    include_embeddings: bool = Query(False, description="是否返回向量"),
+    job_filter: JobFilter = Depends(job_filter_params),
+):
+    """分页列出向量库中的记录。
 
     Args:
-        limit (int): 返回记录数量上限。
+        limit (int): 每页记录数。
+        cursor (str | None): 分页游标，内含偏移量与知识库版本；知识库重建后旧游标失效。
+        include_documents (bool): 是否附带分块文本。
+        include_embeddings (bool): 是否附带向量。
+        job_filter (JobFilter): 地点 / 行业 / 批次 / 截止时间过滤条件。
 
     Returns:
-        list: 岗位 ID 与元数据列表。
+        dict: 当前页记录 ``items`` 与下一页游标 ``next_cursor``（最后一页为 None）。
     """
 
-    vector_store = get_vector_store()
+    version = knowledge_base_version()
+    offset = 0
+    if cursor:
+        offset, cursor_version = _decode_cursor(cursor)
+        if cursor_version != version:
+            raise HTTPException(status_code=400, detail="知识库已更新，分页游标失效，请从第一页重新开始")
+
     try:
-        data = vector_store._collection.peek(limit=limit)  # type: ignore[attr-defined]
+        require_filter_fields(get_vector_store()._collection, job_filter)  # type: ignore[attr-defined]
+        # 多取一条用于判断是否还有下一页
+        items = _read_page(
+            offset, limit + 1, _collection_include(include_documents, include_embeddings), job_filter.to_where()
+        )
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=502, detail=f"无法读取向量库: {exc}") from exc
-    return [{"id": i, "meta": m} for i, m in zip(data["ids"], data["metadatas"])]
+
+    has_more = len(items) > limit
+    return {
+        "items": items[:limit],
+        "next_cursor": _encode_cursor(offset + limit, version) if has_more else None,
+    }
+
+
+@router.get("/export")
+def export_jobs(
+    batch_size: int = Query(500, ge=1, le=settings.kb_page_max_size, description="每批读取的记录数"),
+    include_documents: bool = Query(True, description="是否导出分块文本"),
+    include_embeddings: bool = Query(False, description="是否导出向量"),
+    job_filter: JobFilter = Depends(job_filter_params),
+):
+    """以 NDJSON 流式导出全部记录，每行一条；按批读取，内存占用与集合大小无关。
+
+    导出过程中知识库被重建时，输出一行 ``{"error": ...}`` 后结束。
+    """
+
+    version = knowledge_base_version()
+    include = _collection_include(include_documents, include_embeddings)
+    where = job_filter.to_where()
+
+    def _ndjson() -> Iterator[bytes]:
+        offset = 0
+        while True:
+            if knowledge_base_version() != version:
+                yield _ndjson_line({"error": "导出期间知识库已更新，请重新导出"})
+                return
+            try:
+                if offset == 0:
+                    require_filter_fields(get_vector_store()._collection, job_filter)  # type: ignore[attr-defined]
+                records = _read_page(offset, batch_size, include, where)
+            except Exception as exc:  # noqa: BLE001
+                yield _ndjson_line({"error": f"无法读取向量库: {exc}"})
+                return
+            if not records:
+                return
+            yield b"".join(_ndjson_line(record) for record in records)
+            offset += len(records)
+            if len(records) < batch_size:
+                return
+
+    return StreamingResponse(
+        _ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="jobs.ndjson"'},
+    )
+
@@ -1,32 +1,50 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import numpy as np
 import json
-from hashlib import md5
-from typing import Any
+import logging
+import math
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 from app.services import (
     load_resume_json,
-    get_embedding,
+    aget_embedding,
+    get_embeddings,
     get_vector_store,
-    compute_similarity,
+    run_in_chroma_executor,
 )
 from app.core.config import settings
-from openai import OpenAI
 from app.services.report_generator import generate_report
-from app.utils.retry import run_with_retry
+from app.services.resume_loader import load_resume_embedding, save_resume_embedding
+from app.services.similarity import cosine_scores
+from app.services.registry import registry
+from app.services.job_filters import JobFilter
+from app.services.job_index import get_job_index, pool_chunk_scores
+from app.services.embedding_store import text_digest
+from app.services.langchain_clients import knowledge_base_version
+from app.services.semantic_cache import get_semantic_cache
+from app.utils.retry import arun_with_retry
 from app.utils.cache import TTLCache
+from app.utils.zipstream import ZipStreamWriter
+from app.api.filters import job_filter_params, require_filter_fields
 
 
-
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/match", tags=["匹配"])
 
-llm_client = OpenAI(
-    api_key=settings.dashscope_api_key,
-    base_url=settings.dashscope_base_url,
+_summary_cache = TTLCache(
+    ttl_seconds=settings.cache_ttl,
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    sweep_interval=settings.cache_sweep_interval,
 )
 
-_summary_cache = TTLCache(ttl_seconds=settings.cache_ttl)
-
 
 def _clean_value(value: Any) -> str | None:
     if value is None:
@@ -82,47 +100,207 @@ def _extract_resume_sections(resume_data: dict) -> tuple[str, list[str], list[st
     return " ".join(text_parts), skills, exp_desc
 
 
+def _get_collection():
+    """获取岗位向量集合（阻塞调用，需在 Chroma 线程池中执行）。"""
+    return get_vector_store()._collection  # type: ignore[attr-defined]
 
-@router.get("/auto")
-def auto_match_jobs(
-    resume_file: str = Query(..., description="简历 JSON 文件名，如 resume_张三.json"),
-    top_k: int = 5
-):
-    """自动匹配推荐岗位"""
-    resume_data = load_resume_json(resume_file)
-    resume_text, _, _ = _extract_resume_sections(resume_data)
 
-    resume_embedding = get_embedding(resume_text)
-    vector_store = get_vector_store()
-    collection = vector_store._collection  # type: ignore[attr-defined]
+def _query_collection_many(
+    query_embeddings: list[list[float]],
+    n_results: int,
+    job_filter: Optional[JobFilter] = None,
+) -> dict:
+    """按配置选择内存索引或 Chroma 检索，两者返回结构一致；多条查询一次完成。
 
-    try:
-        query_results = collection.query(
-            query_embeddings=[resume_embedding],
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"],
-        )
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=502, detail=f"向量检索失败: {exc}") from exc
+    过滤条件在检索阶段下推：内存索引使用预计算掩码，Chroma 使用 `where` 子句。
+    """
+    include = ["documents", "metadatas", "distances"]
+    index = get_job_index()
+    if index is not None:
+        return index.query(query_embeddings=query_embeddings, n_results=n_results, include=include, job_filter=job_filter)
+    collection = _get_collection()
+    require_filter_fields(collection, job_filter)
+    where = job_filter.to_where() if job_filter is not None else None
+    return collection.query(
+        query_embeddings=query_embeddings,
+        n_results=n_results,
+        include=include,
+        where=where,
+    )
+
+
+class _ChunksPerJobEstimate:
+    """每个岗位平均命中的分块数（滑动估计），决定首轮检索多取多少分块。
+
+    按（过滤条件, top_k）分别估计，互不干扰；检索在 Chroma 线程池中并发执行，读写都持锁。
+    实例绑定知识库版本，版本变化后由 `_chunks_per_job_estimate` 换成初始值的新实例。
+    """
+
+    _MAX_KEYS = 64
+
+    def __init__(self, version: str) -> None:
+        self.version = version
+        self._initial = max(settings.match_overfetch_factor, 1.0)
+        self._values: OrderedDict[tuple, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> float:
+        with self._lock:
+            return self._values.get(key, self._initial)
+
+    def update(self, key: tuple, chunks: int, jobs: int) -> None:
+        with self._lock:
+            current = self._values.pop(key, self._initial)
+            self._values[key] = min(max(0.8 * current + 0.2 * chunks / jobs, 1.0), 50.0)
+            while len(self._values) > self._MAX_KEYS:
+                self._values.popitem(last=False)
 
-    documents = query_results.get("documents", [[]])[0]
-    metadatas = query_results.get("metadatas", [[]])[0]
-    distances = query_results.get("distances", [[]])[0]
+
+_ESTIMATE_KEY = "match_chunks_per_job"
+
+
+def _chunks_per_job_estimate() -> _ChunksPerJobEstimate:
+    version = knowledge_base_version()
+    current: Optional[_ChunksPerJobEstimate] = registry.get(_ESTIMATE_KEY)
+    if current is not None and current.version == version:
+        return current
+    return registry.replace(_ESTIMATE_KEY, _ChunksPerJobEstimate(version))
+
+
+def _estimate_key(top_k: int, job_filter: Optional[JobFilter]) -> tuple:
+    if job_filter is None or job_filter.is_empty:
+        return ("", top_k)
+    return (json.dumps(job_filter.to_where(), ensure_ascii=False, sort_keys=True), top_k)
+
+
+def _rank_jobs(query_results: dict, row: int, top_k: int) -> tuple[list[dict], int]:
+    """把第 `row` 条查询的分块结果按岗位聚合，返回 (前 top_k 个岗位的推荐, 去重后的岗位数)。"""
+    chunk_ids = (query_results.get("ids") or [[]])[row]
+    documents = (query_results.get("documents") or [[]])[row]
+    metadatas = (query_results.get("metadatas") or [[]])[row]
+    distances = (query_results.get("distances") or [[]])[row]
+    if not chunk_ids:
+        return [], 0
+
+    job_keys = [(meta or {}).get("job_id") or chunk_id.rsplit("-", 1)[0] for chunk_id, meta in zip(chunk_ids, metadatas)]
+    similarities = 1.0 - np.asarray(distances, dtype=np.float64)
+    _, pooled, best = pool_chunk_scores(
+        job_keys, similarities, settings.match_chunk_pool, settings.match_pool_temperature
+    )
+    order = np.argsort(-pooled, kind="stable")[:top_k]
 
     results = []
-    for doc, meta, distance in zip(documents, metadatas, distances):
-        similarity = 1 - float(distance)
+    for position in order:
+        chunk = int(best[position])
+        meta = metadatas[chunk] or {}
         results.append({
-            "score": round(similarity, 4),
-            "job_id": meta.get("job_id"),
+            "score": round(float(pooled[position]), 4),
+            "job_id": meta.get("job_id") or job_keys[chunk],
             "title": meta.get("title"),
             "company": meta.get("company"),
             "location": meta.get("location"),
             "deadline": meta.get("deadline"),
-            "snippet": doc[:150],
+            "snippet": (documents[chunk] or "")[:150],
         })
+    return results, len(pooled)
+
+
+def _query_jobs_many(
+    query_embeddings: list[list[float]],
+    top_k: int,
+    job_filter: Optional[JobFilter] = None,
+) -> list[list[dict]]:
+    """检索并按岗位去重，每条查询返回 top_k 个不同岗位（候选不足时返回全部）。
+
+    首轮按估计的分块/岗位比多取分块；去重后仍不足且集合可能还有更多分块的查询才会重新检索，
+    每轮取数翻四倍，最多 `MATCH_OVERFETCH_MAX_ROUNDS` 轮。
+    """
+    estimate = _chunks_per_job_estimate()
+    estimate_key = _estimate_key(top_k, job_filter)
+    rankings: list[list[dict]] = [[] for _ in query_embeddings]
+    pending = list(range(len(query_embeddings)))
+    n_results = max(top_k, math.ceil(top_k * estimate.get(estimate_key)))
+    fetched_chunks = fetched_jobs = 0
+
+    for _ in range(max(settings.match_overfetch_max_rounds, 1)):
+        query_results = _query_collection_many([query_embeddings[i] for i in pending], n_results, job_filter)
+        retry: list[int] = []
+        for row, query_index in enumerate(pending):
+            rankings[query_index], job_count = _rank_jobs(query_results, row, top_k)
+            chunk_count = len((query_results.get("ids") or [[]])[row])
+            fetched_chunks += chunk_count
+            fetched_jobs += job_count
+            # 返回的分块数小于请求数说明集合（或过滤后的候选）已取尽，再查也不会有新岗位
+            if job_count < top_k and chunk_count >= n_results:
+                retry.append(query_index)
+        if not retry:
+            break
+        pending = retry
+        n_results *= 4
+
+    if fetched_jobs:
+        estimate.update(estimate_key, fetched_chunks, fetched_jobs)
+    return rankings
+
+
+def _query_jobs(query_embedding: list[float], top_k: int, job_filter: Optional[JobFilter] = None) -> list[dict]:
+    return _query_jobs_many([query_embedding], top_k, job_filter)[0]
+
+
+def _get_job_chunks(job_id: str) -> tuple[dict, bool]:
+    """读取岗位全部分块，返回 (分块数据, 向量是否已归一化)；内存索引可用时直接取其中已归一化的行。"""
+    index = get_job_index()
+    if index is not None:
+        return index.get_job(job_id), True
+    job_docs = _get_collection().get(
+        where={"job_id": job_id},
+        include=["documents", "metadatas", "embeddings"],
+    )
+    return job_docs, False
+
+
+async def _load_resume(resume_file: str) -> tuple[dict, str, list[str]]:
+    """异步读取简历并提取匹配文本。"""
+    resume_data = await asyncio.to_thread(load_resume_json, resume_file)
+    resume_text, skills, _ = _extract_resume_sections(resume_data)
+    return resume_data, resume_text, skills
+
+
+def _stored_resume_embeddings(resume_files: list[str], texts: list[str]) -> list[Optional[list[float]]]:
+    return [load_resume_embedding(resume_file, text) for resume_file, text in zip(resume_files, texts)]
+
+
+def _store_resume_embeddings(items: list[tuple[str, str, list[float]]]) -> None:
+    for resume_file, text, embedding in items:
+        try:
+            save_resume_embedding(resume_file, text, embedding)
+        except OSError:
+            pass  # 仅影响后续复用，不影响本次结果
+
+
+async def _embed_resume(resume_file: str) -> tuple[dict, str, list[str], list[float]]:
+    """读取简历并取得 embedding（优先复用随简历保存的向量），可与岗位数据加载并发执行。"""
+    resume_data, resume_text, skills = await _load_resume(resume_file)
+    resume_embedding = await asyncio.to_thread(load_resume_embedding, resume_file, resume_text)
+    if resume_embedding is None:
+        resume_embedding = await aget_embedding(resume_text)
+        await asyncio.to_thread(_store_resume_embeddings, [(resume_file, resume_text, resume_embedding)])
+    return resume_data, resume_text, skills, resume_embedding
+
+
+async def _fetch_job_chunks(job_id: str) -> tuple[dict, bool]:
+    try:
+        return await run_in_chroma_executor(_get_job_chunks, job_id)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=502, detail=f"岗位信息加载失败: {exc}") from exc
+
 
-    summary_prompt = f"""
+def _resume_name(resume_data: dict) -> str:
+    return resume_data.get("basic_info", {}).get("name", "未知候选人")
+
+
+def _build_summary_prompt(resume_text: str, top_k: int, results: list[dict]) -> str:
+    return f"""
 请总结以下岗位推荐结果，为候选人提供简短的匹配建议。
 
 候选人简历技能：
@@ -132,63 +310,429 @@ def auto_match_jobs(
 {json.dumps(results, ensure_ascii=False, indent=2)}
 """
 
-    cache_key = md5(summary_prompt.encode("utf-8")).hexdigest()
-    summary = _summary_cache.get(cache_key)
-    if summary is None:
+
+# 提示词模板版本：修改 `_build_summary_prompt` 或单岗位分析提示词时递增，使旧缓存失效
+SUMMARY_PROMPT_VERSION = 1
+ANALYSIS_PROMPT_VERSION = 1
+
+
+def _completion_cache_key(
+    kind: str,
+    prompt_version: int,
+    model: str,
+    resume_text: str,
+    job_ids: list[str],
+) -> tuple:
+    """LLM 结果缓存键：(类型, 模板版本, 模型, 简历内容摘要, 有序岗位 ID, 知识库版本)。
+
+    不直接哈希提示词，分数小数位、片段截断等细微变化不会造成未命中；
+    知识库重建后版本变化，旧结果自然失效。
+    """
+    return (
+        kind,
+        prompt_version,
+        model,
+        text_digest(resume_text),
+        tuple(dict.fromkeys(job_ids)),
+        knowledge_base_version(),
+    )
+
+
+def _summary_cache_key(resume_text: str, results: list[dict]) -> tuple:
+    return _completion_cache_key(
+        "summary",
+        SUMMARY_PROMPT_VERSION,
+        settings.dashscope_model,
+        resume_text,
+        [str(item.get("job_id")) for item in results],
+    )
+
+
+async def _request_completion(prompt: str, model: str, temperature: float, error_detail: str) -> str:
+    try:
+        llm_response = await arun_with_retry(
+            registry.async_openai_client().chat.completions.create,
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+        )
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=502, detail=f"{error_detail}: {exc}") from exc
+    return llm_response.choices[0].message.content.strip()
+
+
+async def _cached_completion(
+    cache_key: tuple,
+    prompt: str,
+    model: str,
+    temperature: float,
+    error_detail: str,
+    fallback: Optional[Callable[[], Optional[str]]] = None,
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> str:
+    """调用 LLM 生成完整文本（带缓存），相同键的并发请求只调用一次。
+
+    精确缓存未命中时先尝试 `fallback`（如语义缓存），仍未命中才调用 LLM，
+    生成结果交给 `on_complete` 登记。
+    """
+
+    async def _compute() -> str:
+        reused = fallback() if fallback is not None else None
+        if reused is not None:
+            return reused
+        text = await _request_completion(prompt, model, temperature, error_detail)
+        if on_complete is not None:
+            on_complete(text)
+        return text
+
+    return await _summary_cache.aget_or_compute(cache_key, _compute)
+
+
+async def _stream_completion(
+    cache_key: tuple,
+    prompt: str,
+    model: str,
+    temperature: float,
+    error_detail: str,
+    fallback: Optional[Callable[[], Optional[str]]] = None,
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator[str]:
+    """逐段产出 LLM 文本；命中缓存时一次性回放，生成完毕后把全文写入缓存。
+
+    相同键已有生成在进行时（流式或非流式）不再重复调用，等待其完成后一次性回放全文。
+    `fallback` / `on_complete` 与 `_cached_completion` 含义相同。
+    """
+    while True:
+        cached = _summary_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        future, leader = _summary_cache.claim_flight(cache_key)
+        if leader:
+            break
+        text = await _summary_cache.wait_flight(future)
+        if text is not None:
+            yield text
+            return
+
+    reused = fallback() if fallback is not None else None
+    if reused is not None:
+        _summary_cache.finish_flight(cache_key, future, value=reused)
+        yield reused
+        return
+
+    parts: list[str] = []
+    try:
         try:
-            llm_response = run_with_retry(
-                llm_client.chat.completions.create,
-                model=settings.dashscope_model,
-                messages=[{"role": "user", "content": summary_prompt}],
-                temperature=0.4,
+            stream = await arun_with_retry(
+                registry.async_openai_client().chat.completions.create,
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                stream=True,
             )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    parts.append(delta)
+                    yield delta
         except Exception as exc:  # noqa: BLE001
-            raise HTTPException(status_code=502, detail=f"生成推荐摘要失败: {exc}") from exc
-        summary = llm_response.choices[0].message.content.strip()
-        _summary_cache.set(cache_key, summary)
+            raise HTTPException(status_code=502, detail=f"{error_detail}: {exc}") from exc
+    except BaseException as exc:
+        # 客户端断开时生成器收到 GeneratorExit：视为取消，让等待方重新发起
+        error = asyncio.CancelledError() if isinstance(exc, GeneratorExit) else exc
+        _summary_cache.finish_flight(cache_key, future, error=error)
+        raise
+    text = "".join(parts).strip()
+    _summary_cache.finish_flight(cache_key, future, value=text)
+    if on_complete is not None:
+        on_complete(text)
+
+
+async def _summarize_recommendations(resume_text: str, top_k: int, results: list[dict]) -> str:
+    """生成推荐摘要（带缓存）。"""
+    prompt = _build_summary_prompt(resume_text, top_k, results)
+    return await _cached_completion(
+        _summary_cache_key(resume_text, results), prompt, settings.dashscope_model, 0.4, "生成推荐摘要失败"
+    )
+
+
+def _sse_event(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _sse_response(events: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_error_event(exc: Exception, fallback: str) -> bytes:
+    """把异常转为 SSE `error` 事件：HTTPException 直接使用其 detail，其余异常记录日志后以 `fallback` 说明。"""
+    if isinstance(exc, HTTPException):
+        return _sse_event("error", {"detail": exc.detail})
+    logger.exception("SSE 流中断：%s", fallback)
+    return _sse_event("error", {"detail": f"{fallback}: {exc}"})
+
+
+async def _stream_text_events(
+    tokens: AsyncIterator[str],
+    done: Callable[[str], Awaitable[Any]],
+) -> AsyncIterator[bytes]:
+    """把 LLM 文本流转为 SSE：逐段 `token` 事件，结束时 `done` 事件携带 `done(全文)` 的结果。"""
+    parts: list[str] = []
+    try:
+        async for delta in tokens:
+            parts.append(delta)
+            yield _sse_event("token", {"delta": delta})
+        yield _sse_event("done", await done("".join(parts).strip()))
+    except Exception as exc:  # noqa: BLE001
+        # 上游流中途抛出的任何异常（APIError、超时、RetryError 等）都以 error 事件收尾，避免前端一直等待
+        yield _sse_error_event(exc, "生成失败")
+
+
+@router.get("/auto")
+async def auto_match_jobs(
+    resume_file: str = Query(..., description="简历 JSON 文件名，如 resume_张三.json"),
+    top_k: int = 5,
+    job_filter: JobFilter = Depends(job_filter_params),
+):
+    """自动匹配推荐岗位"""
+    resume_data, resume_text, _, resume_embedding = await _embed_resume(resume_file)
+
+    try:
+        results = await run_in_chroma_executor(_query_jobs, resume_embedding, top_k, job_filter)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=502, detail=f"向量检索失败: {exc}") from exc
+
+    summary = await _summarize_recommendations(resume_text, top_k, results)
 
     return {
-        "resume_name": resume_data.get("basic_info", {}).get("name", "未知候选人"),
+        "resume_name": _resume_name(resume_data),
         "recommendations": results,
         "summary": summary
     }
 
 
-@router.get("/single")
-def match_single_job(
-    resume_file: str = Query(..., description="简历 JSON 文件名"),
-    job_id: str = Query(..., description="目标岗位 ID")
+@router.get("/auto/stream")
+async def auto_match_jobs_stream(
+    resume_file: str = Query(..., description="简历 JSON 文件名，如 resume_张三.json"),
+    top_k: int = 5,
+    job_filter: JobFilter = Depends(job_filter_params),
 ):
-    """对单个岗位进行详细匹配分析"""
+    """自动匹配推荐岗位（SSE）：先推送推荐列表，再逐段推送摘要。
 
-    resume_data = load_resume_json(resume_file)
-    resume_text, cleaned_skills, _ = _extract_resume_sections(resume_data)
+    简历读取与检索也在流内进行，失败时以 `error` 事件返回（EventSource 读不到普通 JSON 错误响应）。
+    """
 
-    vector_store = get_vector_store()
-    collection = vector_store._collection  # type: ignore[attr-defined]
-    try:
-        job_docs = collection.get(
-            where={"job_id": job_id},
-            include=["documents", "metadatas", "embeddings"],
+    async def _done(summary: str) -> dict:
+        return {"summary": summary}
+
+    async def _events() -> AsyncIterator[bytes]:
+        try:
+            resume_data, resume_text, _, resume_embedding = await _embed_resume(resume_file)
+            try:
+                results = await run_in_chroma_executor(_query_jobs, resume_embedding, top_k, job_filter)
+            except Exception as exc:  # noqa: BLE001
+                raise HTTPException(status_code=502, detail=f"向量检索失败: {exc}") from exc
+        except Exception as exc:  # noqa: BLE001
+            yield _sse_error_event(exc, "推荐失败")
+            return
+
+        prompt = _build_summary_prompt(resume_text, top_k, results)
+        tokens = _stream_completion(
+            _summary_cache_key(resume_text, results), prompt, settings.dashscope_model, 0.4, "生成推荐摘要失败"
         )
+        yield _sse_event(
+            "recommendations",
+            {"resume_name": _resume_name(resume_data), "recommendations": results},
+        )
+        async for event in _stream_text_events(tokens, _done):
+            yield event
+
+    return _sse_response(_events())
+
+
+class BatchMatchRequest(BaseModel):
+    """批量匹配请求体。"""
+
+    resume_files: list[str] = Field(..., min_length=1, description="简历 JSON 文件名列表")
+    top_k: int = Field(default=5, ge=1, description="每份简历返回的岗位数量")
+    with_summary: bool = Field(default=False, description="是否为每份简历生成 LLM 摘要（默认关闭）")
+    stream: bool = Field(default=False, description="是否以 NDJSON 流式逐条返回")
+
+
+async def _load_resume_safely(resume_file: str) -> tuple[dict, str] | str:
+    """读取简历并提取匹配文本；失败时返回错误说明而不是抛出异常。"""
+    try:
+        resume_data, resume_text, _ = await _load_resume(resume_file)
+    except HTTPException as exc:
+        return str(exc.detail)
+    return resume_data, resume_text
+
+
+async def _iter_batch_results(payload: BatchMatchRequest) -> AsyncIterator[dict]:
+    """批量匹配主流程：并发读取简历 → 批量向量化 → 一次矩阵检索 → 可选摘要。"""
+    resume_files = list(dict.fromkeys(payload.resume_files))
+    loaded = await asyncio.gather(*(_load_resume_safely(name) for name in resume_files))
+
+    valid: list[tuple[str, dict, str]] = []
+    for resume_file, item in zip(resume_files, loaded):
+        if isinstance(item, str):
+            yield {"resume_file": resume_file, "error": item}
+        else:
+            valid.append((resume_file, item[0], item[1]))
+    if not valid:
+        return
+
+    files = [resume_file for resume_file, _, _ in valid]
+    texts = [resume_text for _, _, resume_text in valid]
+    try:
+        # 已保存过向量的简历直接复用；其余由 embed_documents 合并成尽量少的批次，并读穿持久化存储
+        embeddings = await asyncio.to_thread(_stored_resume_embeddings, files, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = await asyncio.to_thread(get_embeddings().embed_documents, [texts[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+            await asyncio.to_thread(
+                _store_resume_embeddings, [(files[i], texts[i], embeddings[i]) for i in missing]
+            )
+        rankings = await run_in_chroma_executor(_query_jobs_many, embeddings, payload.top_k)
     except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=502, detail=f"岗位信息加载失败: {exc}") from exc
+        raise HTTPException(status_code=502, detail=f"批量检索失败: {exc}") from exc
+
+    entries = [
+        {
+            "resume_file": resume_file,
+            "resume_name": _resume_name(resume_data),
+            "recommendations": rankings[row],
+        }
+        for row, (resume_file, resume_data, _) in enumerate(valid)
+    ]
+    if not payload.with_summary:
+        for entry in entries:
+            yield entry
+        return
+
+    semaphore = asyncio.Semaphore(settings.batch_summary_concurrency)
+
+    async def _with_summary(entry: dict, resume_text: str) -> dict:
+        async with semaphore:
+            try:
+                entry["summary"] = await _summarize_recommendations(
+                    resume_text, payload.top_k, entry["recommendations"]
+                )
+            except HTTPException as exc:
+                entry["summary_error"] = str(exc.detail)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("批量匹配摘要生成失败: %s", entry["resume_file"])
+                entry["summary_error"] = str(exc)
+        return entry
+
+    tasks = [_with_summary(entry, resume_text) for entry, (_, _, resume_text) in zip(entries, valid)]
+    for finished in asyncio.as_completed(tasks):
+        yield await finished
+
+
+@router.post("/batch")
+async def batch_match_jobs(payload: BatchMatchRequest):
+    """批量匹配：多份简历一次向量化、一次检索，默认不调用 LLM。"""
+    if len(payload.resume_files) > settings.batch_match_max_resumes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多匹配 {settings.batch_match_max_resumes} 份简历",
+        )
+
+    if payload.stream:
+        async def _ndjson() -> AsyncIterator[bytes]:
+            try:
+                async for entry in _iter_batch_results(payload):
+                    yield (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+            except HTTPException as exc:
+                yield (json.dumps({"error": exc.detail}, ensure_ascii=False) + "\n").encode("utf-8")
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("批量匹配流中断")
+                yield (json.dumps({"error": f"批量匹配失败: {exc}"}, ensure_ascii=False) + "\n").encode("utf-8")
+
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+    results = [entry async for entry in _iter_batch_results(payload)]
+    order = {name: position for position, name in enumerate(payload.resume_files)}
+    results.sort(key=lambda entry: order.get(entry["resume_file"], 0))
+    return {"top_k": payload.top_k, "results": results}
+
+
+ANALYSIS_MODEL = "qwen2.5-7b-instruct"
+
+
+@dataclass
+class _SingleMatch:
+    """单岗位匹配的中间结果（LLM 分析之前的部分）。"""
+
+    resume_data: dict
+    resume_text: str
+    job_id: str
+    cleaned_skills: list[str]
+    score: float
+    job_meta: dict
+    prompt: str
+    resume_embedding: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def cache_key(self) -> tuple:
+        return _completion_cache_key(
+            "analysis", ANALYSIS_PROMPT_VERSION, ANALYSIS_MODEL, self.resume_text, [self.job_id]
+        )
+
+    def semantic_hooks(self) -> dict[str, Callable]:
+        """语义缓存开启时返回 `fallback` / `on_complete`：相似简历复用同一岗位的分析。"""
+        cache = get_semantic_cache()
+        if cache is None or not self.resume_embedding:
+            return {}
+        key = (ANALYSIS_PROMPT_VERSION, ANALYSIS_MODEL, self.job_id, knowledge_base_version())
+
+        def _fallback() -> Optional[str]:
+            hit = cache.lookup(key, self.resume_embedding)
+            return hit[0] if hit is not None else None
+
+        def _on_complete(analysis: str) -> None:
+            cache.add(key, self.resume_embedding, analysis)
+
+        return {"fallback": _fallback, "on_complete": _on_complete}
+
+    def overview(self) -> dict:
+        return {
+            "resume_name": _resume_name(self.resume_data),
+            "job_title": self.job_meta.get("title"),
+            "company": self.job_meta.get("company"),
+            "location": self.job_meta.get("location"),
+            "similarity_score": round(self.score, 4),
+        }
+
+
+async def _prepare_single_match(resume_file: str, job_id: str) -> _SingleMatch:
+    # 简历读取+向量化 与 岗位数据加载互不依赖，并发执行
+    (resume_data, resume_text, cleaned_skills, resume_embedding), (job_docs, normalized) = await asyncio.gather(
+        _embed_resume(resume_file),
+        _fetch_job_chunks(job_id),
+    )
 
     if not job_docs or len(job_docs.get("documents", [])) == 0:
         raise HTTPException(status_code=404, detail="岗位未找到")
 
-    resume_embedding = get_embedding(resume_text)
     embeddings = job_docs.get("embeddings", [])
     if embeddings is None or len(embeddings) == 0:
         raise HTTPException(status_code=404, detail="岗位缺少向量信息")
 
-    # 选取与简历最匹配的chunk作为分析依据
-    scores = [
-        compute_similarity(resume_embedding, chunk_emb)
-        for chunk_emb in embeddings
-    ]
+    # 选取与简历最匹配的chunk作为分析依据（一次矩阵-向量乘法为全部分块打分）
+    scores = cosine_scores(resume_embedding, embeddings, normalized=normalized)
     best_index = int(np.argmax(scores))
-    score = scores[best_index]
+    score = float(scores[best_index])
 
     jd_text = job_docs["documents"][best_index]
     job_meta = job_docs["metadatas"][best_index]
@@ -208,49 +752,160 @@ def match_single_job(
         "3. 缺失技能",
         "4. 提升建议",
     ]
-    prompt = "\n".join(prompt_lines)
-    analysis_cache_key = md5(prompt.encode("utf-8")).hexdigest()
-    analysis = _summary_cache.get(analysis_cache_key)
-    if analysis is None:
-        try:
-            llm_response = run_with_retry(
-                llm_client.chat.completions.create,
-                model="qwen2.5-7b-instruct",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-            )
-        except Exception as exc:  # noqa: BLE001
-            raise HTTPException(status_code=502, detail=f"生成匹配分析失败: {exc}") from exc
-        analysis = llm_response.choices[0].message.content.strip()
-        _summary_cache.set(analysis_cache_key, analysis)
-
-    # Step 5: 生成报告文件
+    return _SingleMatch(
+        resume_data=resume_data,
+        resume_text=resume_text,
+        job_id=job_id,
+        cleaned_skills=cleaned_skills,
+        score=score,
+        job_meta=job_meta,
+        prompt="\n".join(prompt_lines),
+        resume_embedding=resume_embedding,
+    )
+
+
+async def _finish_single_match(match: _SingleMatch, analysis: str) -> dict:
+    """根据分析结果生成报告文件，返回接口响应。"""
     report_data = {
-        "resume_name": resume_data.get("basic_info", {}).get("name", "未知候选人"),
-        "job_title": job_meta.get("title"),
-        "company": job_meta.get("company"),
-        "location": job_meta.get("location"),
-        "similarity_score": round(score, 4),
+        **match.overview(),
         "analysis": analysis,
-        "matched_skills": cleaned_skills,
+        "matched_skills": match.cleaned_skills,
         "missing_skills": [],  # TODO: 可后续通过关键词比对生成
         "recommendations": "根据分析结果，建议进一步强化岗位相关技能。"
     }
 
-    report_path = generate_report(report_data)
-
+    report_path = await asyncio.to_thread(generate_report, report_data)
 
     return {
-        "resume_name": report_data["resume_name"],
-        "job_title": report_data["job_title"],
-        "company": report_data["company"],
-        "location": report_data["location"],
-        "similarity_score": report_data["similarity_score"],
+        **match.overview(),
         "analysis": report_data["analysis"],
         "report_path": report_path
     }
 
 
+async def _run_single_match(resume_file: str, job_id: str) -> dict:
+    """单岗位完整流程：检索 → LLM 分析（缓存） → 生成报告。"""
+    match = await _prepare_single_match(resume_file, job_id)
+    analysis = await _cached_completion(
+        match.cache_key, match.prompt, ANALYSIS_MODEL, 0.3, "生成匹配分析失败", **match.semantic_hooks()
+    )
+    return await _finish_single_match(match, analysis)
+
+
+@router.get("/single")
+async def match_single_job(
+    resume_file: str = Query(..., description="简历 JSON 文件名"),
+    job_id: str = Query(..., description="目标岗位 ID")
+):
+    """对单个岗位进行详细匹配分析"""
+
+    return await _run_single_match(resume_file, job_id)
+
+
+@router.get("/single/stream")
+async def match_single_job_stream(
+    resume_file: str = Query(..., description="简历 JSON 文件名"),
+    job_id: str = Query(..., description="目标岗位 ID")
+):
+    """单岗位匹配分析（SSE）：先推送岗位与相似度，再逐段推送分析，最后返回报告路径。
+
+    岗位/简历校验失败（如“岗位未找到”）同样以 `error` 事件返回。
+    """
+
+    async def _events() -> AsyncIterator[bytes]:
+        try:
+            match = await _prepare_single_match(resume_file, job_id)
+        except Exception as exc:  # noqa: BLE001
+            yield _sse_error_event(exc, "匹配失败")
+            return
+
+        tokens = _stream_completion(
+            match.cache_key, match.prompt, ANALYSIS_MODEL, 0.3, "生成匹配分析失败", **match.semantic_hooks()
+        )
+        yield _sse_event("match", match.overview())
+        async for event in _stream_text_events(tokens, lambda analysis: _finish_single_match(match, analysis)):
+            yield event
+
+    return _sse_response(_events())
+
+
+class BulkReportRequest(BaseModel):
+    resume_file: str = Field(..., description="简历 JSON 文件名")
+    job_ids: list[str] = Field(..., min_length=1, description="目标岗位 ID 列表（重复项只生成一次）")
+
+
+async def _bulk_report_entry(resume_file: str, job_id: str, semaphore: asyncio.Semaphore) -> dict:
+    """生成单个岗位报告并读出文件内容；失败只记录在清单中，不影响其余岗位。"""
+    async with semaphore:
+        try:
+            result = await _run_single_match(resume_file, job_id)
+            content = await asyncio.to_thread(Path(result["report_path"]).read_bytes)
+        except HTTPException as exc:
+            return {"job_id": job_id, "status": "error", "error": str(exc.detail)}
+        except Exception as exc:  # noqa: BLE001
+            return {"job_id": job_id, "status": "error", "error": str(exc)}
+    return {
+        "job_id": job_id,
+        "status": "ok",
+        "file": Path(result["report_path"]).name,
+        "job_title": result.get("job_title"),
+        "company": result.get("company"),
+        "similarity_score": result.get("similarity_score"),
+        "content": content,
+    }
+
+
+@router.post("/reports")
+async def bulk_match_reports(payload: BulkReportRequest):
+    """为一份简历批量生成岗位报告，以 ZIP 流式返回：每完成一份即写出，最后附 manifest.json。"""
+    job_ids = list(dict.fromkeys(payload.job_ids))
+    if len(job_ids) > settings.bulk_report_max_jobs:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多生成 {settings.bulk_report_max_jobs} 份报告",
+        )
+    # 简历不存在时直接返回 404，而不是生成一个只有错误清单的压缩包
+    resume_data, _, _ = await _load_resume(payload.resume_file)
+    semaphore = asyncio.Semaphore(settings.bulk_report_concurrency)
+
+    async def _archive() -> AsyncIterator[bytes]:
+        writer = ZipStreamWriter()
+        manifest: list[dict] = []
+        tasks = [
+            asyncio.create_task(_bulk_report_entry(payload.resume_file, job_id, semaphore))
+            for job_id in job_ids
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                entry = await finished
+                content = entry.pop("content", None)
+                if content is not None:
+                    yield writer.add(entry["file"], content)
+                manifest.append(entry)
+        finally:
+            # 客户端中途断开时取消尚未完成的分析
+            for task in tasks:
+                task.cancel()
+
+        order = {job_id: position for position, job_id in enumerate(job_ids)}
+        manifest.sort(key=lambda entry: order[entry["job_id"]])
+        summary = {
+            "resume_file": payload.resume_file,
+            "resume_name": _resume_name(resume_data),
+            "succeeded": sum(1 for entry in manifest if entry["status"] == "ok"),
+            "failed": sum(1 for entry in manifest if entry["status"] != "ok"),
+            "reports": manifest,
+        }
+        yield writer.add("manifest.json", json.dumps(summary, ensure_ascii=False, indent=2))
+        yield writer.close()
+
+    return StreamingResponse(
+        _archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="match_reports.zip"'},
+    )
+
+
 def get_match_cache_stats() -> dict[str, Any]:
     """返回岗位匹配相关缓存统计。"""
     return _summary_cache.stats()
@@ -1,48 +1,87 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import asyncio
+import uuid
 from pathlib import Path
-import shutil
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.services import parse_resume
-from app.services.resume_extractor import extract_resume_info, save_resume_json
+from app.services.resume_jobs import (
+    ResumeParseError,
+    ResumeQueueFull,
+    get_resume_job_queue,
+    process_resume_file,
+    reuse_stored_resume,
+)
+from app.services.resume_store import copy_and_hash, get_resume_store
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
 
 UPLOAD_DIR = Path(settings.uploads_directory)
 
+
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    file: UploadFile = File(...),
+    background: bool = Query(False, description="为 true 时仅保存文件并返回任务 ID，解析与抽取在后台执行"),
+):
     # 上传文件并返回解析后的结果
-    ext = file.filename.split(".")[-1].lower()
+    filename = Path(file.filename or "").name
+    ext = filename.split(".")[-1].lower()
     if ext not in settings.allowed_file_types:
         raise HTTPException(
             status_code=400,
             detail=f"不支持的文件类型，仅支持 {', '.join(settings.allowed_file_types)}"
         )
-    
-    # 保存文件
-    file_path = UPLOAD_DIR / file.filename
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    try:
-        # 解析文件内容
-        content = parse_resume(str(file_path))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"解析文件失败: {e}")
-    finally:
-        # 清理临时文件
-        file_path.unlink(missing_ok=True)
 
-    # 调用LLM进行信息抽取
-    extracted_data = extract_resume_info(content)
+    # 保存文件（临时文件名带随机前缀，避免同名并发上传互相覆盖）
+    file_path = UPLOAD_DIR / f"{uuid.uuid4().hex}_{filename}"
+    json_path = (UPLOAD_DIR / filename).with_suffix(".json")
+    digest = await asyncio.to_thread(copy_and_hash, file.file, file_path)
 
-    # 保存 JSON
-    json_path = file_path.with_suffix(".json")
-    save_resume_json(extracted_data, str(json_path))
+    # 相同内容已处理过：直接复用抽取结果，不再解析与调用 LLM
+    store = get_resume_store()
+    text, stored_data = await asyncio.to_thread(store.lookup, digest) if store else (None, None)
+    if stored_data is not None:
+        resume_data = await reuse_stored_resume(file_path, json_path, stored_data)
+        if background:
+            job = get_resume_job_queue().record_completed(filename, json_path, resume_data)
+            return {**job.as_dict(), "status_url": f"/resume/jobs/{job.job_id}"}
+        return {
+            "filename": filename,
+            "json_file": str(json_path),
+            "resume_data": resume_data,
+            "deduplicated": True,
+        }
+
+    if background:
+        try:
+            job = get_resume_job_queue().submit(filename, file_path, json_path, digest=digest, text=text)
+        except ResumeQueueFull as e:
+            file_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content={**job.as_dict(), "status_url": f"/resume/jobs/{job.job_id}"},
+        )
+
+    try:
+        # 解析 → LLM 抽取 → 保存 JSON
+        extracted_data = await process_resume_file(file_path, json_path, digest=digest, text=text)
+    except ResumeParseError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     return {
-        "filename": file.filename,
+        "filename": filename,
         "json_file": str(json_path),
-        "resume_data": extracted_data
+        "resume_data": extracted_data,
+        "deduplicated": False,
     }
-        
+
+
+@router.get("/jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    # 查询后台简历任务的阶段与结果
+    job = get_resume_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job.as_dict()
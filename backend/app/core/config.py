@@ -19,6 +19,12 @@ class Settings(BaseSettings):
         default="text-embedding-v4",
         description="嵌入模型名称",
     )
+    embedding_batch_size: int = Field(
+        default=0,
+        description="单次 Embedding 请求的文本条数，0 表示按模型上限自动选择",
+    )
+    embedding_max_concurrency: int = Field(default=4, description="并发中的 Embedding 批次上限")
+    embedding_max_retries: int = Field(default=5, description="单个 Embedding 批次的最大尝试次数")
     dashscope_base_url: Optional[str] = Field(
         default="https://dashscope.aliyuncs.com/compatible-mode/v1",
         description="API基础URL"
@@ -35,6 +41,13 @@ class Settings(BaseSettings):
         default=Path("./data/chroma"),
         description="清洗或嵌入后的数据存储目录"
     )
+    etl_chunk_rows: int = Field(
+        default=5000,
+        description="ETL 按块读取原始数据的行数，读取与文档构建阶段的内存占用与之成正比（0 表示一次读入）",
+    )
+    etl_queue_size: int = Field(default=4, description="ETL 流水线各阶段之间队列可容纳的批次数")
+    etl_embed_workers: int = Field(default=2, description="ETL 流水线中同时向量化的批次数")
+    etl_progress_interval: float = Field(default=10.0, description="ETL 流水线输出吞吐与队列深度的间隔秒数（0 关闭）")
 
     # 文件存储配置
     reports_directory: Path = Field(default=Path("./data/reports"),description="html报告")
@@ -44,16 +57,83 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=8000)
     workers: int = Field(default=1)
+    chroma_executor_workers: int = Field(
+        default=8,
+        description="Chroma 阻塞调用专用线程池大小，限制并发访问向量库的线程数",
+    )
+    resume_job_workers: int = Field(default=2, description="后台简历任务并发数（解析 → 抽取 → 保存）")
+    resume_job_queue_size: int = Field(default=100, description="排队中的后台简历任务上限，超出时返回 503")
+    resume_job_retention: int = Field(default=3600, description="已完成的后台任务状态保留秒数")
+    resume_parse_processes: int = Field(
+        default=1,
+        description="简历解析（pdfminer 等 CPU 密集操作）专用进程数，0 表示改用线程",
+    )
     
     # 业务配置
     max_file_size: int = Field(default=10 * 1024 * 1024)  # 10MB
     allowed_file_types: List[str] = Field(default_factory=lambda: ["pdf", "docx", "txt"])
     max_recommendations: int = Field(default=10)
     similarity_threshold: float = Field(default=0.6)
+    batch_match_max_resumes: int = Field(default=200, description="/match/batch 单次最多处理的简历数")
+    batch_summary_concurrency: int = Field(default=4, description="/match/batch 生成摘要时的 LLM 并发数")
+    bulk_report_max_jobs: int = Field(default=50, description="/match/reports 单次最多生成的报告数")
+    bulk_report_concurrency: int = Field(default=4, description="/match/reports 同时进行的岗位分析数")
+    kb_page_max_size: int = Field(default=1000, description="/kb/list 单页与 /kb/export 单批的最大记录数")
+    match_index_backend: str = Field(
+        default="chroma",
+        description="岗位检索后端：chroma（向量库查询）、memory（进程内 NumPy 索引）或 quantized（mmap 量化向量）",
+    )
+    match_quantized_dtype: str = Field(
+        default="int8",
+        description="量化向量导出类型：int8（每行一个缩放系数，体积为 float32 的 1/4）或 float16",
+    )
+    match_quantized_rescore: int = Field(
+        default=4,
+        description="quantized 后端取 top_k 的多少倍候选用 float32 副本精排（0 关闭，导出时也不写 float32 副本）",
+    )
+    match_ann_index: str = Field(
+        default="none",
+        description="memory / quantized 后端的近似检索结构：none（精确检索）或 ivf（k-means 倒排列表，由 ETL 构建）",
+    )
+    match_ivf_lists: int = Field(default=0, description="IVF 簇数，0 表示按分块数自动选择（约 4·√n）")
+    match_ivf_nprobe: int = Field(default=8, description="IVF 每次查询扫描的簇数，越大召回越高、越慢")
+    match_ivf_train_sample: int = Field(default=50000, description="训练 IVF 质心的抽样分块数，0 表示使用全部分块")
+    match_ivf_iterations: int = Field(default=20, description="训练 IVF 质心的 k-means 最大迭代次数")
+    match_chunk_pool: str = Field(
+        default="max",
+        description="同一岗位多个分块的得分聚合方式：max（取最高分）或 softmax（按 softmax 权重加权平均）",
+    )
+    match_pool_temperature: float = Field(default=0.05, description="softmax 聚合的温度，越小越接近 max")
+    match_overfetch_factor: float = Field(default=2.0, description="首轮检索按 top_k 的多少倍取分块（之后按实际分块/岗位比自适应）")
+    match_overfetch_max_rounds: int = Field(default=3, description="去重后岗位不足 top_k 时最多检索的轮数")
     
     # 缓存配置
     enable_cache: bool = Field(default=True)
     cache_ttl: int = Field(default=3600)
+    cache_max_entries: int = Field(default=2048, description="单个进程内缓存的最大条目数，超出按 LRU 淘汰（0 不限）")
+    cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="单个进程内缓存的近似内存上限（字节），超出按 LRU 淘汰（0 不限）",
+    )
+    cache_sweep_interval: int = Field(default=60, description="后台清理过期缓存条目的间隔秒数（0 关闭）")
+    semantic_cache_enabled: bool = Field(
+        default=False,
+        description="是否启用单岗位分析的语义缓存（相似简历复用同一岗位的分析结果）",
+    )
+    semantic_cache_threshold: float = Field(default=0.97, description="语义缓存命中所需的简历向量余弦相似度")
+    semantic_cache_near_margin: float = Field(default=0.02, description="低于阈值该范围内计为接近命中，用于调参")
+    semantic_cache_max_entries_per_job: int = Field(default=256, description="每个岗位最多缓存的分析条数")
+    semantic_cache_max_jobs: int = Field(default=2048, description="语义缓存最多保留的岗位数，超出后淘汰最久未用的岗位")
+    embedding_store_enabled: bool = Field(default=True, description="是否启用持久化 embedding 存储")
+    embedding_store_path: Path = Field(
+        default=Path("./data/cache/embeddings.sqlite3"),
+        description="持久化 embedding 存储（SQLite），API 与 ETL 共享",
+    )
+    resume_store_enabled: bool = Field(default=True, description="是否按文件内容 sha256 复用已解析/抽取的简历")
+    resume_store_directory: Path = Field(
+        default=Path("./data/cache/resumes"),
+        description="简历内容寻址存储目录，每个文件摘要对应一份解析文本与抽取结果",
+    )
     
     model_config = {
         "env_file": ".env",
@@ -67,6 +147,38 @@ class Settings(BaseSettings):
             return [item.strip() for item in v.split(",") if item.strip()]
         return v
     
+    @field_validator("match_index_backend")
+    def check_match_index_backend(cls, v):
+        allowed = {"chroma", "memory", "quantized"}
+        value = (v or "").strip().lower()
+        if value not in allowed:
+            raise ValueError(f"MATCH_INDEX_BACKEND 仅支持 {', '.join(sorted(allowed))}")
+        return value
+
+    @field_validator("match_quantized_dtype")
+    def check_match_quantized_dtype(cls, v):
+        allowed = {"int8", "float16"}
+        value = (v or "").strip().lower()
+        if value not in allowed:
+            raise ValueError(f"MATCH_QUANTIZED_DTYPE 仅支持 {', '.join(sorted(allowed))}")
+        return value
+
+    @field_validator("match_ann_index")
+    def check_match_ann_index(cls, v):
+        allowed = {"none", "ivf"}
+        value = (v or "").strip().lower()
+        if value not in allowed:
+            raise ValueError(f"MATCH_ANN_INDEX 仅支持 {', '.join(sorted(allowed))}")
+        return value
+
+    @field_validator("match_chunk_pool")
+    def check_match_chunk_pool(cls, v):
+        allowed = {"max", "softmax"}
+        value = (v or "").strip().lower()
+        if value not in allowed:
+            raise ValueError(f"MATCH_CHUNK_POOL 仅支持 {', '.join(sorted(allowed))}")
+        return value
+
     @field_validator("dashscope_api_key")
     def check_api_key(cls, v):
         if not v or v.strip() == "":
@@ -89,6 +201,8 @@ class Settings(BaseSettings):
             self.db_path,
             self.reports_directory,
             self.uploads_directory,
+            Path(self.embedding_store_path).parent,
+            self.resume_store_directory,
         ]:
             Path(directory).mkdir(parents=True, exist_ok=True)
     
@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from app.api import router
@@ -6,12 +7,22 @@ from app.api import router_kb
 from app.api import routes_resume
 from app.api import routes_match
 from app.core.config import settings
+from app.services import get_vector_store, registry
 from fastapi.middleware.cors import CORSMiddleware
 
 
 logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
 
-app = FastAPI(title="职位Agent系统")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # 进程级共享客户端与向量库在启动时创建一次，关闭时统一释放连接池
+    registry.startup(warmups=(get_vector_store,))
+    yield
+    await registry.aclose()
+
+
+app = FastAPI(title="职位Agent系统", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
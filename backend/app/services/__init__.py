@@ -2,10 +2,11 @@
 
 from .resume_parser import parse_resume
 from .resume_extractor import extract_resume_info, save_resume_json
-from .embedding_utils import get_embedding, compute_similarity
+from .embedding_utils import get_embedding, aget_embedding, compute_similarity
 from .resume_loader import load_resume_json
 from .report_generator import generate_report
-from .langchain_clients import DashscopeEmbeddings, get_vector_store
+from .langchain_clients import DashscopeEmbeddings, get_embeddings, get_vector_store, run_in_chroma_executor
+from .registry import registry
 
 
 
@@ -15,9 +16,13 @@ __all__ = [
     "extract_resume_info",
     "save_resume_json",
     "get_embedding",
+    "aget_embedding",
     "compute_similarity",
     "load_resume_json",
     "generate_report",
     "DashscopeEmbeddings",
+    "get_embeddings",
     "get_vector_store",
+    "run_in_chroma_executor",
+    "registry",
 ]
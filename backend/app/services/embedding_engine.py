@@ -0,0 +1,183 @@
+"""
+embedding_engine.py
+批量 Embedding 引擎：并发发送批次、按模型上限切分、遇到限流自动降速，
+结果顺序与输入一致，并统计吞吐、批次数与重试次数。
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Sequence
+
+from openai import APIConnectionError, APITimeoutError, OpenAI, RateLimitError
+
+from app.core.config import settings
+from app.utils.throttle import AdaptiveConcurrencyLimiter
+
+
+logger = logging.getLogger(__name__)
+
+# DashScope 兼容接口单次请求允许的最大文本条数
+PROVIDER_BATCH_LIMITS = {
+    "text-embedding-v1": 25,
+    "text-embedding-v2": 25,
+    "text-embedding-v3": 10,
+    "text-embedding-v4": 10,
+}
+DEFAULT_BATCH_LIMIT = 10
+
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+
+def resolve_batch_size(model: str, requested: int = 0) -> int:
+    """返回不超过服务商上限的批大小；`requested <= 0` 时直接取上限。"""
+    limit = PROVIDER_BATCH_LIMITS.get(model, DEFAULT_BATCH_LIMIT)
+    if requested <= 0:
+        return limit
+    return min(requested, limit)
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    return isinstance(exc, RateLimitError) or getattr(exc, "status_code", None) == 429
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if _is_rate_limited(exc) or isinstance(exc, (APIConnectionError, APITimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+@dataclass
+class EmbeddingRunStats:
+    """累计的 Embedding 调用统计。
+
+    ``elapsed`` 为至少有一个请求在途的时长：每次请求尝试只计时一次，并发请求重叠的部分不重复累加，
+    退避等待与冷却期不计入。
+    """
+
+    texts: int = 0
+    batches: int = 0
+    retries: int = 0
+    throttles: int = 0
+    elapsed: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _active: int = field(default=0, repr=False, compare=False)
+    _active_since: float = field(default=0.0, repr=False, compare=False)
+
+    def add(self, **deltas: float) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    @contextmanager
+    def timing(self) -> Iterator[None]:
+        """包住一次请求尝试；首个在途请求开始计时，最后一个结束时累加。"""
+        with self._lock:
+            if self._active == 0:
+                self._active_since = time.perf_counter()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    self.elapsed += time.perf_counter() - self._active_since
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.texts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "texts": self.texts,
+                "batches": self.batches,
+                "retries": self.retries,
+                "throttles": self.throttles,
+                "elapsed_seconds": round(self.elapsed, 3),
+                "texts_per_second": round(self.texts_per_second, 2),
+            }
+
+    def report(self) -> str:
+        data = self.as_dict()
+        return (
+            f"🚀 Embedding 吞吐：{data['texts']} 条文本 / {data['batches']} 个批次，"
+            f"重试 {data['retries']} 次（限流 {data['throttles']} 次），"
+            f"耗时 {data['elapsed_seconds']}s，{data['texts_per_second']} 条/s"
+        )
+
+
+class EmbeddingEngine:
+    """并发、自适应的批量 Embedding 调用器。"""
+
+    def __init__(
+        self,
+        client: OpenAI,
+        model: str,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ) -> None:
+        self._client = client
+        self._model = model
+        self.batch_size = resolve_batch_size(
+            model, settings.embedding_batch_size if batch_size is None else batch_size
+        )
+        concurrency = max(1, max_concurrency or settings.embedding_max_concurrency)
+        self._max_retries = max(1, max_retries or settings.embedding_max_retries)
+        self._limiter = AdaptiveConcurrencyLimiter(max_limit=concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embedding")
+        self.stats = EmbeddingRunStats()
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        """按输入顺序返回向量；批次并发发送，单批失败按策略重试。"""
+        items = list(texts)
+        if not items:
+            return []
+
+        batches = [items[start : start + self.batch_size] for start in range(0, len(items), self.batch_size)]
+        if len(batches) == 1:
+            results = [self._embed_batch(batches[0])]
+        else:
+            results = list(self._executor.map(self._embed_batch, batches))
+        self.stats.add(texts=len(items))
+        return [vector for batch in results for vector in batch]
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self._limiter.slot(), self.stats.timing():
+                    response = self._client.embeddings.create(model=self._model, input=batch)
+            except Exception as exc:  # noqa: BLE001
+                if attempt >= self._max_retries or not _is_retryable(exc):
+                    raise
+                delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                delay *= 1 + random.random() * 0.25
+                if _is_rate_limited(exc):
+                    self._limiter.on_throttle(cooldown=delay)
+                    self.stats.add(throttles=1)
+                logger.warning("Embedding 批次第 %s 次失败，%.1fs 后重试：%s", attempt, delay, exc)
+                self.stats.add(retries=1)
+                time.sleep(delay)
+                continue
+
+            self._limiter.on_success()
+            self.stats.add(batches=1)
+            return [item.embedding for item in sorted(response.data, key=lambda d: getattr(d, "index", 0))]
+
+    def limiter_stats(self) -> dict[str, Any]:
+        return self._limiter.stats()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
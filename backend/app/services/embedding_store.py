@@ -0,0 +1,162 @@
+"""
+embedding_store.py
+基于 SQLite 的持久化 embedding 存储，按 (模型, sha256(文本)) 内容寻址。
+API 进程与 ETL 脚本共享同一个文件，重启或重复 ETL 时无需再次调用 Embedding 接口。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+# SQLite 单条语句参数数量上限较保守，批量查询时分段
+_SQL_BATCH = 500
+
+
+def text_digest(text: str) -> str:
+    """返回文本的 sha256 摘要，作为内容寻址键。"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """线程安全的持久化 embedding 存储，向量以 float32 二进制保存。"""
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    def get_many(self, model: str, texts: Sequence[str]) -> list[Optional[list[float]]]:
+        """批量读取 embedding，未命中的位置返回 None。"""
+        digests = [text_digest(text) for text in texts]
+        found: dict[str, list[float]] = {}
+        unique = list(dict.fromkeys(digests))
+        with self._lock:
+            for start in range(0, len(unique), _SQL_BATCH):
+                part = unique[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *part),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            results = [found.get(digest) for digest in digests]
+            hit_count = sum(1 for item in results if item is not None)
+            self._hits += hit_count
+            self._misses += len(results) - hit_count
+        return results
+
+    def get(self, model: str, text: str) -> Optional[list[float]]:
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """批量写入 embedding，已存在的键直接覆盖。"""
+        if len(texts) != len(vectors):
+            raise ValueError("texts 与 vectors 数量不一致")
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((model, text_digest(text), int(array.shape[0]), array.tobytes(), now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._writes += len(rows)
+
+    def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        self.put_many(model, [text], [vector])
+
+    def get_or_embed(
+        self,
+        model: str,
+        texts: Sequence[str],
+        embed_fn: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        """读穿式批量获取：只对未命中的去重文本调用 `embed_fn`，结果回写存储。"""
+        cached = self.get_many(model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if not missing:
+            return cached  # type: ignore[return-value]
+
+        computed = embed_fn(missing)
+        self.put_many(model, missing, computed)
+        lookup = dict(zip(missing, computed))
+        return [vector if vector is not None else lookup[text] for text, vector in zip(texts, cached)]
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits, misses, writes = self._hits, self._misses, self._writes
+        return {
+            "path": str(self._path),
+            "entries": self.count(),
+            "hits": hits,
+            "misses": misses,
+            "writes": writes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[EmbeddingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """返回进程内共享的持久化存储；配置关闭时返回 None。"""
+    global _store
+    if not settings.embedding_store_enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore(settings.embedding_store_path)
+    return _store
+
+
+def get_embedding_store_stats() -> dict[str, Any]:
+    """返回持久化 embedding 存储统计信息。"""
+    store = get_embedding_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
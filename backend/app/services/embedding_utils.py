@@ -3,46 +3,80 @@ embedding_utils.py
 统一封装阿里云百炼 Embedding 与常用向量工具
 """
 
+import asyncio
 from typing import Any
 
-from openai import OpenAI
 from app.core.config import settings
-from app.utils.retry import run_with_retry
+from app.utils.retry import arun_with_retry, run_with_retry
 from app.utils.cache import TTLCache
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from app.services.embedding_store import get_embedding_store, text_digest
+from app.services.registry import registry
+from app.services.similarity import cosine_similarity
 
 
-# 初始化百炼 Embedding 客户端
-embedding_client = OpenAI(
-    api_key=settings.dashscope_api_key,
-    base_url=settings.dashscope_base_url
+# 以文本摘要为键，避免整段简历文本常驻内存
+_embedding_cache = TTLCache(
+    ttl_seconds=settings.cache_ttl,
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    sweep_interval=settings.cache_sweep_interval,
 )
 
-_embedding_cache = TTLCache(ttl_seconds=settings.cache_ttl)
+
+def _load_stored(text: str) -> list[float] | None:
+    store = get_embedding_store()
+    if store is None:
+        return None
+    return store.get(settings.dashscope_embedding_model, text)
+
+
+def _persist(text: str, embedding: list[float]) -> None:
+    store = get_embedding_store()
+    if store is not None:
+        store.put(settings.dashscope_embedding_model, text, embedding)
 
 
 def get_embedding(text: str) -> list[float]:
-    """生成文本的 embedding 向量"""
-    cached = _embedding_cache.get(text)
-    if cached is not None:
-        return cached
+    """生成文本的 embedding 向量（进程内缓存 → 持久化存储 → 接口），并发未命中只请求一次"""
+
+    def _compute() -> list[float]:
+        stored = _load_stored(text)
+        if stored is not None:
+            return stored
+        resp = run_with_retry(
+            registry.openai_client().embeddings.create,
+            model=settings.dashscope_embedding_model,
+            input=text,
+        )
+        embedding = resp.data[0].embedding
+        _persist(text, embedding)
+        return embedding
+
+    return _embedding_cache.get_or_compute(text_digest(text), _compute)
+
+
+async def aget_embedding(text: str) -> list[float]:
+    """异步生成文本 embedding，与 `get_embedding` 共享缓存；持久化存储的 SQLite 读写放到线程池，不阻塞事件循环"""
+
+    async def _compute() -> list[float]:
+        stored = await asyncio.to_thread(_load_stored, text)
+        if stored is not None:
+            return stored
+        resp = await arun_with_retry(
+            registry.async_openai_client().embeddings.create,
+            model=settings.dashscope_embedding_model,
+            input=text,
+        )
+        embedding = resp.data[0].embedding
+        await asyncio.to_thread(_persist, text, embedding)
+        return embedding
 
-    resp = run_with_retry(
-        embedding_client.embeddings.create,
-        model=settings.dashscope_embedding_model,
-        input=text,
-    )
-    embedding = resp.data[0].embedding
-    _embedding_cache.set(text, embedding)
-    return embedding
+    return await _embedding_cache.aget_or_compute(text_digest(text), _compute)
 
 
 def compute_similarity(vec1, vec2) -> float:
-    """计算两个 embedding 向量的余弦相似度"""
-    v1 = np.array(vec1).reshape(1, -1)
-    v2 = np.array(vec2).reshape(1, -1)
-    return float(cosine_similarity(v1, v2)[0][0])
+    """计算两个 embedding 向量的余弦相似度（批量打分见 `similarity.cosine_scores`）"""
+    return cosine_similarity(vec1, vec2)
 
 
 def get_embedding_cache_stats() -> dict[str, Any]:
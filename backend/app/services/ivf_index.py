@@ -0,0 +1,306 @@
+"""
+ivf_index.py
+倒排文件（IVF）近似检索：用球面 k-means 把全部分块向量划分为若干簇（倒排列表），
+查询时只对与查询最相近的 ``nprobe`` 个簇内的行打分，扫描量约为全量的 ``nprobe / nlist``。
+
+- 纯 NumPy 实现：在抽样上训练质心，再分页读取集合把每一行分配到最近的簇；
+- 索引只保存质心与按簇分组的行号（``<directory>/ivf``），向量仍来自 memory / quantized 索引，
+  因此两种后端都可挂载，quantized 的 float32 精排照常生效；
+- 由 `scripts/ETL.py` 在写入向量库后构建（`MATCH_ANN_INDEX=ivf` 或 `--build-ivf`）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from app.services.job_index import top_k_rows
+from app.services.similarity import normalize_rows
+
+if TYPE_CHECKING:
+    from app.services.job_index import JobVectorIndex
+
+
+IVF_DIR = "ivf"
+IVF_FORMAT = 1
+
+_META_FILE = "meta.json"
+_CENTROIDS_FILE = "centroids.npy"
+_LISTS_FILE = "lists.npy"
+_OFFSETS_FILE = "offsets.npy"
+_BUILD_PAGE_SIZE = 2000
+# 分配时每块计算的行数：块内得分矩阵（4096 × nlist）用完即释放
+_ASSIGN_BLOCK_ROWS = 4096
+# 每个簇至少分到的训练样本数，样本不足时自动减少簇数
+_MIN_POINTS_PER_LIST = 39
+
+
+def default_list_count(count: int) -> int:
+    """自动簇数：约 ``4·√n``，且保证每簇平均不少于 39 行。"""
+    if count <= 0:
+        return 0
+    return max(1, min(int(round(4 * np.sqrt(count))), count // _MIN_POINTS_PER_LIST))
+
+
+def _update_digest(digest: Any, ids: Iterable[str]) -> None:
+    for chunk_id in ids:
+        digest.update(chunk_id.encode("utf-8"))
+        digest.update(b"\n")
+
+
+def ids_digest(ids: Iterable[str]) -> str:
+    """分块 ID 序列的摘要，用于确认索引与加载的向量行序一致。"""
+    digest = hashlib.sha1()
+    _update_digest(digest, ids)
+    return digest.hexdigest()
+
+
+def ivf_stamp(directory: Path) -> str:
+    """索引文件的版本戳，重新构建后变化；不存在时返回空字符串。"""
+    try:
+        stat = os.stat(Path(directory) / IVF_DIR / _META_FILE)
+    except FileNotFoundError:
+        return ""
+    return f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def assign_lists(matrix: np.ndarray, centroids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """把已归一化的行分配到余弦相似度最高的质心，返回 (簇号, 相似度)。"""
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], _ASSIGN_BLOCK_ROWS):
+        block = matrix[start : start + _ASSIGN_BLOCK_ROWS] @ centroids.T
+        best = block.argmax(axis=1)
+        labels[start : start + best.size] = best
+        scores[start : start + best.size] = block[np.arange(best.size), best]
+    return labels, scores
+
+
+def train_centroids(sample: np.ndarray, n_lists: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """球面 k-means：随机选取样本初始化，迭代“分配 → 求均值 → 归一化”，分配不再变化时提前结束。
+
+    空簇用当前离自身质心最远的样本重新初始化，避免簇数悄然减少。
+    """
+    rng = np.random.default_rng(seed)
+    n_lists = max(1, min(n_lists, sample.shape[0]))
+    centroids = sample[rng.choice(sample.shape[0], n_lists, replace=False)].copy()
+    labels = np.full(sample.shape[0], -1, dtype=np.int32)
+    for _ in range(max(1, iterations)):
+        new_labels, scores = assign_lists(sample, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=n_lists)
+        order = np.argsort(labels, kind="stable")
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        centroids[filled] = normalize_rows(np.add.reduceat(sample[order], starts, axis=0))
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            centroids[empty] = sample[np.argsort(scores)[: empty.size]]
+    return centroids
+
+
+def _iter_pages(collection: Any) -> Iterator[tuple[int, list[str], np.ndarray]]:
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=_BUILD_PAGE_SIZE, offset=offset)
+        page_ids = page.get("ids") or []
+        if not page_ids:
+            return
+        yield offset, page_ids, normalize_rows(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page_ids)
+
+
+def build_ivf(
+    collection: Any,
+    directory: Path,
+    n_lists: int = 0,
+    train_sample: int = 50000,
+    iterations: int = 20,
+    centroids: Optional[np.ndarray] = None,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """分页读取集合两遍（抽样训练、逐页分配）并写出 ``<directory>/ivf``，内存占用与样本量相当。
+
+    Args:
+        collection: Chroma collection 实例。
+        directory: 知识库目录（通常为 Chroma 持久化目录）。
+        n_lists: 簇数，0 表示按分块数自动选择。
+        train_sample: 训练质心的抽样行数，0 表示使用全部行。
+        iterations: k-means 最大迭代次数。
+        centroids: 沿用已有质心（如增量同步），只重新分配行，不再训练。
+        seed: 抽样与初始化的随机种子。
+
+    Returns:
+        dict: 构建统计（分块数、簇数、簇大小分布、各阶段耗时）。
+    """
+    total = collection.count()
+    target = Path(directory) / IVF_DIR
+    staging = target.with_name(f".{IVF_DIR}.{os.getpid()}.tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    started = time.perf_counter()
+    if centroids is None and total:
+        size = total if train_sample <= 0 else min(train_sample, total)
+        picked = np.sort(np.random.default_rng(seed).choice(total, size, replace=False))
+        blocks = []
+        for offset, page_ids, rows in _iter_pages(collection):
+            local = picked[(picked >= offset) & (picked < offset + len(page_ids))] - offset
+            blocks.append(rows[local])
+        sample = np.concatenate(blocks)
+        n_lists = n_lists or default_list_count(total)
+        n_lists = max(1, min(n_lists, sample.shape[0] // _MIN_POINTS_PER_LIST or 1))
+        centroids = train_centroids(sample, n_lists, iterations, seed)
+        del sample, blocks
+    trained = time.perf_counter()
+
+    digest = hashlib.sha1()
+    labels = np.zeros(total, dtype=np.int32)
+    for offset, page_ids, rows in _iter_pages(collection):
+        labels[offset : offset + len(page_ids)] = assign_lists(rows, centroids)[0]
+        _update_digest(digest, page_ids)
+    if centroids is None:
+        centroids = np.zeros((0, 0), dtype=np.float32)
+    counts = np.bincount(labels, minlength=centroids.shape[0])
+    np.save(staging / _CENTROIDS_FILE, centroids.astype(np.float32))
+    np.save(staging / _LISTS_FILE, np.argsort(labels, kind="stable").astype(np.int32))
+    np.save(staging / _OFFSETS_FILE, np.concatenate(([0], np.cumsum(counts))).astype(np.int64))
+    meta = {
+        "format": IVF_FORMAT,
+        "count": total,
+        "lists": int(centroids.shape[0]),
+        "dimension": int(centroids.shape[1]) if centroids.ndim == 2 else 0,
+        "ids_digest": digest.hexdigest(),
+        "built_at": time.time(),
+    }
+    with open(staging / _META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, separators=(",", ":"))
+
+    if target.exists():
+        retired = target.with_name(f".{IVF_DIR}.{os.getpid()}.old")
+        os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    return {
+        "chunks": total,
+        "lists": meta["lists"],
+        "largest_list": int(counts.max()) if counts.size else 0,
+        "empty_lists": int((counts == 0).sum()),
+        "train_s": round(trained - started, 2),
+        "assign_s": round(time.perf_counter() - trained, 2),
+    }
+
+
+class IvfIndex:
+    """质心 + 倒排列表，挂载到 :class:`JobVectorIndex` 的 ``ann`` 上替换精确的全量打分。
+
+    Args:
+        centroids: (nlist, d) 已归一化的质心。
+        lists: 按簇分组的行号，第 i 簇为 ``lists[offsets[i]:offsets[i + 1]]``。
+        offsets: 长度为 nlist + 1 的起止位置。
+        nprobe: 每次查询扫描的簇数。
+        digest: 构建时分块 ID 序列的摘要。
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        lists: np.ndarray,
+        offsets: np.ndarray,
+        nprobe: int = 8,
+        digest: str = "",
+    ) -> None:
+        if offsets.shape[0] != centroids.shape[0] + 1 or offsets[-1] != lists.shape[0]:
+            raise ValueError("倒排列表与质心数量不一致")
+        self.centroids = centroids
+        self.lists = lists
+        self.offsets = offsets
+        self.nprobe = max(1, min(nprobe, centroids.shape[0] or 1))
+        self.digest = digest
+
+    @classmethod
+    def load(cls, directory: Path, nprobe: int = 8) -> "IvfIndex":
+        root = Path(directory) / IVF_DIR
+        with open(root / _META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != IVF_FORMAT:
+            raise ValueError(f"不支持的 IVF 索引格式: {meta.get('format')}")
+        return cls(
+            np.load(root / _CENTROIDS_FILE),
+            np.load(root / _LISTS_FILE),
+            np.load(root / _OFFSETS_FILE),
+            nprobe=nprobe,
+            digest=meta["ids_digest"],
+        )
+
+    def __len__(self) -> int:
+        return int(self.lists.shape[0])
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @property
+    def probe_size(self) -> float:
+        """每次查询平均扫描的行数。"""
+        return len(self) * self.nprobe / max(self.n_lists, 1)
+
+    def matches(self, ids: Sequence[str]) -> bool:
+        """索引是否按 ``ids`` 的行序构建（行数与 ID 摘要均一致）。"""
+        return len(ids) == len(self) and ids_digest(ids) == self.digest
+
+    def _probe(self, ranked: np.ndarray, probes: int, mask: Optional[np.ndarray]) -> np.ndarray:
+        rows = np.concatenate([self.lists[self.offsets[c] : self.offsets[c + 1]] for c in ranked[:probes]])
+        if mask is not None:
+            rows = rows[mask[rows]]
+        # 升序行号让 mmap 向量按页顺序访问
+        return np.sort(rows)
+
+    def search(
+        self,
+        index: "JobVectorIndex",
+        queries: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """在最相近的 ``nprobe`` 个簇内检索已归一化的查询，返回值与 ``search_many`` 相同。
+
+        过滤后候选不足 k 行时逐次加倍扫描的簇数，保证每个查询都返回 ``min(k, 满足过滤的行数)`` 条。
+        """
+        available = len(self) if mask is None else int(np.count_nonzero(mask))
+        k = min(k, available)
+        ranked = np.argsort(-(queries @ self.centroids.T), axis=1)
+        rows_out = np.empty((queries.shape[0], k), dtype=np.int64)
+        scores_out = np.empty((queries.shape[0], k), dtype=np.float32)
+        for i, query in enumerate(queries):
+            probes = self.nprobe
+            rows = self._probe(ranked[i], probes, mask)
+            while rows.size < k and probes < self.n_lists:
+                probes = min(probes * 2, self.n_lists)
+                rows = self._probe(ranked[i], probes, mask)
+            top, top_scores = top_k_rows(index._similarities(query[None, :], rows), k)
+            rows_out[i] = rows[top[0]]
+            scores_out[i] = top_scores[0]
+        return rows_out, scores_out
+
+    def stats(self) -> dict[str, Any]:
+        sizes = np.diff(self.offsets)
+        return {
+            "type": "ivf",
+            "lists": self.n_lists,
+            "nprobe": self.nprobe,
+            "mean_list_size": round(float(sizes.mean()), 1) if sizes.size else 0.0,
+            "largest_list": int(sizes.max()) if sizes.size else 0,
+        }
@@ -0,0 +1,189 @@
+"""
+job_filters.py
+岗位元数据过滤：地点 / 行业 / 批次 / 截止时间。
+
+- ETL 阶段用 `filter_metadata()` 把原始字段规范化写入元数据（城市拆分为 `loc_<城市>` 布尔键，
+  截止时间解析为可比较的整数 `deadline_ts`），使 Chroma `where` 子句可以直接下推；
+- 内存索引与关键词索引用 `MetadataMasks` 预先计算每个取值的布尔掩码，过滤只是掩码按位运算。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+LOCATION_KEY_PREFIX = "loc_"
+UNKNOWN_VALUES = {"", "未知", "nan", "none", "不限"}
+
+_LOCATION_SEPARATORS = re.compile(r"[、,，/;；|\s]+")
+_DATE_PATTERN = re.compile(r"(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})")
+
+
+def _clean(value: Any) -> str:
+    text = str(value if value is not None else "").strip()
+    return "" if text.lower() in UNKNOWN_VALUES else text
+
+
+def split_locations(value: Any) -> list[str]:
+    """把“深圳、上海市”之类的地点字段拆成去重后的城市列表（去掉末尾的“市”）。"""
+    cities: list[str] = []
+    for part in _LOCATION_SEPARATORS.split(_clean(value)):
+        city = _clean(part)
+        if len(city) > 2 and city.endswith("市"):
+            city = city[:-1]
+        if city and city not in cities:
+            cities.append(city)
+    return cities
+
+
+def date_to_ts(value: date) -> int:
+    """日期转为当天 00:00（UTC）的秒级时间戳，作为可排序的整数。"""
+    return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp())
+
+
+def parse_deadline(value: Any) -> int:
+    """解析截止时间（如 ``2025-01-10``、``2025/1/10 23:59``、``2025年1月10日``）；无法解析时返回 0。"""
+    if isinstance(value, (datetime, date)):
+        return date_to_ts(value)
+    match = _DATE_PATTERN.search(_clean(value))
+    if not match:
+        return 0
+    try:
+        return date_to_ts(date(int(match.group(1)), int(match.group(2)), int(match.group(3))))
+    except ValueError:
+        return 0
+
+
+def location_key(city: str) -> str:
+    return f"{LOCATION_KEY_PREFIX}{city}"
+
+
+def filter_metadata(location: Any, deadline: Any) -> dict[str, Any]:
+    """ETL 使用：生成可下推过滤的规范化元数据字段。"""
+    return {
+        "deadline_ts": parse_deadline(deadline),
+        **{location_key(city): True for city in split_locations(location)},
+    }
+
+
+def _deadline_of(meta: dict) -> int:
+    value = meta.get("deadline_ts")
+    return int(value) if isinstance(value, (int, float)) and value else parse_deadline(meta.get("deadline"))
+
+
+@dataclass
+class JobFilter:
+    """岗位过滤条件：同一字段内为“或”，不同字段之间为“且”；截止时间未知（0）的岗位不满足时间条件。"""
+
+    locations: list[str] = field(default_factory=list)
+    industries: list[str] = field(default_factory=list)
+    batches: list[str] = field(default_factory=list)
+    deadline_from: Optional[int] = None
+    deadline_to: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self.locations = [city for value in self.locations for city in split_locations(value)]
+        self.industries = [_clean(value) for value in self.industries if _clean(value)]
+        self.batches = [_clean(value) for value in self.batches if _clean(value)]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.locations or self.industries or self.batches) and (
+            self.deadline_from is None and self.deadline_to is None
+        )
+
+    @property
+    def uses_normalized_fields(self) -> bool:
+        """是否依赖 ETL 写入的规范化字段（``loc_<城市>``、``deadline_ts``）。"""
+        return bool(self.locations) or self.deadline_from is not None or self.deadline_to is not None
+
+    def to_where(self) -> Optional[dict]:
+        """转换为 Chroma `where` 子句；无条件时返回 None。"""
+        clauses: list[dict] = []
+        if self.locations:
+            flags = [{location_key(city): True} for city in self.locations]
+            clauses.append(flags[0] if len(flags) == 1 else {"$or": flags})
+        if self.industries:
+            clauses.append({"industry": {"$in": self.industries}})
+        if self.batches:
+            clauses.append({"batch": {"$in": self.batches}})
+        if self.deadline_from is not None or self.deadline_to is not None:
+            clauses.append({"deadline_ts": {"$gte": max(self.deadline_from or 0, 1)}})
+        if self.deadline_to is not None:
+            clauses.append({"deadline_ts": {"$lte": self.deadline_to}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def matches(self, meta: dict) -> bool:
+        """逐条判断（无预计算掩码时使用）。"""
+        if self.locations and not set(self.locations) & set(split_locations(meta.get("location"))):
+            return False
+        if self.industries and _clean(meta.get("industry")) not in self.industries:
+            return False
+        if self.batches and _clean(meta.get("batch")) not in self.batches:
+            return False
+        if self.deadline_from is not None or self.deadline_to is not None:
+            deadline = _deadline_of(meta)
+            if deadline <= 0 or deadline < (self.deadline_from or 0):
+                return False
+            if self.deadline_to is not None and deadline > self.deadline_to:
+                return False
+        return True
+
+
+class MetadataMasks:
+    """按行预计算的过滤掩码：地点 / 行业 / 批次每个取值一个布尔数组，截止时间一个整数数组。"""
+
+    def __init__(self, metadatas: Sequence[dict]) -> None:
+        self.size = len(metadatas)
+        self._values: dict[str, dict[str, np.ndarray]] = {"location": {}, "industry": {}, "batch": {}}
+        deadlines = np.zeros(self.size, dtype=np.int64)
+        for row, meta in enumerate(metadatas):
+            meta = meta or {}
+            self._mark("location", split_locations(meta.get("location")), row)
+            self._mark("industry", [_clean(meta.get("industry"))], row)
+            self._mark("batch", [_clean(meta.get("batch"))], row)
+            deadlines[row] = _deadline_of(meta)
+        self._deadlines = deadlines
+
+    def _mark(self, name: str, values: Iterable[str], row: int) -> None:
+        for value in values:
+            if value:
+                mask = self._values[name].get(value)
+                if mask is None:
+                    mask = self._values[name][value] = np.zeros(self.size, dtype=bool)
+                mask[row] = True
+
+    def _any_of(self, name: str, values: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        for value in values:
+            value_mask = self._values[name].get(value)
+            if value_mask is not None:
+                mask |= value_mask
+        return mask
+
+    def mask(self, job_filter: Optional[JobFilter]) -> Optional[np.ndarray]:
+        """返回满足条件的行掩码；无过滤条件时返回 None（表示全部行）。"""
+        if job_filter is None or job_filter.is_empty:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        if job_filter.locations:
+            mask &= self._any_of("location", job_filter.locations)
+        if job_filter.industries:
+            mask &= self._any_of("industry", job_filter.industries)
+        if job_filter.batches:
+            mask &= self._any_of("batch", job_filter.batches)
+        if job_filter.deadline_from is not None or job_filter.deadline_to is not None:
+            mask &= self._deadlines >= max(job_filter.deadline_from or 0, 1)
+        if job_filter.deadline_to is not None:
+            mask &= self._deadlines <= job_filter.deadline_to
+        return mask
+
+    def stats(self) -> dict[str, int]:
+        return {f"{name}_values": len(values) for name, values in self._values.items()}
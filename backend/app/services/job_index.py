@@ -0,0 +1,338 @@
+"""
+job_index.py
+进程内岗位向量索引：把 Chroma 中全部分块向量载入一块连续的 L2 归一化 float32 矩阵，
+Top-k 检索只需一次矩阵乘法 + argpartition。Chroma 目录变化（如 ETL 重建）后自动重载。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.job_filters import JobFilter, MetadataMasks
+from app.services.langchain_clients import chroma_version, get_vector_store
+from app.services.registry import registry
+from app.services.similarity import normalize_rows
+
+
+logger = logging.getLogger(__name__)
+
+_LOAD_PAGE_SIZE = 2000
+
+
+def collection_space(collection: Any) -> str:
+    """读取集合的距离度量（l2 / cosine / ip），默认 l2。"""
+    metadata = getattr(collection, "metadata", None) or {}
+    if "hnsw:space" in metadata:
+        return str(metadata["hnsw:space"])
+    configuration = getattr(collection, "configuration", None) or {}
+    try:
+        return str(configuration["hnsw"]["space"] or "l2")
+    except (KeyError, TypeError):
+        return "l2"
+
+
+def cosine_to_distance(similarity: np.ndarray, space: str) -> np.ndarray:
+    """把余弦相似度换算成集合度量下的距离，使内存索引与 Chroma 返回的距离口径一致。
+
+    向量均已归一化：平方 L2 距离为 ``2 - 2cos``，cosine / ip 距离为 ``1 - cos``。
+    """
+    if space == "l2":
+        return 2.0 - 2.0 * similarity
+    return 1.0 - similarity
+
+
+def pool_chunk_scores(
+    job_keys: Sequence[str],
+    scores: np.ndarray | Sequence[float],
+    pool: str = "max",
+    temperature: float = 0.05,
+) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """把分块得分按岗位聚合（向量化实现）。
+
+    Returns:
+        (岗位键列表, 聚合得分, 每个岗位得分最高的分块下标)，三者一一对应、顺序未排序。
+        ``max`` 取岗位内最高分；``softmax`` 为以 softmax(score / temperature) 为权重的加权平均，
+        结果介于岗位内平均分与最高分之间。
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        return [], np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    jobs, inverse = np.unique(np.asarray(job_keys, dtype=object).astype(str), return_inverse=True)
+    order = np.argsort(-scores, kind="stable")
+    _, first = np.unique(inverse[order], return_index=True)
+    best = order[first]
+    pooled = scores[best]
+    if pool == "softmax" and len(jobs) < scores.size:
+        weights = np.exp((scores - pooled[inverse]) / max(temperature, 1e-6))
+        pooled = np.bincount(inverse, weights * scores) / np.bincount(inverse, weights)
+    return list(jobs), pooled, best
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """每行取得分最高的 k 列，返回按得分降序的 (列号, 得分)。"""
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+class JobVectorIndex:
+    """只读的内存向量索引，接口与 Chroma ``collection.query`` 返回结构保持一致。
+
+    ``ann`` 可挂载近似检索结构（如 :class:`~app.services.ivf_index.IvfIndex`），挂载后只对其选出的候选行打分。
+    """
+
+    ann: Any = None
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        vectors: np.ndarray | Sequence[Sequence[float]],
+        space: str = "l2",
+        version: str = "",
+    ) -> None:
+        matrix = np.array(vectors, dtype=np.float32, order="C")
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(ids), -1) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        if matrix.shape[0] != len(ids):
+            raise ValueError("向量数量与 ID 数量不一致")
+        if matrix.size:
+            matrix = normalize_rows(matrix)
+
+        self._set_records(ids, documents, metadatas, space, version)
+        self.matrix = matrix
+
+    def _set_records(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        space: str,
+        version: str,
+    ) -> None:
+        """向量以外的部分：ID、文本、元数据、过滤掩码与岗位 → 行号映射。"""
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = np.array(list(metadatas), dtype=object)
+        self.filters = MetadataMasks(self.metadatas)
+        job_rows: dict[str, list[int]] = {}
+        for row, (chunk_id, meta) in enumerate(zip(self.ids, self.metadatas)):
+            job_rows.setdefault((meta or {}).get("job_id") or chunk_id.rsplit("-", 1)[0], []).append(row)
+        self._job_rows = {job_id: np.asarray(rows, dtype=np.int64) for job_id, rows in job_rows.items()}
+        self.space = space
+        self.version = version
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    @classmethod
+    def from_collection(cls, collection: Any, version: str = "") -> "JobVectorIndex":
+        """分页读取集合中的全部分块向量与元数据。"""
+        ids: list[str] = []
+        documents: list[str] = []
+        metadatas: list[dict] = []
+        blocks: list[np.ndarray] = []
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=_LOAD_PAGE_SIZE,
+                offset=offset,
+            )
+            page_ids = page.get("ids") or []
+            if not page_ids:
+                break
+            ids.extend(page_ids)
+            documents.extend(page.get("documents") or [""] * len(page_ids))
+            metadatas.extend(meta or {} for meta in (page.get("metadatas") or [{}] * len(page_ids)))
+            blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            offset += len(page_ids)
+
+        vectors = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        return cls(ids, documents, metadatas, vectors, space=collection_space(collection), version=version)
+
+    def _normalize_queries(self, queries: np.ndarray | Sequence[Sequence[float]]) -> np.ndarray:
+        return normalize_rows(queries)
+
+    def get_job(self, job_id: str) -> dict[str, Any]:
+        """与 ``collection.get(where={"job_id": ...})`` 相同结构的岗位分块；`embeddings` 为已归一化的行。"""
+        rows = self._job_rows.get(job_id, np.zeros(0, dtype=np.int64))
+        return {
+            "ids": [self.ids[i] for i in rows],
+            "documents": [self.documents[i] for i in rows],
+            "metadatas": list(self.metadatas[rows]),
+            "embeddings": self.matrix[rows],
+        }
+
+    def search_many(
+        self,
+        queries: np.ndarray | Sequence[Sequence[float]],
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """批量检索，返回形状为 (n_queries, k) 的行号矩阵与余弦相似度矩阵（降序）。
+
+        `mask` 为行过滤掩码：只在满足条件的行上计算相似度，返回的仍是全局行号。
+        挂载了 ``ann`` 时走近似检索；过滤后的行数不多于其单次扫描量时直接精确计算（更快且无损）。
+        """
+        rows = np.flatnonzero(mask) if mask is not None else None
+        candidates = len(self) if rows is None else int(rows.size)
+        if candidates == 0 or k <= 0:
+            empty = np.zeros((np.atleast_2d(queries).shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        if self.ann is not None and candidates > self.ann.probe_size:
+            return self.ann.search(self, self._normalize_queries(queries), k, mask)
+
+        top, top_scores = top_k_rows(self._similarities(self._normalize_queries(queries), rows), min(k, candidates))
+        if rows is not None:
+            top = rows[top]
+        return top, top_scores
+
+    def _similarities(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """已归一化查询与候选行（None 表示全部行）的余弦相似度，形状 (n_queries, n_rows)。"""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        return queries @ matrix.T
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int,
+        include: Optional[Sequence[str]] = None,
+        job_filter: Optional[JobFilter] = None,
+    ) -> dict[str, list]:
+        """与 ``collection.query`` 相同结构的检索结果，便于直接替换 Chroma 路径；`job_filter` 对应 Chroma 的 `where`。"""
+        rows, scores = self.search_many(query_embeddings, n_results, self.filters.mask(job_filter))
+        distances = cosine_to_distance(scores, self.space)
+        return {
+            "ids": [[self.ids[i] for i in row] for row in rows],
+            "documents": [[self.documents[i] for i in row] for row in rows],
+            "metadatas": [list(self.metadatas[row]) for row in rows],
+            "distances": distances.tolist(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "chunks": len(self),
+            "dimension": self.dimension,
+            "space": self.space,
+            "matrix_bytes": int(self.matrix.nbytes),
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+
+_INDEX_KEY = "job_index"
+_reload_lock = threading.Lock()
+
+
+def _index_version() -> str:
+    """Chroma 目录版本；量化后端与 IVF 索引另加各自文件的版本戳，任一变化都触发重载。"""
+    version = chroma_version()
+    if settings.match_index_backend == "quantized":
+        from app.services.quantized_index import vectors_stamp
+
+        version += f"|vectors:{vectors_stamp(settings.chroma_persist_directory)}"
+    if settings.match_ann_index == "ivf":
+        from app.services.ivf_index import ivf_stamp
+
+        version += f"|ivf:{ivf_stamp(settings.chroma_persist_directory)}"
+    return version
+
+
+def _load_quantized(collection: Any, version: str) -> Optional[JobVectorIndex]:
+    """打开量化导出；缺失或与集合不一致时返回 None（回退为 float32 内存索引）。"""
+    from app.services.quantized_index import QuantizedJobIndex
+
+    try:
+        index = QuantizedJobIndex.load(
+            settings.chroma_persist_directory,
+            version=version,
+            rescore=settings.match_quantized_rescore,
+        )
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("量化向量不可用（%s），回退为 float32 内存索引；可运行 scripts/ETL.py --export-vectors 生成", exc)
+        return None
+    if len(index) != collection.count():
+        logger.warning("量化向量与向量库分块数不一致，回退为 float32 内存索引；请重新运行 scripts/ETL.py --export-vectors")
+        return None
+    return index
+
+
+def _load_ivf(index: JobVectorIndex) -> Any:
+    """打开 IVF 索引；缺失或与向量行序不一致时返回 None（使用精确检索）。"""
+    from app.services.ivf_index import IvfIndex
+
+    try:
+        ann = IvfIndex.load(settings.chroma_persist_directory, nprobe=settings.match_ivf_nprobe)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("IVF 索引不可用（%s），使用精确检索；可运行 scripts/ETL.py --build-ivf 生成", exc)
+        return None
+    if not ann.matches(index.ids):
+        logger.warning("IVF 索引与向量库分块不一致，使用精确检索；请重新运行 scripts/ETL.py --build-ivf")
+        return None
+    return ann
+
+
+def _load_index(version: str) -> JobVectorIndex:
+    collection = get_vector_store()._collection  # type: ignore[attr-defined]
+    started = time.perf_counter()
+    index = _load_quantized(collection, version) if settings.match_index_backend == "quantized" else None
+    if index is None:
+        index = JobVectorIndex.from_collection(collection, version=version)
+    if settings.match_ann_index == "ivf":
+        index.ann = _load_ivf(index)
+    logger.info("岗位向量索引已加载：%s 个分块，用时 %.2fs", len(index), time.perf_counter() - started)
+    return index
+
+
+def get_job_index() -> Optional[JobVectorIndex]:
+    """返回内存索引；配置未启用时返回 None。
+
+    检测到 Chroma 目录（或量化导出文件）版本变化时由一个线程负责重载，其余线程继续使用旧索引，
+    首次加载期间调用方会等待加载完成。
+    """
+    if settings.match_index_backend not in ("memory", "quantized"):
+        return None
+
+    version = _index_version()
+    current: Optional[JobVectorIndex] = registry.get(_INDEX_KEY)
+    if current is not None and current.version == version:
+        return current
+
+    if current is not None and not _reload_lock.acquire(blocking=False):
+        return current
+    if current is None:
+        _reload_lock.acquire()
+    try:
+        latest: Optional[JobVectorIndex] = registry.get(_INDEX_KEY)
+        if latest is not None and latest.version == version:
+            return latest
+        return registry.replace(_INDEX_KEY, _load_index(version))
+    finally:
+        _reload_lock.release()
+
+
+def get_job_index_stats() -> dict[str, Any]:
+    """返回内存索引状态，供诊断接口使用。"""
+    index = registry.get(_INDEX_KEY) if settings.match_index_backend != "chroma" else None
+    stats = {"backend": settings.match_index_backend, **(index.stats() if index is not None else {})}
+    if index is not None and index.ann is not None:
+        stats["ann"] = index.ann.stats()
+    return stats
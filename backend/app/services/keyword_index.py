@@ -0,0 +1,315 @@
+"""
+keyword_index.py
+岗位关键词倒排索引（BM25）：按岗位建立，中文按字与相邻二字切分，英文/数字按整词切分。
+索引由 `scripts/ETL.py` 逐批构建（`KeywordIndexBuilder`）并随 Chroma 目录一起落盘（`keyword_index.json`）；
+查询完全在本地完成，不调用 Embedding 接口。旧知识库缺少索引文件时从 Chroma 集合现场构建。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.job_filters import JobFilter, MetadataMasks
+from app.services.langchain_clients import chroma_version, get_vector_store
+from app.services.registry import registry
+
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX_FILE = "keyword_index.json"
+INDEX_FORMAT = 1
+
+# 参与检索的元数据字段（与正文一起建索引）
+_META_FIELDS = ("company", "title", "industry", "location", "batch")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#._-]*|[\u4e00-\u9fff]+")
+_LOAD_PAGE_SIZE = 2000
+# 与 KeywordIndex.save 写文件时的编码参数一致
+_dump_json = partial(json.dumps, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def tokenize(text: str) -> list[str]:
+    """中文连续片段切成单字 + 相邻二字，英文/数字保留整词（小写）。"""
+    tokens: list[str] = []
+    for piece in _TOKEN_PATTERN.findall(str(text or "").lower()):
+        if piece[0] < "\u4e00":
+            tokens.append(piece.rstrip("._-"))
+            continue
+        tokens.extend(piece)
+        tokens.extend(piece[i : i + 2] for i in range(len(piece) - 1))
+    return [token for token in tokens if token]
+
+
+def _index_text(document: str, metadata: dict) -> str:
+    return " ".join([document, *(str(metadata.get(name) or "") for name in _META_FIELDS)])
+
+
+class KeywordIndex:
+    """只读 BM25 索引；每个词的倒排表保存为 NumPy 数组并预计算权重，查询只做稀疏累加。"""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        lengths: Sequence[int],
+        postings: dict[str, tuple[Sequence[int], Sequence[int]]],
+        version: str = "",
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.filters = MetadataMasks(self.metadatas)
+        self.version = version
+        self.loaded_at = time.time()
+
+        lengths_array = np.asarray(lengths, dtype=np.float32)
+        average = float(lengths_array.mean()) if len(lengths_array) else 1.0
+        norm = k1 * (1.0 - b + b * lengths_array / max(average, 1.0))
+        total = len(self.ids)
+        # term -> (行号, 词频, BM25 权重)
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for term, (rows, tfs) in postings.items():
+            rows_array = np.asarray(rows, dtype=np.int32)
+            tf_array = np.asarray(tfs, dtype=np.int32)
+            idf = math.log(1.0 + (total - len(rows_array) + 0.5) / (len(rows_array) + 0.5))
+            weights = idf * tf_array * (k1 + 1.0) / (tf_array + norm[rows_array])
+            self._postings[term] = (rows_array, tf_array, weights.astype(np.float32))
+        self._lengths = [int(length) for length in lengths]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        version: str = "",
+    ) -> "KeywordIndex":
+        lengths: list[int] = []
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        for row, (document, metadata) in enumerate(zip(documents, metadatas)):
+            counts = Counter(tokenize(_index_text(document, metadata or {})))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                rows, tfs = postings.setdefault(term, ([], []))
+                rows.append(row)
+                tfs.append(tf)
+        return cls(ids, documents, metadatas, lengths, postings, version=version)
+
+    @classmethod
+    def from_collection(cls, collection: Any, version: str = "") -> "KeywordIndex":
+        """从 Chroma 集合读取分块并按岗位合并（仅读本地数据，不调用 Embedding）。"""
+        jobs: dict[str, tuple[list[str], dict]] = {}
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=_LOAD_PAGE_SIZE, offset=offset)
+            page_ids = page.get("ids") or []
+            if not page_ids:
+                break
+            for chunk_id, document, meta in zip(page_ids, page.get("documents") or [], page.get("metadatas") or []):
+                meta = meta or {}
+                job_id = meta.get("job_id") or chunk_id.rsplit("-", 1)[0]
+                jobs.setdefault(job_id, ([], meta))[0].append(document or "")
+            offset += len(page_ids)
+        return cls.build(
+            list(jobs),
+            ["\n".join(chunks) for chunks, _ in jobs.values()],
+            [meta for _, meta in jobs.values()],
+            version=version,
+        )
+
+    def search(self, query: str, k: int, job_filter: Optional[JobFilter] = None) -> list[tuple[int, float]]:
+        """返回按 BM25 分数降序的 (行号, 分数)，只包含至少命中一个词且满足过滤条件的岗位。"""
+        if not self.ids or k <= 0:
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[2]
+        mask = self.filters.mask(job_filter)
+        if mask is not None:
+            scores[~mask] = 0.0
+
+        matched = np.flatnonzero(scores)
+        if matched.size > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(row), float(scores[row])) for row in order]
+
+    def save(self, path: Path) -> None:
+        """写入 JSON 文件（临时文件 + 原子替换）。"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "format": INDEX_FORMAT,
+            "ids": self.ids,
+            "documents": self.documents,
+            "metadatas": self.metadatas,
+            "lengths": self._lengths,
+            "postings": {term: [rows.tolist(), tfs.tolist()] for term, (rows, tfs, _) in self._postings.items()},
+        }
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), default=str)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, version: str = "") -> "KeywordIndex":
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("format") != INDEX_FORMAT:
+            raise ValueError(f"不支持的关键词索引格式: {payload.get('format')}")
+        postings = {term: (rows, tfs) for term, (rows, tfs) in payload["postings"].items()}
+        return cls(payload["ids"], payload["documents"], payload["metadatas"], payload["lengths"], postings, version)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "jobs": len(self),
+            "terms": len(self._postings),
+            "postings": int(sum(rows.size for rows, _, _ in self._postings.values())),
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class KeywordIndexBuilder:
+    """ETL 使用：逐批追加岗位并写出索引文件，内存只随倒排表增长，不保留岗位文本与元数据。
+
+    每批分词后倒排表追加到紧凑的整型数组；岗位 ID、文本与元数据逐行 JSON 编码暂存到临时目录，
+    ``save`` 时流式拼出与 :meth:`KeywordIndex.save` 完全相同的文件。
+    """
+
+    _SPOOLED = ("ids", "documents", "metadatas")
+
+    def __init__(self) -> None:
+        self._spool = tempfile.TemporaryDirectory(prefix="keyword_index_")
+        self._files = {
+            name: open(Path(self._spool.name) / f"{name}.jsonl", "w+", encoding="utf-8", newline="\n")
+            for name in self._SPOOLED
+        }
+        self._lengths = array("i")
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __enter__(self) -> "KeywordIndexBuilder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[dict]) -> None:
+        """追加一批岗位（行号接续之前的批次，分词规则同 :meth:`KeywordIndex.build`）。"""
+        for document, metadata in zip(documents, metadatas):
+            counts = Counter(tokenize(_index_text(document, metadata or {})))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = (array("i"), array("i"))
+                posting[0].append(self._rows)
+                posting[1].append(tf)
+            self._rows += 1
+        # JSON 编码会转义换行，一行恰好对应一个元素
+        for name, values in zip(self._SPOOLED, (ids, documents, metadatas)):
+            self._files[name].writelines(f"{_dump_json(value)}\n" for value in values)
+
+    def save(self, path: Path) -> dict[str, int]:
+        """写入 JSON 文件（临时文件 + 原子替换），返回岗位数与词项数。"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f'{{"format":{INDEX_FORMAT}')
+            for name in self._SPOOLED:
+                spool = self._files[name]
+                spool.flush()
+                spool.seek(0)
+                f.write(f',"{name}":[')
+                for row, line in enumerate(spool):
+                    f.write(f",{line[:-1]}" if row else line[:-1])
+                f.write("]")
+                spool.seek(0, os.SEEK_END)
+            f.write(f',"lengths":{_dump_json(self._lengths.tolist())},"postings":{{')
+            for position, (term, (rows, tfs)) in enumerate(self._postings.items()):
+                entry = f"{_dump_json(term)}:{_dump_json([rows.tolist(), tfs.tolist()])}"
+                f.write(f",{entry}" if position else entry)
+            f.write("}}")
+        os.replace(tmp_path, path)
+        return {"jobs": self._rows, "terms": len(self._postings)}
+
+    def close(self) -> None:
+        for spool in self._files.values():
+            spool.close()
+        self._spool.cleanup()
+
+
+_INDEX_KEY = "keyword_index"
+_reload_lock = threading.Lock()
+
+
+def _index_version() -> str:
+    path = Path(settings.chroma_persist_directory) / KEYWORD_INDEX_FILE
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return f"collection:{chroma_version()}"
+    return f"file:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _load_index(version: str) -> KeywordIndex:
+    started = time.perf_counter()
+    if version.startswith("file:"):
+        index = KeywordIndex.load(Path(settings.chroma_persist_directory) / KEYWORD_INDEX_FILE, version=version)
+    else:
+        collection = get_vector_store()._collection  # type: ignore[attr-defined]
+        index = KeywordIndex.from_collection(collection, version=version)
+    logger.info("关键词索引已加载：%s 个岗位，用时 %.2fs", len(index), time.perf_counter() - started)
+    return index
+
+
+def get_keyword_index() -> KeywordIndex:
+    """返回进程内共享的关键词索引，索引文件或 Chroma 目录变化后自动重载（加载策略同 `get_job_index`）。"""
+    version = _index_version()
+    current: Optional[KeywordIndex] = registry.get(_INDEX_KEY)
+    if current is not None and current.version == version:
+        return current
+
+    if current is not None and not _reload_lock.acquire(blocking=False):
+        return current
+    if current is None:
+        _reload_lock.acquire()
+    try:
+        latest: Optional[KeywordIndex] = registry.get(_INDEX_KEY)
+        if latest is not None and latest.version == version:
+            return latest
+        return registry.replace(_INDEX_KEY, _load_index(version))
+    finally:
+        _reload_lock.release()
+
+
+def get_keyword_index_stats() -> dict[str, Any]:
+    index: Optional[KeywordIndex] = registry.get(_INDEX_KEY)
+    return index.stats() if index is not None else {"loaded": False}
@@ -2,67 +2,113 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import os
 import sqlite3
-from typing import Iterable, List, Optional
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
 
 if sqlite3.sqlite_version_info < (3, 35, 0):  # 某些宿主环境 sqlite 较旧，跳过 Chroma 的启动检查
     sqlite3.sqlite_version_info = (3, 35, 0)
     sqlite3.sqlite_version = "3.35.0"
 
 import chromadb
+from chromadb.api.client import SharedSystemClient
 from langchain_core.embeddings import Embeddings
 from langchain_community.vectorstores import Chroma
 from chromadb.config import Settings as ChromaSettings
 from openai import OpenAI
 
 from app.core.config import settings
-from app.utils.retry import run_with_retry
+from app.services.embedding_engine import EmbeddingEngine, EmbeddingRunStats
+from app.services.embedding_store import get_embedding_store
+from app.services.registry import registry
+
+
+T = TypeVar("T")
+
+_CHROMA_FILES = ("chroma.sqlite3", "chroma.sqlite3-wal")
+_store_lock = threading.Lock()
 
 
 class DashscopeEmbeddings(Embeddings):
     """LangChain embeddings wrapper around DashScope-compatible OpenAI client."""
 
-    def __init__(self, model: Optional[str] = None) -> None:
-        self._client = OpenAI(
-            api_key=settings.dashscope_api_key,
-            base_url=settings.dashscope_base_url,
-        )
+    def __init__(self, model: Optional[str] = None, client: Optional[OpenAI] = None) -> None:
+        self._client = client or registry.openai_client()
         self._model = model or settings.dashscope_embedding_model
+        self._engine = EmbeddingEngine(self._client, self._model)
+
+    @property
+    def stats(self) -> EmbeddingRunStats:
+        """Throughput counters of the underlying batching engine."""
+        return self._engine.stats
 
     def embed_documents(self, texts: Iterable[str]) -> List[List[float]]:
         batch = list(texts)
         if not batch:
             return []
-        embeddings: List[List[float]] = []
-        max_batch = 10
-        for start in range(0, len(batch), max_batch):
-            chunk = batch[start : start + max_batch]
-            response = run_with_retry(
-                self._client.embeddings.create,
-                model=self._model,
-                input=chunk,
-            )
-            embeddings.extend(item.embedding for item in response.data)
-
-        return embeddings
+        store = get_embedding_store()
+        if store is None:
+            return self._embed_remote(batch)
+        # Read through the persistent store; only unseen texts hit the API.
+        return store.get_or_embed(self._model, batch, self._embed_remote)
 
     def embed_query(self, text: str) -> List[float]:
-        response = run_with_retry(
-            self._client.embeddings.create,
-            model=self._model,
-            input=text,
-        )
-        return response.data[0].embedding
+        store = get_embedding_store()
+        if store is None:
+            return self._embed_remote([text])[0]
+        return store.get_or_embed(self._model, [text], self._embed_remote)[0]
 
+    def _embed_remote(self, batch: List[str]) -> List[List[float]]:
+        return self._engine.embed(batch)
 
-def get_vector_store(
-    embedding_model: Optional[str] = None,
-    persist_directory: Optional[str] = None,
-) -> Chroma:
-    """Return a persistent Chroma store configured for this project."""
+    def close(self) -> None:
+        self._engine.shutdown()
+
+
+@dataclass
+class _PooledStore:
+    store: Chroma
+    version: str
+
+
+def chroma_version(persist_directory: Optional[str] = None) -> str:
+    """Cheap stamp of the on-disk Chroma files; changes when ETL swaps or writes the store."""
+
+    directory = Path(persist_directory or settings.chroma_persist_directory)
+    parts = []
+    for name in _CHROMA_FILES:
+        try:
+            stat = os.stat(directory / name)
+        except FileNotFoundError:
+            continue
+        parts.append(f"{name}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts) or "empty"
+
+
+def knowledge_base_version(persist_directory: Optional[str] = None) -> str:
+    """Short digest of :func:`chroma_version`, suitable for cache keys."""
+
+    return hashlib.sha1(chroma_version(persist_directory).encode("utf-8")).hexdigest()[:12]
+
+
+def get_embeddings(embedding_model: Optional[str] = None) -> DashscopeEmbeddings:
+    """Return the process-wide embeddings wrapper for the given model."""
 
-    embeddings = DashscopeEmbeddings(model=embedding_model)
-    directory = persist_directory or str(settings.chroma_persist_directory)
+    model = embedding_model or settings.dashscope_embedding_model
+    return registry.get_or_create(
+        f"embeddings:{model}",
+        lambda: DashscopeEmbeddings(model=model),
+        closer=lambda embeddings: embeddings.close(),
+    )
+
+
+def _build_vector_store(embeddings: DashscopeEmbeddings, directory: str) -> Chroma:
     client = chromadb.PersistentClient(
         path=directory,
         settings=ChromaSettings(
@@ -75,3 +121,44 @@ def get_vector_store(
         embedding_function=embeddings,
         client=client,
     )
+
+
+def get_vector_store(
+    embedding_model: Optional[str] = None,
+    persist_directory: Optional[str] = None,
+) -> Chroma:
+    """Return a persistent Chroma store configured for this project.
+
+    The default directory is served from a process-wide pooled instance that is
+    reopened only when the files on disk change (e.g. after ``scripts/ETL.py``).
+    Any other directory (such as the ETL staging dir) gets a one-off store.
+    """
+
+    embeddings = get_embeddings(embedding_model)
+    default_directory = str(settings.chroma_persist_directory)
+    directory = persist_directory or default_directory
+    if Path(directory).resolve() != Path(default_directory).resolve():
+        return _build_vector_store(embeddings, directory)
+
+    key = f"vector_store:{embeddings._model}"
+
+    def _open() -> _PooledStore:
+        store = _build_vector_store(embeddings, directory)
+        return _PooledStore(store=store, version=chroma_version(directory))
+
+    with _store_lock:
+        pooled = registry.get_or_create(key, _open)
+        if pooled.version != chroma_version(directory):
+            # Directory was rebuilt or updated by another process: drop Chroma's
+            # per-path system cache so the next client sees the new files.
+            registry.discard(key)
+            SharedSystemClient.clear_system_cache()
+            pooled = registry.get_or_create(key, _open)
+    return pooled.store
+
+
+async def run_in_chroma_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking Chroma call on the dedicated, bounded executor."""
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(registry.chroma_executor(), functools.partial(func, *args, **kwargs))
@@ -0,0 +1,271 @@
+"""
+quantized_index.py
+量化岗位向量：把 Chroma 中的分块向量导出为紧凑的 .npy 文件（float16，或 int8 + 每行缩放系数），
+以只读 mmap 方式加载——多个 uvicorn worker 共享同一份页缓存，不再各自持有一份 float32 矩阵。
+
+- 检索直接在量化数据上分块计算相似度；
+- 可选保留 float32 副本（同样 mmap），仅对量化打分的前若干候选精排，只有被访问的行会进入内存；
+- 导出文件随 Chroma 目录一起由 `scripts/ETL.py` 生成（`MATCH_INDEX_BACKEND=quantized` 或 `--export-vectors`）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from app.services.job_index import JobVectorIndex, collection_space, top_k_rows
+from app.services.similarity import normalize_rows
+
+
+VECTORS_DIR = "vectors"
+VECTORS_FORMAT = 1
+QUANTIZED_DTYPES = ("int8", "float16")
+
+_META_FILE = "meta.json"
+_CODES_FILE = "codes.npy"
+_SCALES_FILE = "scales.npy"
+_FLOAT32_FILE = "float32.npy"
+_EXPORT_PAGE_SIZE = 2000
+# 分块转换的行数：缓冲区（1024 行 × 1024 维 ≈ 4 MB float32）可留在 CPU 缓存中并在各块间复用
+_SCORE_BLOCK_ROWS = 1024
+
+
+def quantize_rows(matrix: np.ndarray, dtype: str) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """量化已归一化的行：float16 直接转换；int8 按每行最大绝对值缩放到 [-127, 127]。
+
+    Returns:
+        (量化后的矩阵, int8 的每行缩放系数；float16 为 None)。
+    """
+    if dtype == "float16":
+        return matrix.astype(np.float16), None
+    if dtype != "int8":
+        raise ValueError(f"不支持的量化类型: {dtype}")
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def vectors_stamp(directory: Path) -> str:
+    """导出文件的版本戳，文件被重新导出后变化；不存在时返回空字符串。"""
+    try:
+        stat = os.stat(Path(directory) / VECTORS_DIR / _META_FILE)
+    except FileNotFoundError:
+        return ""
+    return f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def export_vectors(collection: Any, directory: Path, dtype: str = "int8", keep_float32: bool = True) -> dict[str, Any]:
+    """分页读取集合并写出量化向量（边读边写入预分配的 .npy，内存占用与集合大小无关）。
+
+    先写入同级临时目录再替换 ``<directory>/vectors``，读取方不会看到写了一半的文件。
+
+    Args:
+        collection: Chroma collection 实例。
+        directory: 知识库目录（通常为 Chroma 持久化目录）。
+        dtype: ``int8`` 或 ``float16``。
+        keep_float32: 是否同时写出 float32 副本供精排使用。
+
+    Returns:
+        dict: 导出统计（分块数、维度、各文件字节数）。
+    """
+    if dtype not in QUANTIZED_DTYPES:
+        raise ValueError(f"不支持的量化类型: {dtype}")
+    target = Path(directory) / VECTORS_DIR
+    staging = target.with_name(f".{VECTORS_DIR}.{os.getpid()}.tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    total = collection.count()
+    ids: list[str] = []
+    documents: list[str] = []
+    metadatas: list[dict] = []
+    codes = scales = full = None
+    offset = 0
+    while offset < total:
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=_EXPORT_PAGE_SIZE,
+            offset=offset,
+        )
+        page_ids = page.get("ids") or []
+        if not page_ids:
+            break
+        rows = normalize_rows(np.asarray(page["embeddings"], dtype=np.float32))
+        if codes is None:
+            dimension = rows.shape[1]
+            codes = np.lib.format.open_memmap(staging / _CODES_FILE, mode="w+", dtype=dtype, shape=(total, dimension))
+            if dtype == "int8":
+                scales = np.lib.format.open_memmap(staging / _SCALES_FILE, mode="w+", dtype=np.float32, shape=(total,))
+            if keep_float32:
+                full = np.lib.format.open_memmap(staging / _FLOAT32_FILE, mode="w+", dtype=np.float32, shape=(total, dimension))
+        end = offset + len(page_ids)
+        page_codes, page_scales = quantize_rows(rows, dtype)
+        codes[offset:end] = page_codes
+        if scales is not None:
+            scales[offset:end] = page_scales
+        if full is not None:
+            full[offset:end] = rows
+        ids.extend(page_ids)
+        documents.extend(page.get("documents") or [""] * len(page_ids))
+        metadatas.extend(meta or {} for meta in (page.get("metadatas") or [{}] * len(page_ids)))
+        offset = end
+
+    for array in (codes, scales, full):
+        if array is not None:
+            array.flush()
+    meta = {
+        "format": VECTORS_FORMAT,
+        "dtype": dtype,
+        "count": len(ids),
+        "dimension": int(codes.shape[1]) if codes is not None else 0,
+        "space": collection_space(collection),
+        "float32": full is not None,
+        "ids": ids,
+        "documents": documents,
+        "metadatas": metadatas,
+    }
+    with open(staging / _META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    if target.exists():
+        retired = target.with_name(f".{VECTORS_DIR}.{os.getpid()}.old")
+        os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    return {
+        "chunks": meta["count"],
+        "dimension": meta["dimension"],
+        "dtype": dtype,
+        "bytes": {path.name: path.stat().st_size for path in sorted(target.iterdir())},
+    }
+
+
+class QuantizedJobIndex(JobVectorIndex):
+    """以 mmap 量化向量为底的岗位索引，接口与 :class:`JobVectorIndex` 相同。
+
+    Args:
+        rescore: 量化打分后取 ``top_k × rescore`` 个候选用 float32 副本精排；0 或无副本时不精排。
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        codes: np.ndarray,
+        scales: Optional[np.ndarray] = None,
+        full: Optional[np.ndarray] = None,
+        space: str = "l2",
+        version: str = "",
+        rescore: int = 0,
+    ) -> None:
+        if codes.shape[0] != len(ids):
+            raise ValueError("向量数量与 ID 数量不一致")
+        self._set_records(ids, documents, metadatas, space, version)
+        self.codes = codes
+        self.scales = scales
+        self.full = full
+        self.rescore = max(0, rescore)
+
+    @classmethod
+    def load(cls, directory: Path, version: str = "", rescore: int = 0) -> "QuantizedJobIndex":
+        """以只读 mmap 打开 ``<directory>/vectors`` 下的导出文件。"""
+        root = Path(directory) / VECTORS_DIR
+        with open(root / _META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != VECTORS_FORMAT:
+            raise ValueError(f"不支持的向量导出格式: {meta.get('format')}")
+        codes = np.load(root / _CODES_FILE, mmap_mode="r")
+        scales = np.load(root / _SCALES_FILE, mmap_mode="r") if meta["dtype"] == "int8" else None
+        full = np.load(root / _FLOAT32_FILE, mmap_mode="r") if meta.get("float32") and rescore > 0 else None
+        return cls(
+            meta["ids"],
+            meta["documents"],
+            meta["metadatas"],
+            codes,
+            scales=scales,
+            full=full,
+            space=meta.get("space", "l2"),
+            version=version,
+            rescore=rescore,
+        )
+
+    @property
+    def dimension(self) -> int:
+        return int(self.codes.shape[1]) if self.codes.ndim == 2 else 0
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """float32 视图（有副本时为 mmap，否则反量化），供基准脚本等非热路径使用。"""
+        if self.full is not None:
+            return self.full
+        return self._dequantize(slice(None))
+
+    def _dequantize(self, rows: slice | np.ndarray) -> np.ndarray:
+        block = np.asarray(self.codes[rows], dtype=np.float32)
+        if self.scales is not None:
+            block *= np.asarray(self.scales[rows])[:, None]
+        return block
+
+    def _similarities(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        count = len(self) if rows is None else int(rows.size)
+        scores = np.empty((queries.shape[0], count), dtype=np.float32)
+        # 逐块转换到复用的 float32 缓冲区再做矩阵乘法；int8 的行缩放在得分上乘（n 次而非 n × d 次）
+        buffer = np.empty((min(_SCORE_BLOCK_ROWS, count), self.dimension), dtype=np.float32)
+        for start in range(0, count, _SCORE_BLOCK_ROWS):
+            end = min(start + _SCORE_BLOCK_ROWS, count)
+            block = buffer[: end - start]
+            np.copyto(block, self.codes[start:end] if rows is None else self.codes[rows[start:end]], casting="unsafe")
+            np.matmul(queries, block.T, out=scores[:, start:end])
+        if self.scales is not None:
+            scores *= self.scales if rows is None else self.scales[rows]
+        return scores
+
+    def search_many(
+        self,
+        queries: np.ndarray | Sequence[Sequence[float]],
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self.full is None or self.rescore <= 0 or k <= 0:
+            return super().search_many(queries, k, mask)
+        candidates, _ = super().search_many(queries, k * self.rescore, mask)
+        if candidates.shape[1] == 0:
+            return candidates, np.zeros(candidates.shape, dtype=np.float32)
+        normalized = self._normalize_queries(queries)
+        exact = np.einsum("qcd,qd->qc", np.asarray(self.full[candidates]), normalized)
+        top, top_scores = top_k_rows(exact, min(k, candidates.shape[1]))
+        return np.take_along_axis(candidates, top, axis=1), top_scores
+
+    def get_job(self, job_id: str) -> dict[str, Any]:
+        rows = self._job_rows.get(job_id, np.zeros(0, dtype=np.int64))
+        embeddings = np.asarray(self.full[rows]) if self.full is not None else normalize_rows(self._dequantize(rows))
+        return {
+            "ids": [self.ids[i] for i in rows],
+            "documents": [self.documents[i] for i in rows],
+            "metadatas": list(self.metadatas[rows]),
+            "embeddings": embeddings if rows.size else np.zeros((0, self.dimension), dtype=np.float32),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        scales_bytes = int(self.scales.nbytes) if self.scales is not None else 0
+        return {
+            "chunks": len(self),
+            "dimension": self.dimension,
+            "space": self.space,
+            "dtype": str(self.codes.dtype),
+            "mapped_bytes": int(self.codes.nbytes) + scales_bytes,
+            "float32_mapped_bytes": int(self.full.nbytes) if self.full is not None else 0,
+            "rescore": self.rescore if self.full is not None else 0,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
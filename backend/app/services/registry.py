@@ -0,0 +1,216 @@
+"""
+registry.py
+进程级共享资源注册表：DashScope（OpenAI 兼容）同步/异步客户端、Chroma 线程池、简历解析进程池，
+以及向量库等按需注册的长生命周期对象。由 FastAPI lifespan 负责预热与关闭，
+避免每个请求重复建立 HTTP 连接池与打开 SQLite。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from openai import AsyncOpenAI, OpenAI
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+OPENAI_CLIENT = "openai"
+ASYNC_OPENAI_CLIENT = "async_openai"
+CHROMA_EXECUTOR = "chroma_executor"
+PARSE_EXECUTOR = "parse_executor"
+
+
+def _pool_stats(client: Any) -> dict[str, Any]:
+    """尽力读取底层 HTTP 连接池状态，内部结构变化时返回空字典。"""
+    try:
+        pool = client._client._transport._pool  # type: ignore[attr-defined]
+        connections = list(pool.connections)
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for conn in connections if conn.is_idle()),
+            "max_connections": getattr(pool, "_max_connections", None),
+            "max_keepalive_connections": getattr(pool, "_max_keepalive_connections", None),
+        }
+    except Exception:  # noqa: BLE001
+        return {}
+
+
+class ServiceRegistry:
+    """线程安全的单例资源容器，每种资源在进程内只创建一次。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._resources: dict[str, Any] = {}
+        self._closers: dict[str, Callable[[Any], Any]] = {}
+        self._created_at: dict[str, float] = {}
+        self._creations: dict[str, int] = {}
+        self._lookups = 0
+
+    def get_or_create(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        closer: Optional[Callable[[T], Any]] = None,
+    ) -> T:
+        """返回已注册资源；不存在时调用 `factory` 创建并登记关闭方法。"""
+        with self._lock:
+            self._lookups += 1
+            if name in self._resources:
+                return self._resources[name]
+            resource = factory()
+            self._resources[name] = resource
+            self._created_at[name] = time.time()
+            self._creations[name] = self._creations.get(name, 0) + 1
+            if closer is not None:
+                self._closers[name] = closer
+            return resource
+
+    def get(self, name: str) -> Optional[Any]:
+        """返回已注册资源，不存在时返回 None（不会创建）。"""
+        with self._lock:
+            return self._resources.get(name)
+
+    def replace(self, name: str, resource: T, closer: Optional[Callable[[T], Any]] = None) -> T:
+        """原子替换资源（旧对象不关闭，仍在使用它的调用方可自然结束）。"""
+        with self._lock:
+            self._resources[name] = resource
+            self._created_at[name] = time.time()
+            self._creations[name] = self._creations.get(name, 0) + 1
+            if closer is not None:
+                self._closers[name] = closer
+            else:
+                self._closers.pop(name, None)
+            return resource
+
+    def discard(self, name: str) -> Optional[Any]:
+        """移除资源（不关闭），返回被移除的对象。"""
+        with self._lock:
+            self._closers.pop(name, None)
+            self._created_at.pop(name, None)
+            return self._resources.pop(name, None)
+
+    def openai_client(self) -> OpenAI:
+        """共享的同步客户端，复用 keep-alive 连接池。"""
+        return self.get_or_create(
+            OPENAI_CLIENT,
+            lambda: OpenAI(api_key=settings.dashscope_api_key, base_url=settings.dashscope_base_url),
+            closer=lambda client: client.close(),
+        )
+
+    def async_openai_client(self) -> AsyncOpenAI:
+        """共享的异步客户端，所有协程共用同一事件循环上的连接池。"""
+        return self.get_or_create(
+            ASYNC_OPENAI_CLIENT,
+            lambda: AsyncOpenAI(api_key=settings.dashscope_api_key, base_url=settings.dashscope_base_url),
+            closer=lambda client: client.close(),
+        )
+
+    def chroma_executor(self) -> ThreadPoolExecutor:
+        """阻塞 Chroma 调用专用的有界线程池。"""
+        return self.get_or_create(
+            CHROMA_EXECUTOR,
+            lambda: ThreadPoolExecutor(
+                max_workers=settings.chroma_executor_workers,
+                thread_name_prefix="chroma",
+            ),
+            closer=lambda executor: executor.shutdown(wait=False),
+        )
+
+    def parse_executor(self) -> Executor:
+        """简历解析专用执行器：默认为独立进程，避免 pdfminer 长时间占用 GIL 拖慢事件循环。"""
+
+        def _create() -> Executor:
+            if settings.resume_parse_processes <= 0:
+                return ThreadPoolExecutor(max_workers=settings.resume_job_workers, thread_name_prefix="parse")
+            # spawn：子进程不继承父进程中的线程与连接池
+            return ProcessPoolExecutor(
+                max_workers=settings.resume_parse_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return self.get_or_create(
+            PARSE_EXECUTOR,
+            _create,
+            closer=lambda executor: executor.shutdown(wait=False, cancel_futures=True),
+        )
+
+    def startup(self, warmups: tuple[Callable[[], Any], ...] = ()) -> None:
+        """预热基础客户端及调用方传入的资源，预热失败只记录日志。"""
+        self.openai_client()
+        self.async_openai_client()
+        self.chroma_executor()
+        for warmup in warmups:
+            try:
+                warmup()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("资源预热失败：%s", exc)
+
+    async def aclose(self) -> None:
+        """关闭全部资源，支持同步与异步关闭方法。"""
+        with self._lock:
+            items = [(name, self._resources[name], self._closers.get(name)) for name in list(self._resources)]
+            self._resources.clear()
+            self._closers.clear()
+            self._created_at.clear()
+
+        for name, resource, closer in items:
+            if closer is None:
+                continue
+            try:
+                result = closer(resource)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("关闭资源 %s 失败：%s", name, exc)
+
+    def close(self) -> None:
+        """同步关闭入口，供脚本等无事件循环的场景使用。"""
+        asyncio.run(self.aclose())
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            resources = dict(self._resources)
+            created_at = dict(self._created_at)
+            creations = dict(self._creations)
+            lookups = self._lookups
+
+        pools = {
+            name: _pool_stats(resources[name])
+            for name in (OPENAI_CLIENT, ASYNC_OPENAI_CLIENT)
+            if name in resources
+        }
+        executor = resources.get(CHROMA_EXECUTOR)
+        if executor is not None:
+            pools[CHROMA_EXECUTOR] = {
+                "max_workers": executor._max_workers,  # type: ignore[attr-defined]
+                "threads": len(executor._threads),  # type: ignore[attr-defined]
+                "queued": executor._work_queue.qsize(),  # type: ignore[attr-defined]
+            }
+        parse_executor = resources.get(PARSE_EXECUTOR)
+        if parse_executor is not None:
+            pools[PARSE_EXECUTOR] = {
+                "kind": "process" if isinstance(parse_executor, ProcessPoolExecutor) else "thread",
+                "max_workers": parse_executor._max_workers,  # type: ignore[attr-defined]
+            }
+        return {
+            "lookups": lookups,
+            "resources": {
+                name: {"created_at": created_at.get(name), "creations": creations.get(name, 0)}
+                for name in resources
+            },
+            "pools": pools,
+        }
+
+
+registry = ServiceRegistry()
@@ -2,18 +2,124 @@
 report_generator.py
 生成岗位匹配分析报告 (HTML)
 模板: templates/report_template.html
+
+模板只编译一次（调试模式下检测到模板文件变化时自动重新加载）；
+报告文件名包含渲染输入与模板内容的摘要，相同内容的报告直接复用，写入采用临时文件 + 原子替换。
 """
 
-from jinja2 import Environment, FileSystemLoader
-from pathlib import Path
-from datetime import datetime
+from __future__ import annotations
+
+import hashlib
+import json
 import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template
+
 from app.core.config import settings
 
 
 TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+TEMPLATE_NAME = "report_template.html"
 REPORT_DIR = Path(settings.reports_directory)
 
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+_NAME_LIMIT = 40
+
+
+def _safe_name(value: Any) -> str:
+    return _UNSAFE_CHARS.sub("_", str(value or "")).strip("._")[:_NAME_LIMIT] or "未命名"
+
+
+class ReportRenderer:
+    """缓存已编译模板的报告渲染器，线程安全。"""
+
+    def __init__(
+        self,
+        template_dir: Path = TEMPLATE_DIR,
+        output_dir: Path = REPORT_DIR,
+        template_name: str = TEMPLATE_NAME,
+        auto_reload: Optional[bool] = None,
+    ) -> None:
+        self._auto_reload = settings.debug if auto_reload is None else auto_reload
+        self._env = Environment(loader=FileSystemLoader(str(template_dir)), auto_reload=self._auto_reload)
+        self._template_name = template_name
+        self._output_dir = Path(output_dir)
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._template: Optional[Template] = None
+        self._template_digest = ""
+        self._rendered = 0
+        self._reused = 0
+
+    def _current_template(self) -> tuple[Template, str]:
+        with self._lock:
+            if self._template is None or (self._auto_reload and not self._template.is_up_to_date):
+                template = self._env.get_template(self._template_name)
+                source = Path(template.filename).read_bytes() if template.filename else b""
+                self._template = template
+                self._template_digest = hashlib.sha256(source).hexdigest()[:12]
+            return self._template, self._template_digest
+
+    def report_path(self, data: dict) -> Path:
+        """由渲染输入与模板摘要计算报告路径，相同输入始终得到同一文件。"""
+        _, template_digest = self._current_template()
+        payload = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+        digest = hashlib.sha256(f"{template_digest}\n{payload}".encode("utf-8")).hexdigest()[:16]
+        filename = f"{_safe_name(data.get('resume_name'))}_{_safe_name(data.get('job_title'))}_{digest}.html"
+        return self._output_dir / filename
+
+    def render(self, data: dict) -> str:
+        template, _ = self._current_template()
+        return template.render({
+            **data,
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "score_percent": int(data.get("similarity_score", 0) * 100),
+        })
+
+    def generate(self, data: dict) -> str:
+        """渲染并写入报告；同内容报告已存在时直接返回其路径。"""
+        report_path = self.report_path(data)
+        if report_path.exists():
+            with self._lock:
+                self._reused += 1
+            return str(report_path)
+
+        html_content = self.render(data)
+        tmp_path = report_path.with_name(f".{report_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+        os.replace(tmp_path, report_path)
+        with self._lock:
+            self._rendered += 1
+        return str(report_path)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "template_digest": self._template_digest,
+                "auto_reload": self._auto_reload,
+                "rendered": self._rendered,
+                "reused": self._reused,
+            }
+
+
+_renderer: Optional[ReportRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_report_renderer() -> ReportRenderer:
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ReportRenderer()
+    return _renderer
+
 
 def generate_report(data: dict) -> str:
     """
@@ -31,28 +137,11 @@ def generate_report(data: dict) -> str:
             "recommendations": "建议加强容器化相关经验。"
         }
     返回:
-        报告HTML文件路径
+        报告HTML文件路径（形如 `张三_后端工程师_<摘要>.html`，内容相同的报告复用同一文件）
     """
+    return get_report_renderer().generate(data)
 
-    # 确保目录存在
-    os.makedirs(REPORT_DIR, exist_ok=True)
-
-    env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
-    template = env.get_template("report_template.html")
-
-    render_data = {
-        **data,
-        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "score_percent": int(data.get("similarity_score", 0) * 100)
-    }
-
-    html_content = template.render(render_data)
-
-    # 报告文件路径
-    filename = f"{data['resume_name']}_{data['job_title']}_匹配报告.html"
-    report_path = REPORT_DIR / filename
-
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
 
-    return str(report_path)
+def get_report_stats() -> dict[str, Any]:
+    """返回报告渲染统计，供诊断接口使用。"""
+    return get_report_renderer().stats()
@@ -4,18 +4,11 @@
 """
 
 import json
-from openai import OpenAI
 from app.core.config import settings
+from app.services.registry import registry
 from app.utils.retry import run_with_retry
 
 
-# 初始化百炼客户端
-client = OpenAI(
-    api_key=settings.dashscope_api_key,
-    base_url=settings.dashscope_base_url
-)
-
-
 def extract_resume_info(text: str) -> dict:
     """
     使用 LLM 从简历文本中提取结构化信息
@@ -73,7 +66,7 @@ def extract_resume_info(text: str) -> dict:
     """
 
     response = run_with_retry(
-        client.chat.completions.create,
+        registry.openai_client().chat.completions.create,
         model=settings.dashscope_model,
         messages=[
             {"role": "system", "content": "你是一名结构化信息抽取专家。"},
@@ -0,0 +1,321 @@
+"""
+resume_jobs.py
+简历处理流水线与后台任务队列：上传文件落盘后立即返回任务 ID，
+由固定数量的 worker 依次执行 解析 → LLM 抽取 → 保存 三个阶段。
+解析在独立进程池中运行，LLM 抽取与文件读写在线程中运行，均不阻塞事件循环。
+解析文本与抽取结果按文件摘要写入简历存储，重复上传可直接复用。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.services.registry import PARSE_EXECUTOR, registry
+from app.services.resume_extractor import extract_resume_info, save_resume_json
+from app.services.resume_parser import parse_resume
+from app.services.resume_store import get_resume_store
+
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "resume_jobs"
+
+STAGE_QUEUED = "queued"
+STAGE_PARSE = "parse"
+STAGE_EXTRACT = "extract"
+STAGE_SAVE = "save"
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+
+# 各阶段对应的进度百分比，供前端展示
+_STAGE_PROGRESS = {
+    STAGE_QUEUED: 0,
+    STAGE_PARSE: 10,
+    STAGE_EXTRACT: 40,
+    STAGE_SAVE: 90,
+    STAGE_DONE: 100,
+    STAGE_FAILED: 100,
+}
+
+
+class ResumeQueueFull(RuntimeError):
+    """排队任务数达到上限。"""
+
+
+class ResumeParseError(RuntimeError):
+    """简历文件解析失败（文件损坏或格式不支持）。"""
+
+
+async def _parse_in_executor(file_path: str) -> str:
+    """在解析进程池中执行；子进程异常退出导致进程池失效时重建一次后重试。"""
+    loop = asyncio.get_running_loop()
+    executor = registry.parse_executor()
+    try:
+        return await loop.run_in_executor(executor, parse_resume, file_path)
+    except BrokenProcessPool:
+        logger.warning("简历解析进程池已失效，重建后重试")
+        if registry.get(PARSE_EXECUTOR) is executor:
+            registry.discard(PARSE_EXECUTOR)
+            executor.shutdown(wait=False, cancel_futures=True)
+        return await loop.run_in_executor(registry.parse_executor(), parse_resume, file_path)
+
+
+async def process_resume_file(
+    upload_path: Path,
+    json_path: Path,
+    on_stage: Optional[Callable[[str], None]] = None,
+    digest: Optional[str] = None,
+    text: Optional[str] = None,
+) -> dict:
+    """执行完整流水线并返回抽取结果；上传的原始文件在解析后删除。
+
+    传入 `digest` 时把解析文本与抽取结果写入简历存储；`text` 为存储中已有的解析文本，
+    提供时跳过解析阶段。只有解析本身失败时抛出 `ResumeParseError`，简历存储的读写错误原样抛出。
+    """
+    notify = on_stage or (lambda stage: None)
+    store = get_resume_store() if digest else None
+
+    notify(STAGE_PARSE)
+    if text is None:
+        try:
+            text = await _parse_in_executor(str(upload_path))
+        except Exception as exc:  # noqa: BLE001
+            raise ResumeParseError(f"解析文件失败: {exc}") from exc
+        finally:
+            upload_path.unlink(missing_ok=True)
+        # 存储写入失败（磁盘、SQLite）属于服务端故障，原样抛出，不归为文件解析失败
+        if store is not None:
+            await asyncio.to_thread(store.put, digest, text=text)
+    else:
+        upload_path.unlink(missing_ok=True)
+
+    notify(STAGE_EXTRACT)
+    extracted_data = await asyncio.to_thread(extract_resume_info, text)
+    if store is not None:
+        await asyncio.to_thread(store.put, digest, resume_data=extracted_data)
+
+    notify(STAGE_SAVE)
+    await asyncio.to_thread(save_resume_json, extracted_data, str(json_path))
+    return extracted_data
+
+
+async def reuse_stored_resume(upload_path: Path, json_path: Path, resume_data: dict) -> dict:
+    """简历存储命中时只需写出本次文件名对应的 JSON。"""
+    upload_path.unlink(missing_ok=True)
+    await asyncio.to_thread(save_resume_json, resume_data, str(json_path))
+    return resume_data
+
+
+@dataclass
+class ResumeJob:
+    """单个后台简历任务的状态。"""
+
+    job_id: str
+    filename: str
+    upload_path: Path
+    json_path: Path
+    digest: Optional[str] = None
+    text: Optional[str] = field(default=None, repr=False)
+    deduplicated: bool = False
+    stage: str = STAGE_QUEUED
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if self.stage == STAGE_QUEUED:
+            return "queued"
+        if self.stage == STAGE_DONE:
+            return "succeeded"
+        if self.stage == STAGE_FAILED:
+            return "failed"
+        return "running"
+
+    @property
+    def finished(self) -> bool:
+        return self.stage in (STAGE_DONE, STAGE_FAILED)
+
+    def as_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": _STAGE_PROGRESS.get(self.stage, 0),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "deduplicated": self.deduplicated,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.stage == STAGE_DONE:
+            data["result"] = {
+                "filename": self.filename,
+                "json_file": str(self.json_path),
+                "resume_data": self.result,
+            }
+        return data
+
+
+class ResumeJobQueue:
+    """有界的异步任务队列，worker 在首次提交时于当前事件循环上启动。"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retention: Optional[int] = None,
+    ) -> None:
+        self.workers = max(1, workers or settings.resume_job_workers)
+        self.max_pending = max(1, max_pending or settings.resume_job_queue_size)
+        self.retention = settings.resume_job_retention if retention is None else retention
+        self._jobs: dict[str, ResumeJob] = {}
+        self._queue: Optional[asyncio.Queue[ResumeJob]] = None
+        self._tasks: list[asyncio.Task] = []
+        self._completed = 0
+        self._failed = 0
+
+    def _ensure_started(self) -> asyncio.Queue[ResumeJob]:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"resume-job-{index}")
+                for index in range(self.workers)
+            ]
+        return self._queue
+
+    def submit(
+        self,
+        filename: str,
+        upload_path: Path,
+        json_path: Path,
+        digest: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> ResumeJob:
+        """登记任务并放入队列；队列已满时抛出 `ResumeQueueFull`。"""
+        queue = self._ensure_started()
+        self._prune()
+        job = ResumeJob(
+            job_id=uuid.uuid4().hex,
+            filename=filename,
+            upload_path=upload_path,
+            json_path=json_path,
+            digest=digest,
+            text=text,
+        )
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull as exc:
+            raise ResumeQueueFull("简历处理队列已满，请稍后重试") from exc
+        self._jobs[job.job_id] = job
+        return job
+
+    def record_completed(self, filename: str, json_path: Path, resume_data: dict) -> ResumeJob:
+        """登记一个由简历存储直接命中、无需排队的已完成任务。"""
+        self._prune()
+        now = time.time()
+        job = ResumeJob(
+            job_id=uuid.uuid4().hex,
+            filename=filename,
+            upload_path=json_path,
+            json_path=json_path,
+            deduplicated=True,
+            stage=STAGE_DONE,
+            result=resume_data,
+            started_at=now,
+            finished_at=now,
+        )
+        self._jobs[job.job_id] = job
+        self._completed += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[ResumeJob]:
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ResumeJob) -> None:
+        job.started_at = time.time()
+
+        def _on_stage(stage: str) -> None:
+            job.stage = stage
+
+        try:
+            job.result = await process_resume_file(
+                job.upload_path,
+                job.json_path,
+                on_stage=_on_stage,
+                digest=job.digest,
+                text=job.text,
+            )
+            job.text = None
+            job.stage = STAGE_DONE
+            self._completed += 1
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("简历任务 %s 在 %s 阶段失败：%s", job.job_id, job.stage, exc)
+            job.error = str(exc)
+            job.stage = STAGE_FAILED
+            self._failed += 1
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        """清理超过保留时间的已完成任务。"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def stats(self) -> dict[str, Any]:
+        statuses: dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "tracked": len(self._jobs),
+            "by_status": statuses,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+
+def get_resume_job_queue() -> ResumeJobQueue:
+    """进程级共享队列，随 FastAPI lifespan 结束时取消 worker。"""
+    return registry.get_or_create(QUEUE_KEY, ResumeJobQueue, closer=lambda queue: queue.aclose())
+
+
+def get_resume_job_stats() -> dict[str, Any]:
+    queue: Optional[ResumeJobQueue] = registry.get(QUEUE_KEY)
+    return queue.stats() if queue is not None else {"workers": settings.resume_job_workers, "tracked": 0}
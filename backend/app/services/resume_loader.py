@@ -1,12 +1,16 @@
 """
 resume_loader.py
-负责读取解析好的简历 JSON 文件
+负责读取解析好的简历 JSON 文件，以及与之同目录保存的简历 embedding（`<简历名>.embedding.json`）
 """
 
 from pathlib import Path
 import json
+import os
+from typing import Optional
+
 from fastapi import HTTPException
 from app.core.config import settings
+from app.services.embedding_store import text_digest
 
 
 def load_resume_json(filename: str) -> dict:
@@ -17,3 +21,33 @@ def load_resume_json(filename: str) -> dict:
 
     with open(file_path, "r", encoding="utf-8") as f:
         return json.load(f)
+
+
+def resume_embedding_path(filename: str) -> Path:
+    return Path(settings.uploads_directory) / f"{Path(filename).stem}.embedding.json"
+
+
+def load_resume_embedding(filename: str, resume_text: str) -> Optional[list[float]]:
+    """读取简历 embedding；模型或匹配文本已变化（如重新上传）时返回 None。"""
+    try:
+        with open(resume_embedding_path(filename), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("model") != settings.dashscope_embedding_model or payload.get("text_sha256") != text_digest(resume_text):
+        return None
+    return payload.get("embedding") or None
+
+
+def save_resume_embedding(filename: str, resume_text: str, embedding: list[float]) -> None:
+    """与简历 JSON 一起保存 embedding，供各匹配接口复用（临时文件 + 原子替换）。"""
+    path = resume_embedding_path(filename)
+    payload = {
+        "model": settings.dashscope_embedding_model,
+        "text_sha256": text_digest(resume_text),
+        "embedding": [float(value) for value in embedding],
+    }
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
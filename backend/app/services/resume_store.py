@@ -0,0 +1,134 @@
+"""
+resume_store.py
+简历内容寻址存储：以上传文件字节的 sha256 为键，保存解析文本与 LLM 抽取结果。
+同一份简历重复上传时跳过 pdfminer 解析与抽取调用，直接返回已有结果。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from app.core.config import settings
+
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def copy_and_hash(source: BinaryIO, destination: Path) -> str:
+    """边复制边计算 sha256，返回十六进制摘要。"""
+    digest = hashlib.sha256()
+    with open(destination, "wb") as buffer:
+        while True:
+            chunk = source.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            buffer.write(chunk)
+    return digest.hexdigest()
+
+
+class ResumeStore:
+    """每个摘要对应目录下一个 JSON 文件：``{"text": ..., "resume_data": ..., "model": ...}``。"""
+
+    def __init__(self, directory: Path | str) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._text_hits = 0
+        self._misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self._directory / f"{digest}.json"
+
+    def _read(self, digest: str) -> dict:
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def lookup(self, digest: str, model: Optional[str] = None) -> tuple[Optional[str], Optional[dict]]:
+        """返回 (解析文本, 抽取结果)；抽取结果仅在模型一致时复用。"""
+        entry = self._read(digest)
+        text = entry.get("text")
+        resume_data = entry.get("resume_data")
+        if resume_data is not None and entry.get("model") != (model or settings.dashscope_model):
+            resume_data = None
+
+        with self._lock:
+            if resume_data is not None:
+                self._hits += 1
+            elif text is not None:
+                self._text_hits += 1
+            else:
+                self._misses += 1
+        return text, resume_data
+
+    def put(
+        self,
+        digest: str,
+        text: Optional[str] = None,
+        resume_data: Optional[dict] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        """合并写入条目，先写临时文件再原子替换，避免并发读到半截 JSON。"""
+        with self._lock:
+            entry = self._read(digest)
+            if text is not None:
+                entry["text"] = text
+            if resume_data is not None:
+                entry["resume_data"] = resume_data
+                entry["model"] = model or settings.dashscope_model
+            entry["updated_at"] = time.time()
+
+            path = self._path(digest)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def count(self) -> int:
+        return sum(1 for _ in self._directory.glob("*.json"))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits, text_hits, misses = self._hits, self._text_hits, self._misses
+        lookups = hits + text_hits + misses
+        return {
+            "entries": self.count(),
+            "hits": hits,
+            "text_hits": text_hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_store: Optional[ResumeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_resume_store() -> Optional[ResumeStore]:
+    """返回进程内共享的简历存储；配置关闭时返回 None。"""
+    global _store
+    if not settings.resume_store_enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResumeStore(settings.resume_store_directory)
+    return _store
+
+
+def get_resume_store_stats() -> dict[str, Any]:
+    """返回简历内容寻址存储的命中统计。"""
+    store = get_resume_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
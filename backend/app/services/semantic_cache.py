@@ -0,0 +1,170 @@
+"""
+semantic_cache.py
+语义 LLM 结果缓存：以（岗位等分区键, 简历 embedding）保存分析结果。
+新简历与同一岗位下已缓存简历的余弦相似度达到阈值时直接复用分析，
+每个分区的 embedding 保存在一块归一化矩阵中，查找只需一次矩阵-向量乘法。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+# 分区矩阵的初始行数；未满时按需倍增到单分区上限，只有一两条结果的分区不必预先分配整块矩阵
+_INITIAL_ROWS = 8
+
+
+class _Bucket:
+    """单个分区：归一化 embedding 矩阵（按行追加，满后覆盖最旧行）与对应结果。"""
+
+    __slots__ = ("matrix", "values", "capacity", "size", "cursor")
+
+    def __init__(self, dimension: int, capacity: int) -> None:
+        self.matrix = np.zeros((min(capacity, _INITIAL_ROWS), dimension), dtype=np.float32)
+        self.values: list[Any] = []
+        self.capacity = capacity
+        self.size = 0
+        self.cursor = 0
+
+    def best(self, query: np.ndarray) -> tuple[int, float]:
+        scores = self.matrix[: self.size] @ query
+        index = int(np.argmax(scores))
+        return index, float(scores[index])
+
+    def add(self, vector: np.ndarray, value: Any) -> None:
+        if self.size < self.capacity:
+            if self.size == len(self.matrix):
+                grown = np.zeros((min(self.capacity, 2 * self.size), self.matrix.shape[1]), dtype=np.float32)
+                grown[: self.size] = self.matrix
+                self.matrix = grown
+            self.matrix[self.size] = vector
+            self.values.append(value)
+            self.size += 1
+            return
+        # 已满：cursor 指向最旧的一行
+        self.matrix[self.cursor] = vector
+        self.values[self.cursor] = value
+        self.cursor = (self.cursor + 1) % self.capacity
+
+
+def _normalize(embedding: Sequence[float] | np.ndarray) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        return None
+    return vector / norm
+
+
+class SemanticCache:
+    """线程安全的近邻结果缓存。
+
+    - `threshold`：余弦相似度达到该值视为命中；
+    - `near_margin`：落在 [threshold - near_margin, threshold) 的查询计为“接近命中”，用于评估阈值；
+    - `max_entries_per_key` / `max_keys`：单分区条目上限（覆盖最旧）与分区数上限（LRU 淘汰）。
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        near_margin: float = 0.02,
+        max_entries_per_key: int = 256,
+        max_keys: int = 2048,
+    ) -> None:
+        self.threshold = threshold
+        self.near_margin = near_margin
+        self.max_entries_per_key = max(1, max_entries_per_key)
+        self.max_keys = max(1, max_keys)
+        self._buckets: OrderedDict[Hashable, _Bucket] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._near_hits = 0
+        self._misses = 0
+        self._hit_similarity = 0.0
+
+    def lookup(self, key: Hashable, embedding: Sequence[float] | np.ndarray) -> Optional[tuple[Any, float]]:
+        """返回 (缓存结果, 相似度)；未达到阈值时返回 None。"""
+        query = _normalize(embedding)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if query is None or bucket is None or bucket.size == 0 or bucket.matrix.shape[1] != query.shape[0]:
+                self._misses += 1
+                return None
+
+            self._buckets.move_to_end(key)
+            index, similarity = bucket.best(query)
+            if similarity >= self.threshold:
+                self._hits += 1
+                self._hit_similarity += similarity
+                return bucket.values[index], similarity
+            if similarity >= self.threshold - self.near_margin:
+                self._near_hits += 1
+            self._misses += 1
+            return None
+
+    def add(self, key: Hashable, embedding: Sequence[float] | np.ndarray, value: Any) -> None:
+        vector = _normalize(embedding)
+        if vector is None:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.matrix.shape[1] != vector.shape[0]:
+                bucket = _Bucket(vector.shape[0], self.max_entries_per_key)
+                self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            bucket.add(vector, value)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._hits = self._near_hits = self._misses = 0
+            self._hit_similarity = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "threshold": self.threshold,
+                "keys": len(self._buckets),
+                "entries": sum(bucket.size for bucket in self._buckets.values()),
+                "hits": self._hits,
+                "near_hits": self._near_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "avg_hit_similarity": round(self._hit_similarity / self._hits, 4) if self._hits else None,
+            }
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """返回进程内共享的语义缓存；配置未开启时返回 None。"""
+    global _cache
+    if not settings.semantic_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(
+                    threshold=settings.semantic_cache_threshold,
+                    near_margin=settings.semantic_cache_near_margin,
+                    max_entries_per_key=settings.semantic_cache_max_entries_per_job,
+                    max_keys=settings.semantic_cache_max_jobs,
+                )
+    return _cache
+
+
+def get_semantic_cache_stats() -> dict[str, Any]:
+    cache = get_semantic_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
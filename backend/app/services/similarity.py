@@ -0,0 +1,49 @@
+"""
+similarity.py
+纯 NumPy 的余弦相似度工具：一次矩阵-向量乘法为全部分块打分，不依赖 scikit-learn。
+已归一化的矩阵（如内存索引中的向量）可跳过归一化步骤。
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+VectorLike = Sequence[float] | np.ndarray
+MatrixLike = Sequence[Sequence[float]] | np.ndarray
+
+
+def normalize(vector: VectorLike) -> np.ndarray:
+    """返回 L2 归一化后的 float32 向量；零向量原样返回。"""
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
+
+
+def normalize_rows(matrix: MatrixLike) -> np.ndarray:
+    """逐行 L2 归一化（返回新的 float32 矩阵），零向量行保持为零。"""
+    array = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(array, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return array / norms
+
+
+def cosine_scores(query: VectorLike, matrix: MatrixLike, normalized: bool = False) -> np.ndarray:
+    """查询向量与 (n, d) 矩阵每一行的余弦相似度。
+
+    Args:
+        query: 查询向量（如简历 embedding）。
+        matrix: 候选向量矩阵（如岗位分块 embedding）。
+        normalized: 矩阵各行是否已归一化；为 True 时只做一次矩阵-向量乘法。
+    """
+    rows = np.asarray(matrix, dtype=np.float32) if normalized else normalize_rows(matrix)
+    if rows.size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return rows @ normalize(query)
+
+
+def cosine_similarity(vec1: VectorLike, vec2: VectorLike) -> float:
+    """两个向量的余弦相似度。"""
+    return float(np.dot(normalize(vec1), normalize(vec2)))
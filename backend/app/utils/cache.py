@@ -1,55 +1,293 @@
-"""简单的线程安全 TTL 缓存工具。"""
+"""简单的线程安全 TTL 缓存工具，支持条目数 / 近似内存上限的 LRU 淘汰、后台定期清理，
+以及未命中时的单飞（single-flight）计算：同一键的并发未命中只触发一次上游调用。"""
 
 from __future__ import annotations
 
+import asyncio
+import sys
 import threading
 import time
-from typing import Any, Hashable, Optional
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def approx_sizeof(value: Any) -> int:
+    """估算对象占用的字节数（含常见容器的一层元素），用于内存上限判断。"""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes + sys.getsizeof(value)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if value and isinstance(next(iter(value)), float):
+            # 浮点列表（embedding）：元素大小一致，按单个 float 乘以长度估算
+            return size + sys.getsizeof(0.0) * len(value)
+        return size + sum(approx_sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return size + sum(approx_sizeof(k) + approx_sizeof(v) for k, v in value.items())
+    return size
+
+
+class _Flight:
+    """同步单飞：领头线程计算，其余线程等待结果或异常。"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
 
 
 class TTLCache:
-    """支持过期淘汰的轻量缓存。"""
+    """支持过期淘汰的轻量缓存。
+
+    - `max_entries` / `max_bytes`：超出时按最近最少使用（LRU）淘汰；
+    - `set(..., ttl=)`：单个键可覆盖默认过期时间；
+    - `sweep_interval`：大于 0 时由后台守护线程定期清理过期条目；
+    - `get_or_compute` / `aget_or_compute`：同一键的并发未命中共享一次计算，失败不缓存并传递给全部等待方。
 
-    def __init__(self, ttl_seconds: int = 300) -> None:
+    过期判断使用单调时钟，不受系统时间调整影响。
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+        sizeof: Callable[[Any], int] = approx_sizeof,
+    ) -> None:
         self._ttl = ttl_seconds
-        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._max_entries = max_entries if max_entries and max_entries > 0 else None
+        self._max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self._sizeof = sizeof
+        self._clock = time.monotonic
+        # key -> (过期时刻, 近似字节数, 值)；顺序即 LRU 顺序，末尾为最近使用
+        self._data: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
         self._lock = threading.Lock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
+        self._flights: dict[Hashable, _Flight] = {}
+        self._async_flights: dict[Hashable, asyncio.Future] = {}
+        self._sweep_interval = sweep_interval if sweep_interval and sweep_interval > 0 else None
+        self._stop = threading.Event()
+        if self._sweep_interval is not None:
+            _start_sweeper(self, self._sweep_interval, self._stop)
 
     def get(self, key: Hashable) -> Optional[Any]:
-        now = time.time()
+        now = self._clock()
         with self._lock:
             item = self._data.get(key)
             if not item:
                 self._misses += 1
                 return None
 
-            expires_at, value = item
+            expires_at, _, value = item
             if expires_at < now:
-                self._data.pop(key, None)
+                self._remove(key)
+                self._expirations += 1
                 self._misses += 1
                 return None
 
+            self._data.move_to_end(key)
             self._hits += 1
             return value
 
-    def set(self, key: Hashable, value: Any) -> None:
-        expires_at = time.time() + self._ttl
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self._clock() + (self._ttl if ttl is None else ttl)
+        size = self._sizeof(key) + self._sizeof(value) if self._max_bytes is not None else 0
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            self._evict()
+
+    def _remove(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def _evict(self) -> None:
+        # 至少保留刚写入的一条，避免单个超大条目导致缓存反复清空
+        while len(self._data) > 1 and (
+            (self._max_entries is not None and len(self._data) > self._max_entries)
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            _, (_, size, _) = self._data.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T], ttl: Optional[float] = None) -> T:
+        """命中直接返回；未命中时同一键只由一个线程执行 `compute`，其余线程等待其结果。"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            if flight.value is not None:
+                self.set(key, flight.value, ttl=ttl)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def claim_flight(self, key: Hashable) -> tuple[asyncio.Future, bool]:
+        """登记异步计算，返回 (future, 是否为领头方)；领头方必须调用 `finish_flight`。"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._async_flights.get(key)
+            if future is not None and not future.done() and future.get_loop() is loop:
+                self._coalesced += 1
+                return future, False
+            future = loop.create_future()
+            self._async_flights[key] = future
+            return future, True
+
+    def finish_flight(
+        self,
+        key: Hashable,
+        future: asyncio.Future,
+        value: Any = None,
+        error: Optional[BaseException] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """领头方结束计算：成功时写入缓存并唤醒等待方，失败时只传递异常。"""
+        if error is None and value is not None:
+            self.set(key, value, ttl=ttl)
+        with self._lock:
+            if self._async_flights.get(key) is future:
+                del self._async_flights[key]
+        if future.done():
+            return
+        if isinstance(error, asyncio.CancelledError):
+            # 领头请求被取消（如客户端断开）：等待方重新竞争领头，而不是跟着失败
+            future.cancel()
+        elif error is not None:
+            future.set_exception(error)
+            future.exception()  # 无等待方时避免 "exception was never retrieved" 警告
+        else:
+            future.set_result(value)
+
+    @staticmethod
+    async def wait_flight(future: asyncio.Future) -> Any:
+        """等待领头方的结果；领头方被取消时返回 None，调用方应重新竞争。"""
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if future.cancelled():
+                return None
+            raise
+
+    async def aget_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[T]],
+        ttl: Optional[float] = None,
+    ) -> T:
+        """`get_or_compute` 的协程版本，等待方不占用线程。"""
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            future, leader = self.claim_flight(key)
+            if not leader:
+                value = await self.wait_flight(future)
+                if value is None:
+                    continue
+                return value
+
+            try:
+                value = await compute()
+            except BaseException as exc:
+                self.finish_flight(key, future, error=exc)
+                raise
+            self.finish_flight(key, future, value=value, ttl=ttl)
+            return value
+
+    def sweep(self) -> int:
+        """清理全部已过期条目，返回清理数量。"""
+        now = self._clock()
         with self._lock:
-            self._data[key] = (expires_at, value)
+            expired = [key for key, (expires_at, _, _) in self._data.items() if expires_at < now]
+            for key in expired:
+                self._remove(key)
+            self._expirations += len(expired)
+        return len(expired)
 
     def clear(self) -> None:
         with self._lock:
             self._data.clear()
+            self._bytes = 0
             self._hits = 0
             self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
+            self._coalesced = 0
+
+    def close(self) -> None:
+        """停止后台清理线程。"""
+        self._stop.set()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
 
     def stats(self) -> dict[str, Any]:
         with self._lock:
             return {
                 "ttl": self._ttl,
                 "size": len(self._data),
+                "bytes": self._bytes if self._max_bytes is not None else None,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
                 "hits": self._hits,
                 "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "coalesced": self._coalesced,
+                "inflight": len(self._flights) + len(self._async_flights),
             }
+
+
+def _start_sweeper(cache: TTLCache, interval: float, stop: threading.Event) -> None:
+    """启动守护线程定期清理；只持有弱引用，缓存对象被回收后线程自动退出。"""
+    ref = weakref.ref(cache)
+
+    def _run() -> None:
+        while not stop.wait(interval):
+            target = ref()
+            if target is None:
+                return
+            target.sweep()
+            del target
+
+    threading.Thread(target=_run, name="ttl-cache-sweeper", daemon=True).start()
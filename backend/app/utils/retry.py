@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
 import logging
-from tenacity import RetryCallState, Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +30,22 @@ def _log_retry(retry_state: RetryCallState) -> None:
         logger.warning("重试第 %s 次失败：%s", attempt, last_exc)
 
 
+def _retry_options(
+    exceptions: tuple[type[BaseException], ...],
+    max_attempts: int,
+    wait_multiplier: int,
+    wait_exp_base: int,
+) -> dict[str, Any]:
+    """构造同步/异步重试共用的 tenacity 参数。"""
+    return {
+        "retry": retry_if_exception_type(exceptions),
+        "stop": stop_after_attempt(max_attempts),
+        "wait": wait_exponential(multiplier=wait_multiplier, min=wait_exp_base, exp_base=2),
+        "after": _log_retry,
+        "reraise": True,
+    }
+
+
 def run_with_retry(
     func: Callable[..., Any],
     *args: Any,
@@ -45,13 +68,7 @@ def run_with_retry(
         函数执行结果。
     """
 
-    retrying = Retrying(
-        retry=retry_if_exception_type(exceptions),
-        stop=stop_after_attempt(max_attempts),
-        wait=wait_exponential(multiplier=wait_multiplier, min=wait_exp_base, exp_base=2),
-        after=_log_retry,
-        reraise=True,
-    )
+    retrying = Retrying(**_retry_options(exceptions, max_attempts, wait_multiplier, wait_exp_base))
 
     for attempt in retrying:
         with attempt:
@@ -59,3 +76,34 @@ def run_with_retry(
 
     # 理论上不会执行到此处，添加返回以满足类型检查
     raise RuntimeError("重试执行未获得结果")
+
+
+async def arun_with_retry(
+    func: Callable[..., Awaitable[Any]],
+    *args: Any,
+    exceptions: tuple[type[BaseException], ...] = (Exception,),
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    wait_multiplier: int = DEFAULT_WAIT_EXP_MULTIPLIER,
+    wait_exp_base: int = DEFAULT_WAIT_EXP_BASE,
+    **kwargs: Any,
+) -> Any:
+    """`run_with_retry` 的异步版本，退避等待不会阻塞事件循环。
+
+    Args:
+        func: 目标协程函数。
+        exceptions: 触发重试的异常类型。
+        max_attempts: 最大重试次数。
+        wait_multiplier: 指数退避基础倍率。
+        wait_exp_base: 指数退避底数。
+
+    Returns:
+        协程执行结果。
+    """
+
+    retrying = AsyncRetrying(**_retry_options(exceptions, max_attempts, wait_multiplier, wait_exp_base))
+
+    async for attempt in retrying:
+        with attempt:
+            return await func(*args, **kwargs)
+
+    raise RuntimeError("重试执行未获得结果")
@@ -0,0 +1,87 @@
+"""自适应并发限流工具：收到限流信号时减半并发，连续成功后逐步恢复（AIMD）。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+class AdaptiveConcurrencyLimiter:
+    """线程安全的自适应并发上限。"""
+
+    def __init__(self, max_limit: int, min_limit: int = 1) -> None:
+        if max_limit < 1:
+            raise ValueError("max_limit 必须大于 0")
+        self._max = max_limit
+        self._min = max(1, min(min_limit, max_limit))
+        self._limit = max_limit
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._throttles = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        with self._cond:
+            return self._limit
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait_for = self._resume_at - time.monotonic()
+                if wait_for > 0:
+                    self._cond.wait(wait_for)
+                    continue
+                if self._in_flight < self._limit:
+                    self._in_flight += 1
+                    return
+                self._cond.wait()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self) -> None:
+        """一个完整窗口（当前上限次数）的成功后，上限加一。"""
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self._max:
+                self._limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_throttle(self, cooldown: float = 0.0) -> None:
+        """收到限流信号：上限减半，并在冷却期内暂停发放新的许可。
+
+        每个冷却期最多减半一次：同一波突发中并发请求各自收到的 429 只计数，不再把上限一路压到下限。
+        """
+        with self._cond:
+            self._throttles += 1
+            now = time.monotonic()
+            if now < self._resume_at:
+                return
+            self._limit = max(self._min, self._limit // 2)
+            self._successes = 0
+            if cooldown > 0:
+                self._resume_at = now + cooldown
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self._limit,
+                "max_limit": self._max,
+                "in_flight": self._in_flight,
+                "throttles": self._throttles,
+            }
@@ -0,0 +1,49 @@
+"""边生成边输出的 ZIP 写入工具：不缓存整个压缩包，每写入一个条目即可取出对应字节。"""
+
+from __future__ import annotations
+
+import time
+import zipfile
+
+
+class _Sink:
+    """只追加、不可 seek 的写入目标；zipfile 据此改用数据描述符格式。"""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """用法：逐个 `add()` 并把返回的字节写给客户端，最后输出 `close()` 的返回值。"""
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED) -> None:
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=compression)
+
+    def add(self, name: str, data: bytes | str) -> bytes:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        self._zip.writestr(info, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """写入中央目录并返回剩余字节。"""
+        self._zip.close()
+        return self._sink.drain()
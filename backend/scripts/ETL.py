@@ -1,10 +1,16 @@
 """岗位数据 ETL 脚本，负责数据清洗、向量化及持久化入库。"""
 
 from pathlib import Path
+import argparse
+import hashlib
+import json
 import shutil
 import sys
+from typing import Iterable, Iterator, Optional
 
+import numpy as np
 import pandas as pd
+from chromadb.api.client import SharedSystemClient
 from langchain.text_splitter import CharacterTextSplitter
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -13,6 +19,11 @@ if str(ROOT_DIR) not in sys.path:
 
 from app.core.config import settings
 from app.services import get_vector_store
+from app.services.job_filters import location_key, parse_deadline, split_locations
+from app.services.keyword_index import KEYWORD_INDEX_FILE, KeywordIndexBuilder
+from app.services.ivf_index import IvfIndex, build_ivf
+from app.services.quantized_index import export_vectors
+from etl_pipeline import CHECKPOINT_FILE, Checkpoint, EtlPipeline, source_fingerprint
 
 
 # 脚本功能：
@@ -21,59 +32,81 @@ from app.services import get_vector_store
 # 3. 数据转换
 # 4. 数据存储
 
-# 读取数据并进行清洗
-def load_clean_data(path: str) -> pd.DataFrame:
-    """加载原始数据并进行缺失值清洗。
+# 原始数据表的预期字段（按列顺序）
+EXPECTED_COLUMNS = [
+    "序号",
+    "公司名称",
+    "批次",
+    "企业性质",
+    "行业大类",
+    "招聘对象",
+    "招聘岗位",
+    "网申状态",
+    "工作地点",
+    "更新时间",
+    "截止时间",
+    "官方公告",
+    "投递方式",
+    "内推码|备注",
+]
+
+
+def read_source(path: str, chunk_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """按块读取原始数据表。
 
     Args:
         path (str): 原始 CSV/Excel 文件路径。
+        chunk_rows (int): 每块行数，0 表示一次读入（只产出一块）。
 
-    Returns:
-        pd.DataFrame: 清洗后的标准化数据表。
+    Yields:
+        pd.DataFrame: 未清洗的数据块。
     """
 
-    expected_columns = [
-        "序号",
-        "公司名称",
-        "批次",
-        "企业性质",
-        "行业大类",
-        "招聘对象",
-        "招聘岗位",
-        "网申状态",
-        "工作地点",
-        "更新时间",
-        "截止时间",
-        "官方公告",
-        "投递方式",
-        "内推码|备注",
-    ]
-
     if str(path).endswith(".csv"):
-        df = pd.read_csv(
-            path,
+        options = dict(
             encoding="utf-8-sig",
-            usecols=range(len(expected_columns)),
-            names=expected_columns,
+            usecols=range(len(EXPECTED_COLUMNS)),
+            names=EXPECTED_COLUMNS,
             header=0,
         )
-    else:
-        df = pd.read_excel(path, usecols=expected_columns)
+        if chunk_rows > 0:
+            yield from pd.read_csv(path, chunksize=chunk_rows, **options)
+        else:
+            yield pd.read_csv(path, **options)
+        return
+
+    # Excel 不支持流式读取：整表读入后再按块切分，下游仍按块处理
+    df = pd.read_excel(path, usecols=EXPECTED_COLUMNS)
+    if chunk_rows <= 0:
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start : start + chunk_rows]
+
+
+def clean_frame(df: pd.DataFrame, start: int = 0) -> pd.DataFrame:
+    """对一块原始数据做缺失值清洗。
+
+    Args:
+        df (pd.DataFrame): 原始数据块。
+        start (int): 之前各块清洗后的总行数，用于续接序号。
+
+    Returns:
+        pd.DataFrame: 清洗后的标准化数据块。
+    """
 
     # 转化表头为标准格式（去除空格并按预期顺序排列）
     df.columns = df.columns.map(lambda col: str(col).strip())
 
-    missing_columns = [col for col in expected_columns if col not in df.columns]
+    missing_columns = [col for col in EXPECTED_COLUMNS if col not in df.columns]
     if missing_columns:
         raise ValueError(
             "数据表缺少预期字段，请检查数据源: " + ", ".join(missing_columns)
         )
 
-    df = df[expected_columns]
-
     # 数据清洗
     # 1. 对重要数据缺失的进行删除
-    df = df.dropna(subset=["公司名称", "招聘岗位"])
+    df = df[EXPECTED_COLUMNS].dropna(subset=["公司名称", "招聘岗位"]).copy()
 
     # 2. 重要的数据中对空值、异常值进行填充处理
     df["批次"] = df["批次"].fillna("未知")
@@ -91,54 +124,153 @@ def load_clean_data(path: str) -> pd.DataFrame:
     df["投递方式"] = df["投递方式"].fillna("")
     df["内推码|备注"] = df["内推码|备注"].fillna("")
 
-    # 4. 重排序号（保证唯一 & 连续）
-    df["序号"] = range(1, len(df) + 1)
+    # 4. 重排序号（保证唯一 & 连续，跨块续接）
+    df["序号"] = range(start + 1, start + len(df) + 1)
     return df
 
 
+def iter_clean_chunks(path: str, chunk_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """按块读取并清洗原始数据，内存占用只与块大小有关。"""
+
+    cleaned = 0
+    for chunk in read_source(path, chunk_rows):
+        df = clean_frame(chunk, start=cleaned)
+        cleaned += len(df)
+        yield df
+
+
+# 读取数据并进行清洗
+def load_clean_data(path: str) -> pd.DataFrame:
+    """加载原始数据并进行缺失值清洗（一次读入整表）。
+
+    Args:
+        path (str): 原始 CSV/Excel 文件路径。
+
+    Returns:
+        pd.DataFrame: 清洗后的标准化数据表。
+    """
+
+    return next(iter_clean_chunks(path, chunk_rows=0))
+
+
+# 岗位自然键：同一公司、同一批次下的同名岗位视为同一岗位
+NATURAL_KEY_COLUMNS = ["公司名称", "批次", "招聘岗位"]
+# 拼入向量化文本的字段（按顺序）
+CONTENT_COLUMNS = ["公司名称", "企业性质", "行业大类", "招聘对象", "招聘岗位", "网申状态", "投递方式"]
+# 文本每行的缩进，与历史版本保持一致，确保内容指纹不变、增量同步不会误判为变更
+CONTENT_INDENT = " " * 8
+
+
+def stable_job_id(natural_key: str, occurrence: int = 1) -> str:
+    """根据岗位自然键生成稳定 ID，不随数据表行序变化。
+
+    Args:
+        natural_key (str): 由自然键字段拼接的字符串。
+        occurrence (int): 同一自然键在表中第几次出现，用于区分重复行。
+
+    Returns:
+        str: 形如 ``job_3f2a9c0d1e4b`` 的岗位 ID。
+    """
+
+    digest = hashlib.sha1(natural_key.encode("utf-8")).hexdigest()[:12]
+    return f"job_{digest}" if occurrence == 1 else f"job_{digest}_{occurrence}"
+
+
+# json.dumps 带非默认参数时每次调用都会新建编码器；指纹计算复用同一个（输出与 json.dumps 相同）
+_FINGERPRINT_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, default=str)
+
+
+def content_fingerprint(content: str, metadata: dict) -> str:
+    """计算岗位文本与元数据的内容指纹，用于增量比对。"""
+
+    payload = _FINGERPRINT_ENCODER.encode({"content": content, "metadata": metadata})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _content_hashes(documents: list[str], metadatas: list[dict]) -> list[str]:
+    """逐行计算内容指纹（``metadatas`` 尚不含 ``content_hash``）。"""
+
+    return [content_fingerprint(document, metadata) for document, metadata in zip(documents, metadatas)]
+
+
 # 构建文档和元数据
-def build_documents(df: pd.DataFrame):
+def build_documents(df: pd.DataFrame, seen_keys: Optional[dict[str, int]] = None):
     """将岗位数据转换为文本与元数据集合。
 
+    文本与自然键按列做向量化字符串拼接；地点 / 截止时间的过滤字段按不同取值各解析一次。
+
     Args:
-        df (pd.DataFrame): 结构化岗位数据。
+        df (pd.DataFrame): 结构化岗位数据（可以是整表，也可以是其中一块）。
+        seen_keys (dict | None): 之前各块中自然键的出现次数，按块处理时跨块传入以保证 ID 与整表处理一致。
 
     Returns:
         tuple[list[str], list[dict], list[str]]: 文档内容、元数据与原始 ID。
     """
 
-    # 将岗位数据转为 documents + metadata + ids
-    documents, metadatas, ids = [], [], []
-
-    for _, row in df.iterrows():
-        # 拼接成用于向量化的文本内容
-        content = f"""
-        公司名称: {row["公司名称"]}
-        企业性质: {row["企业性质"]}
-        行业大类: {row["行业大类"]}
-        招聘对象: {row["招聘对象"]}
-        招聘岗位: {row["招聘岗位"]}
-        网申状态: {row["网申状态"]}
-        投递方式: {row["投递方式"]}
-        """
-
-        metadata = {
-            "job_id": f"job_{row['序号']}",
-            "company": row["公司名称"],
-            "title": row["招聘岗位"],
-            "batch": row["批次"],
-            "industry": row["行业大类"],
-            "location": row["工作地点"],
-            "deadline": row["截止时间"],
-            "note": row["内推码|备注"],
-        }
-
-        ids.append(f"job_{row['序号']}")
-        documents.append(content)
-        metadatas.append(metadata)
+    if seen_keys is None:
+        seen_keys = {}
+    if df.empty:
+        return [], [], []
+
+    # 拼接成用于向量化的文本内容
+    content = np.full(len(df), "\n", dtype=object)
+    for col in CONTENT_COLUMNS:
+        content = content + f"{CONTENT_INDENT}{col}: " + df[col].astype(str).to_numpy(dtype=object) + "\n"
+    documents = (content + CONTENT_INDENT).tolist()
+
+    # 自然键及其在全表中第几次出现（块内 cumcount + 之前各块的计数）
+    keys = df[NATURAL_KEY_COLUMNS[0]].astype(str).str.strip()
+    for col in NATURAL_KEY_COLUMNS[1:]:
+        keys = keys + "|" + df[col].astype(str).str.strip()
+    occurrences = keys.groupby(keys, sort=False).cumcount() + 1 + keys.map(seen_keys).fillna(0).astype(int)
+    for key, count in keys.value_counts(sort=False).items():
+        seen_keys[key] = seen_keys.get(key, 0) + int(count)
+    ids = [stable_job_id(key, occurrence) for key, occurrence in zip(keys.tolist(), occurrences.tolist())]
+
+    # 规范化的过滤字段：城市拆分为 loc_<城市> 布尔键，截止时间解析为整数时间戳（未知为 0）
+    # （与 filter_metadata 结果相同；地点、截止时间取值高度重复，各按不同取值解析一次）
+    location_codes, locations = pd.factorize(df["工作地点"], use_na_sentinel=False)
+    location_fields = [{location_key(city): True for city in split_locations(value)} for value in locations.tolist()]
+    deadline_codes, deadlines = pd.factorize(df["截止时间"], use_na_sentinel=False)
+    deadline_ts = np.array([parse_deadline(value) for value in deadlines.tolist()], dtype=object)[deadline_codes]
+
+    # 元数据各列均为 object 数组（元素为 Python 原生类型），按列取值后逐行组装成字典
+    columns = {
+        "job_id": np.array(ids, dtype=object),
+        "company": df["公司名称"].to_numpy(dtype=object),
+        "title": df["招聘岗位"].to_numpy(dtype=object),
+        "batch": df["批次"].astype(str).str.strip().to_numpy(dtype=object),
+        "industry": df["行业大类"].astype(str).str.strip().to_numpy(dtype=object),
+        "location": df["工作地点"].to_numpy(dtype=object),
+        "deadline": df["截止时间"].to_numpy(dtype=object),
+        "note": df["内推码|备注"].to_numpy(dtype=object),
+        "deadline_ts": deadline_ts,
+    }
+    keys = list(columns)
+    metadatas = [
+        {**dict(zip(keys, row)), **location_fields[code]}
+        for row, code in zip(zip(*columns.values()), location_codes.tolist())
+    ]
+    for metadata, content_hash in zip(metadatas, _content_hashes(documents, metadatas)):
+        metadata["content_hash"] = content_hash
 
     return documents, metadatas, ids
 
+
+def iter_document_batches(path: str, chunk_rows: int = 0) -> Iterator[tuple[list, list, list]]:
+    """按块读取、清洗并构建文档，逐批产出 (文本, 元数据, 岗位 ID)，不在内存中拼接整表。
+
+    Args:
+        path (str): 原始 CSV/Excel 文件路径。
+        chunk_rows (int): 每块行数，0 表示一次读入。
+    """
+
+    seen_keys: dict[str, int] = {}
+    for df in iter_clean_chunks(path, chunk_rows):
+        documents, metadatas, ids = build_documents(df, seen_keys)
+        if ids:
+            yield documents, metadatas, ids
+
 # 分块
 def chunk_documents(documents: list, metadatas: list, ids: list):
     """对文档进行分块处理，确保向量化稳定。
@@ -167,25 +299,79 @@ def chunk_documents(documents: list, metadatas: list, ids: list):
 
     return all_documents, all_metadatas, all_ids
 
-def persist_to_chroma(ids, documents, metadatas):
-    """写入向量库并持久化数据。
+def persist_to_chroma(
+    batches: Iterable[tuple[int, list, list, list]],
+    keyword: Optional[KeywordIndexBuilder] = None,
+    fingerprint: Optional[str] = None,
+) -> int:
+    """经流水线写入临时向量库，全部成功后原子切换为正式目录。
+
+    临时目录中的检查点与 ``fingerprint`` 一致时沿用已写入的数据，只处理未完成的批次。
 
     Args:
-        ids (list): 文档分块 ID 列表。
-        documents (list): 分块文本内容。
-        metadatas (list): 对应元数据集合。
+        batches (Iterable[tuple[int, list, list, list]]): 逐批产出的 (批次序号, 分块文本, 元数据, 分块 ID)。
+        keyword (KeywordIndexBuilder | None): 关键词索引构建器，在 ``batches`` 消费完毕后写出，
+            可由生成器边产出边追加岗位。
+        fingerprint (str | None): 数据源指纹；为 None 时不续跑，总是从头写入。
+
+    Returns:
+        int: 临时向量库中的分块总数（含之前运行已写入的）；为 0 时不切换目录。
     """
 
     persist_dir = Path(settings.chroma_persist_directory)
     tmp_dir = persist_dir.with_name(persist_dir.name + "_tmp")
     backup_dir = persist_dir.with_name(persist_dir.name + "_backup")
 
-    if tmp_dir.exists():
-        shutil.rmtree(tmp_dir)
+    checkpoint = Checkpoint.load(tmp_dir / CHECKPOINT_FILE, fingerprint or "")
+    if fingerprint and checkpoint.completed:
+        print(f"♻️ 检测到未完成的运行：沿用已写入的 {len(checkpoint.completed)} 批 / {checkpoint.records} 个分块")
+    else:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        # 暂存数据已清空，检查点必须同时作废，否则流水线会跳过并未写入的批次
+        checkpoint = Checkpoint(tmp_dir / CHECKPOINT_FILE, fingerprint or "")
+        checkpoint.remove()
+        # 同一进程内重复运行时，Chroma 仍缓存着已被移走的同路径客户端
+        SharedSystemClient.clear_system_cache()
 
     store = get_vector_store(persist_directory=str(tmp_dir))
-    store.add_texts(texts=documents, metadatas=metadatas, ids=ids)
-    store.persist()
+    collection = store._collection  # type: ignore[attr-defined]
+    max_batch = store._client.get_max_batch_size()  # type: ignore[attr-defined]
+
+    def _write(ids, documents, metadatas, embeddings):
+        # PersistentClient 会自动落盘；upsert 使重放的批次保持幂等
+        for start in range(0, len(ids), max_batch):
+            end = start + max_batch
+            collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end],
+            )
+
+    pipeline = EtlPipeline(
+        embed=store.embeddings.embed_documents,
+        write=_write,
+        checkpoint=checkpoint,
+        queue_size=settings.etl_queue_size,
+        embed_workers=settings.etl_embed_workers,
+        progress_interval=settings.etl_progress_interval,
+    )
+    pipeline.run(batches)
+    print(pipeline.report())
+
+    written = checkpoint.records
+    if written == 0:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return 0
+    if keyword is not None:
+        # 索引写在临时目录中，随向量库一起原子切换
+        write_keyword_index(keyword, directory=tmp_dir)
+    if settings.match_index_backend == "quantized":
+        write_quantized_vectors(collection, directory=tmp_dir)
+    if settings.match_ann_index == "ivf":
+        write_ivf_index(collection, directory=tmp_dir)
+    checkpoint.remove()
 
     if backup_dir.exists():
         shutil.rmtree(backup_dir)
@@ -194,24 +380,258 @@ def persist_to_chroma(ids, documents, metadatas):
 
     shutil.move(str(tmp_dir), str(persist_dir))
     print(
-        f"✅ 已写入 {len(ids)} 条数据到 ChromaDB ({settings.chroma_collection_name})，原始数据已备份到 {backup_dir}"
+        f"✅ 已写入 {written} 条数据到 ChromaDB ({settings.chroma_collection_name})，原始数据已备份到 {backup_dir}"
+    )
+    print_embedding_report(store)
+    return written
+
+
+def print_embedding_report(store) -> None:
+    """输出本次运行的 Embedding 吞吐统计（命中持久化存储的文本不计入）。"""
+
+    embeddings = store.embeddings
+    if embeddings is not None and hasattr(embeddings, "stats"):
+        print(embeddings.stats.report())
+
+def write_keyword_index(keyword: KeywordIndexBuilder, directory: Path) -> None:
+    """写出按岗位构建的 BM25 关键词索引（`/kb/query?mode=keyword|hybrid` 使用）。"""
+
+    stats = keyword.save(Path(directory) / KEYWORD_INDEX_FILE)
+    print(f"🔤 关键词索引：{stats['jobs']} 个岗位，{stats['terms']} 个词项")
+
+
+def write_quantized_vectors(collection, directory: Path) -> None:
+    """导出 mmap 量化向量（`MATCH_INDEX_BACKEND=quantized` 使用），从向量库分页读取，不调用 Embedding。"""
+
+    stats = export_vectors(
+        collection,
+        directory,
+        dtype=settings.match_quantized_dtype,
+        keep_float32=settings.match_quantized_rescore > 0,
+    )
+    size = sum(stats["bytes"].values()) / 1e6
+    print(f"🧮 量化向量：{stats['chunks']} 个分块 × {stats['dimension']} 维（{stats['dtype']}），共 {size:.1f} MB")
+
+
+def write_ivf_index(collection, directory: Path, reuse_centroids: bool = False) -> None:
+    """构建 IVF 近似检索索引（`MATCH_ANN_INDEX=ivf` 使用），从向量库分页读取，不调用 Embedding。
+
+    Args:
+        collection: Chroma collection 实例。
+        directory (Path): 知识库目录，索引写入其下的 ``ivf``。
+        reuse_centroids (bool): 沿用已有索引的质心，只重新分配分块（增量同步时数据分布变化不大）。
+    """
+
+    centroids = None
+    if reuse_centroids:
+        try:
+            centroids = IvfIndex.load(directory).centroids
+        except (OSError, ValueError, KeyError):
+            centroids = None
+    stats = build_ivf(
+        collection,
+        directory,
+        n_lists=settings.match_ivf_lists,
+        train_sample=settings.match_ivf_train_sample,
+        iterations=settings.match_ivf_iterations,
+        centroids=centroids,
+    )
+    print(
+        f"🧭 IVF 索引：{stats['chunks']} 个分块 → {stats['lists']} 个簇（最大 {stats['largest_list']}，"
+        f"空簇 {stats['empty_lists']}），训练 {stats['train_s']}s，分配 {stats['assign_s']}s"
+    )
+
+
+def load_existing_jobs(collection, page_size: int = 1000) -> dict[str, dict]:
+    """读取向量库中已有岗位的内容指纹与分块 ID。
+
+    Args:
+        collection: Chroma collection 实例。
+        page_size (int): 分页读取的批大小。
+
+    Returns:
+        dict[str, dict]: ``job_id -> {"content_hash": str | None, "chunk_ids": list[str]}``。
+    """
+
+    existing: dict[str, dict] = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        page_ids = page.get("ids") or []
+        if not page_ids:
+            break
+        for chunk_id, meta in zip(page_ids, page.get("metadatas") or []):
+            meta = meta or {}
+            job_id = meta.get("job_id") or chunk_id.rsplit("-", 1)[0]
+            entry = existing.setdefault(job_id, {"content_hash": meta.get("content_hash"), "chunk_ids": []})
+            entry["chunk_ids"].append(chunk_id)
+        offset += len(page_ids)
+    return existing
+
+
+def diff_jobs(existing: dict[str, dict], incoming: dict[str, str]) -> dict[str, list[str]]:
+    """比对新数据表（``job_id -> content_hash``）与向量库，得到新增、变更、删除与未变的岗位 ID。"""
+
+    added = [job_id for job_id in incoming if job_id not in existing]
+    changed = [
+        job_id
+        for job_id, content_hash in incoming.items()
+        if job_id in existing and existing[job_id]["content_hash"] != content_hash
+    ]
+    removed = [job_id for job_id in existing if job_id not in incoming]
+    unchanged = [
+        job_id
+        for job_id, content_hash in incoming.items()
+        if job_id in existing and existing[job_id]["content_hash"] == content_hash
+    ]
+    return {"added": added, "changed": changed, "removed": removed, "unchanged": unchanged}
+
+
+def run_incremental(batches: Iterable[tuple[list, list, list]]):
+    """增量同步向量库：逐批写入新增/变更岗位，全部写入后再删除已下线岗位与多余的旧分块。
+
+    只保留各岗位的内容指纹用于判断下线岗位，岗位文本随批次释放。
+
+    Args:
+        batches (Iterable[tuple[list, list, list]]): 逐批产出的 (岗位文本, 元数据（含 ``content_hash``）, 稳定岗位 ID)。
+    """
+
+    store = get_vector_store()
+    collection = store._collection  # type: ignore[attr-defined]
+    existing = load_existing_jobs(collection)
+    incoming: dict[str, str] = {}
+    stale_chunk_ids: list[str] = []
+    written = 0
+
+    with KeywordIndexBuilder() as keyword:
+        for documents, metadatas, ids in batches:
+            keyword.add(ids, documents, metadatas)
+            selected = []
+            for i, meta in enumerate(metadatas):
+                incoming[meta["job_id"]] = meta["content_hash"]
+                previous = existing.get(meta["job_id"])
+                if previous is None or previous["content_hash"] != meta["content_hash"]:
+                    selected.append(i)
+            chunk_docs, chunk_metas, chunk_ids = chunk_documents(
+                [documents[i] for i in selected],
+                [metadatas[i] for i in selected],
+                [ids[i] for i in selected],
+            )
+            # 先写后删：分块 ID 稳定，add_texts 按 ID upsert 覆盖变更岗位的旧分块；
+            # 向量化中途失败时线上集合仍保留旧内容，重跑即可补齐
+            if chunk_ids:
+                store.add_texts(texts=chunk_docs, metadatas=chunk_metas, ids=chunk_ids)
+                written += len(chunk_ids)
+            # 变更后分块数变少的岗位多出的旧分块，待全部写入成功后再删除
+            batch_chunk_ids = set(chunk_ids)
+            stale_chunk_ids.extend(
+                chunk_id
+                for i in selected
+                if ids[i] in existing
+                for chunk_id in existing[ids[i]]["chunk_ids"]
+                if chunk_id not in batch_chunk_ids
+            )
+
+        diff = diff_jobs(existing, incoming)
+        stale_chunk_ids.extend(chunk_id for job_id in diff["removed"] for chunk_id in existing[job_id]["chunk_ids"])
+        if stale_chunk_ids:
+            collection.delete(ids=stale_chunk_ids)
+        write_keyword_index(keyword, directory=Path(settings.chroma_persist_directory))
+    if settings.match_index_backend == "quantized":
+        write_quantized_vectors(collection, directory=Path(settings.chroma_persist_directory))
+    if settings.match_ann_index == "ivf":
+        write_ivf_index(collection, directory=Path(settings.chroma_persist_directory), reuse_centroids=True)
+
+    print(
+        "🔁 增量同步完成："
+        f"新增 {len(diff['added'])}，变更 {len(diff['changed'])}，"
+        f"删除 {len(diff['removed'])}，未变 {len(diff['unchanged'])}；"
+        f"写入 {written} 个分块，移除 {len(stale_chunk_ids)} 个旧分块"
     )
+    print_embedding_report(store)
+    return diff
+
 
 # 整合运行
-def run():
-    """执行 ETL 主流程，包括清洗、分块与持久化。"""
+def run(incremental: bool = False, chunk_rows: Optional[int] = None, restart: bool = False):
+    """执行 ETL 主流程，包括清洗、分块与持久化。
 
-    df = load_clean_data(settings.data_path)
-    documents, metadatas, ids = build_documents(df)
-    documents, metadatas, ids = chunk_documents(documents, metadatas, ids)
+    原始数据按块读取、构建与分块，每块写入向量库并追加到关键词索引后即可释放（索引文本暂存在磁盘）。
+    全量重建经流水线写入并记录检查点，中断后再次运行从未完成的批次继续。
 
-    document_count = len(documents)
-    if document_count == 0:
-        print("⚠️ 未找到可用文档，ETL 流程提前结束。")
+    Args:
+        incremental (bool): 为 True 时仅同步变化的岗位，否则全量重建向量库。
+        chunk_rows (int | None): 每块读取的行数，默认取配置 ``ETL_CHUNK_ROWS``。
+        restart (bool): 全量重建时忽略已有检查点，从头写入。
+    """
+
+    chunk_rows = settings.etl_chunk_rows if chunk_rows is None else chunk_rows
+    batches = iter_document_batches(settings.data_path, chunk_rows)
+
+    if incremental:
+        print("🔍 增量模式：比对现有向量库 ...")
+        run_incremental(batches)
         return
 
+    fingerprint = None
+    if not restart:
+        fingerprint = source_fingerprint(
+            settings.data_path,
+            chunk_rows=chunk_rows,
+            model=settings.dashscope_embedding_model,
+            collection=settings.chroma_collection_name,
+        )
     print("💾 开始写入 ChromaDB ...")
-    persist_to_chroma(ids, documents, metadatas)
+    with KeywordIndexBuilder() as keyword:
+
+        def _chunked_batches():
+            # 批次序号由数据源与块大小唯一确定，检查点据此跳过已写入的批次（关键词索引仍需全部岗位）
+            for seq, (documents, metadatas, ids) in enumerate(batches):
+                keyword.add(ids, documents, metadatas)
+                yield (seq, *chunk_documents(documents, metadatas, ids))
+
+        written = persist_to_chroma(_chunked_batches(), keyword=keyword, fingerprint=fingerprint)
+    if written == 0:
+        print("⚠️ 未找到可用文档，ETL 流程提前结束。")
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="岗位数据清洗、向量化与入库")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量模式：仅写入新增/变更岗位并删除已下线岗位，不重建整个向量库",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help="每块读取的原始数据行数，默认取配置 ETL_CHUNK_ROWS（0 表示一次读入）",
+    )
+    parser.add_argument(
+        "--export-vectors",
+        action="store_true",
+        help="仅从现有向量库导出 mmap 量化向量（quantized 后端使用），不读取原始数据",
+    )
+    parser.add_argument(
+        "--build-ivf",
+        action="store_true",
+        help="仅从现有向量库重新训练并构建 IVF 近似检索索引（MATCH_ANN_INDEX=ivf 使用），不读取原始数据",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="全量重建时丢弃上次中断留下的检查点与暂存数据，从头开始",
+    )
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    run()
+    args = _parse_args()
+    if args.export_vectors or args.build_ivf:
+        collection = get_vector_store()._collection  # type: ignore[attr-defined]
+        if args.export_vectors:
+            write_quantized_vectors(collection, directory=Path(settings.chroma_persist_directory))
+        if args.build_ivf:
+            write_ivf_index(collection, directory=Path(settings.chroma_persist_directory))
+        sys.exit(0)
+    run(incremental=args.incremental, chunk_rows=args.chunk_rows, restart=args.restart)
@@ -0,0 +1,127 @@
+"""基准测试脚本共用的小工具：计时、分位数统计与合成向量库。"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def time_each(func: Callable[[Any], Any], inputs: Iterable[Any]) -> list[float]:
+    """逐个调用并返回每次耗时（毫秒）。"""
+
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        func(item)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(samples: Sequence[float]) -> dict[str, float]:
+    """返回 p50 / p99 / 平均耗时（毫秒）与对应 QPS。"""
+
+    array = np.asarray(samples, dtype=np.float64)
+    if array.size == 0:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "qps": 0.0}
+    mean = float(array.mean())
+    return {
+        "p50_ms": round(float(np.percentile(array, 50)), 3),
+        "p99_ms": round(float(np.percentile(array, 99)), 3),
+        "mean_ms": round(mean, 3),
+        "qps": round(1000.0 / mean, 1) if mean > 0 else 0.0,
+    }
+
+
+def print_table(rows: list[tuple[str, dict[str, float]]]) -> None:
+    """以对齐表格形式输出多组统计结果。"""
+
+    if not rows:
+        return
+    columns = list(rows[0][1].keys())
+    name_width = max(len(name) for name, _ in rows) + 2
+    print("".ljust(name_width) + "".join(col.rjust(12) for col in columns))
+    for name, stats in rows:
+        print(name.ljust(name_width) + "".join(str(stats[col]).rjust(12) for col in columns))
+
+
+def random_unit_vectors(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def clustered_unit_vectors(count: int, dim: int, clusters: int, spread: float = 0.5, seed: int = 0) -> np.ndarray:
+    """围绕 ``clusters`` 个随机中心加噪生成的单位向量，比均匀随机数据更接近真实 Embedding 的分布。"""
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    noise = rng.standard_normal((count, dim)).astype(np.float32) * (spread / np.sqrt(dim))
+    vectors = centers[rng.integers(0, clusters, size=count)] + noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def perturbed_queries(matrix: np.ndarray, count: int, noise: float = 0.05, seed: int = 1) -> np.ndarray:
+    """从已有向量中抽样并加噪，作为不依赖 Embedding 接口的查询向量。"""
+
+    rng = np.random.default_rng(seed)
+    rows = matrix[rng.integers(0, matrix.shape[0], size=count)]
+    queries = rows + noise * rng.standard_normal(rows.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def synthetic_collection(count: int, dim: int, seed: int = 0, clusters: int = 0):
+    """在临时目录中创建含随机向量与元数据的 Chroma 集合；``clusters`` > 0 时向量围绕若干中心聚集。"""
+
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    from app.services.job_filters import filter_metadata
+
+    directory = tempfile.mkdtemp(prefix="bench_chroma_")
+    client = chromadb.PersistentClient(
+        path=directory,
+        settings=ChromaSettings(is_persistent=True, anonymized_telemetry=False),
+    )
+    collection = client.get_or_create_collection("bench_jobs")
+    if clusters > 0:
+        vectors = clustered_unit_vectors(count, dim, clusters, seed=seed)
+    else:
+        vectors = random_unit_vectors(count, dim, seed)
+    rng = np.random.default_rng(seed)
+    cities = ["上海", "北京", "深圳", "杭州", "广州"]
+    industries = ["互联网", "金融", "制造", "教育"]
+    batches = ["秋招", "春招", "实习"]
+    step = client.get_max_batch_size()
+    for start in range(0, count, step):
+        end = min(start + step, count)
+        metadatas = []
+        for i in range(start, end):
+            location = "、".join(rng.choice(cities, size=int(rng.integers(1, 3)), replace=False))
+            deadline = f"2025-{int(rng.integers(1, 13)):02d}-{int(rng.integers(1, 29)):02d}"
+            metadatas.append({
+                "job_id": f"job_{i}",
+                "location": location,
+                "industry": industries[int(rng.integers(len(industries)))],
+                "batch": batches[int(rng.integers(len(batches)))],
+                "deadline": deadline,
+                **filter_metadata(location, deadline),
+            })
+        collection.add(
+            ids=[f"job_{i}-0" for i in range(start, end)],
+            embeddings=vectors[start:end].tolist(),
+            documents=[f"公司{i} 岗位{i}" for i in range(start, end)],
+            metadatas=metadatas,
+        )
+    return collection, directory
@@ -0,0 +1,95 @@
+"""基准测试：带元数据过滤的岗位检索——取回后客户端过滤 vs Chroma `where` 下推 vs 内存索引掩码。
+
+示例：
+    python scripts/bench_filters.py                    # 使用配置中的向量库
+    python scripts/bench_filters.py --synthetic 20000  # 使用随机合成数据
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from typing import Optional
+
+from bench_common import perturbed_queries, print_table, summarize, synthetic_collection, time_each
+
+from app.services.job_filters import JobFilter, date_to_ts
+from app.services.job_index import JobVectorIndex
+
+
+FILTERS = [
+    ("city", JobFilter(locations=["上海"])),
+    ("city+industry", JobFilter(locations=["上海", "北京"], industries=["金融"])),
+    ("deadline window", JobFilter(deadline_from=date_to_ts(date(2025, 6, 1)), deadline_to=date_to_ts(date(2025, 6, 30)))),
+    ("all fields", JobFilter(locations=["深圳"], industries=["互联网"], batches=["秋招"], deadline_from=date_to_ts(date(2025, 3, 1)))),
+]
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="对比元数据过滤检索方式的延迟与结果完整度")
+    parser.add_argument("--queries", type=int, default=100, help="每种过滤条件的查询次数，默认 100")
+    parser.add_argument("--top-k", type=int, default=5, help="每次返回条数，默认 5")
+    parser.add_argument("--overfetch", type=int, default=10, help="客户端过滤时多取的倍数，默认 10")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N", help="使用 N 条随机向量代替真实向量库")
+    parser.add_argument("--dim", type=int, default=1024, help="合成数据的向量维度，默认 1024")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+    if args.synthetic:
+        collection, directory = synthetic_collection(args.synthetic, args.dim)
+        print(f"🧪 合成数据：{args.synthetic} 条 × {args.dim} 维（{directory}）")
+    else:
+        from app.services import get_vector_store
+
+        collection = get_vector_store()._collection  # type: ignore[attr-defined]
+
+    started = time.perf_counter()
+    index = JobVectorIndex.from_collection(collection)
+    print(f"📦 索引加载：{len(index)} 个分块，用时 {time.perf_counter() - started:.2f}s")
+    if len(index) == 0:
+        print("⚠️ 向量库为空，请先运行 scripts/ETL.py 或使用 --synthetic")
+        return
+
+    queries = perturbed_queries(index.matrix, args.queries)
+    for name, job_filter in FILTERS:
+        mask = index.filters.mask(job_filter)
+        selectivity = float(mask.mean()) if mask is not None else 1.0
+        short = {"post-filter": 0, "chroma where": 0, "memory mask": 0}
+
+        def run_post_filter(vector):
+            result = collection.query(
+                query_embeddings=[vector.tolist()],
+                n_results=args.top_k * args.overfetch,
+                include=["metadatas", "distances"],
+            )
+            kept = [meta for meta in result["metadatas"][0] if job_filter.matches(meta or {})][: args.top_k]
+            short["post-filter"] += len(kept) < args.top_k
+
+        def run_where(vector):
+            result = collection.query(
+                query_embeddings=[vector.tolist()],
+                n_results=args.top_k,
+                include=["metadatas", "distances"],
+                where=job_filter.to_where(),
+            )
+            short["chroma where"] += len(result["ids"][0]) < args.top_k
+
+        def run_mask(vector):
+            result = index.query(query_embeddings=[vector], n_results=args.top_k, job_filter=job_filter)
+            short["memory mask"] += len(result["ids"][0]) < args.top_k
+
+        rows = [
+            ("post-filter", summarize(time_each(run_post_filter, queries))),
+            ("chroma where", summarize(time_each(run_where, queries))),
+            ("memory mask", summarize(time_each(run_mask, queries))),
+        ]
+        print(f"\n🔎 {name}：命中 {selectivity:.1%} 的分块")
+        print_table(rows)
+        print("   不足 Top-k 的查询数：" + "，".join(f"{key} {value}" for key, value in short.items()))
+
+
+if __name__ == "__main__":  # pragma: no cover - 命令行入口
+    main()
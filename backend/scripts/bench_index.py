@@ -0,0 +1,65 @@
+"""基准测试：进程内 NumPy 岗位索引 vs Chroma collection.query 的检索延迟。
+
+示例：
+    python scripts/bench_index.py                    # 使用配置中的向量库
+    python scripts/bench_index.py --synthetic 20000  # 使用随机合成数据
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from bench_common import perturbed_queries, print_table, summarize, synthetic_collection, time_each
+
+from app.services.job_index import JobVectorIndex
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="对比内存索引与 Chroma 的 Top-k 检索延迟")
+    parser.add_argument("--queries", type=int, default=200, help="查询次数，默认 200")
+    parser.add_argument("--top-k", type=int, default=5, help="每次返回条数，默认 5")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N", help="使用 N 条随机向量代替真实向量库")
+    parser.add_argument("--dim", type=int, default=1024, help="合成数据的向量维度，默认 1024")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+    if args.synthetic:
+        collection, directory = synthetic_collection(args.synthetic, args.dim)
+        print(f"🧪 合成数据：{args.synthetic} 条 × {args.dim} 维（{directory}）")
+    else:
+        from app.services import get_vector_store
+
+        collection = get_vector_store()._collection  # type: ignore[attr-defined]
+
+    started = time.perf_counter()
+    index = JobVectorIndex.from_collection(collection)
+    print(f"📦 索引加载：{len(index)} 个分块，{index.matrix.nbytes / 1e6:.1f} MB，用时 {time.perf_counter() - started:.2f}s")
+    if len(index) == 0:
+        print("⚠️ 向量库为空，请先运行 scripts/ETL.py 或使用 --synthetic")
+        return
+
+    queries = perturbed_queries(index.matrix, args.queries)
+    chroma_ids, index_ids = [], []
+
+    def run_chroma(vector):
+        result = collection.query(query_embeddings=[vector.tolist()], n_results=args.top_k, include=["distances"])
+        chroma_ids.append(result["ids"][0])
+
+    def run_index(vector):
+        result = index.query(query_embeddings=[vector], n_results=args.top_k)
+        index_ids.append(result["ids"][0])
+
+    chroma_stats = summarize(time_each(run_chroma, queries))
+    index_stats = summarize(time_each(run_index, queries))
+    print_table([("chroma", chroma_stats), ("memory", index_stats)])
+
+    overlap = [len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(chroma_ids, index_ids)]
+    print(f"🎯 Top-{args.top_k} 结果重合率（Chroma HNSW vs 精确检索）：{sum(overlap) / len(overlap):.3f}")
+
+
+if __name__ == "__main__":  # pragma: no cover - 命令行入口
+    main()
@@ -0,0 +1,68 @@
+"""基准测试：报告渲染吞吐（每次新建 Jinja 环境 vs 缓存模板 vs 复用已存在的同内容报告）。
+
+示例：
+    python scripts/bench_report.py
+    python scripts/bench_report.py --reports 500 --analysis-chars 4000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from bench_common import print_table, summarize, time_each
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.services.report_generator import TEMPLATE_DIR, TEMPLATE_NAME, ReportRenderer
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="对比报告渲染方式的延迟与吞吐")
+    parser.add_argument("--reports", type=int, default=300, help="渲染的报告数，默认 300")
+    parser.add_argument("--analysis-chars", type=int, default=2000, help="分析文本长度，默认 2000 字")
+    return parser.parse_args(argv)
+
+
+def _sample(index: int, analysis_chars: int) -> dict:
+    return {
+        "resume_name": f"候选人{index}",
+        "job_title": "后端工程师",
+        "company": "ACME科技",
+        "location": "上海",
+        "similarity_score": 0.5 + (index % 50) / 100,
+        "analysis": ("匹配度评分：85。技能与岗位高度匹配。" * (analysis_chars // 18 + 1))[:analysis_chars],
+        "matched_skills": ["Python", "FastAPI", "SQL"],
+        "missing_skills": [],
+        "recommendations": "根据分析结果，建议进一步强化岗位相关技能。",
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+    samples = [_sample(index, args.analysis_chars) for index in range(args.reports)]
+
+    with tempfile.TemporaryDirectory(prefix="bench_report_") as directory:
+        legacy_dir = Path(directory) / "legacy"
+        legacy_dir.mkdir()
+
+        def run_legacy(data: dict) -> None:
+            # 旧实现：每次构建环境、重新编译模板并同步写文件
+            env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
+            html = env.get_template(TEMPLATE_NAME).render({**data, "date": "", "score_percent": 0})
+            (legacy_dir / f"{data['resume_name']}_{data['job_title']}.html").write_text(html, encoding="utf-8")
+
+        renderer = ReportRenderer(output_dir=Path(directory) / "cached", auto_reload=False)
+
+        legacy = summarize(time_each(run_legacy, samples))
+        cached = summarize(time_each(renderer.generate, samples))
+        reused = summarize(time_each(renderer.generate, samples))
+
+    print_table([("new env / call", legacy), ("cached template", cached), ("identical report", reused)])
+    print(f"📄 {args.reports} 份报告，分析文本 {args.analysis_chars} 字；统计：{renderer.stats()}")
+
+
+if __name__ == "__main__":  # pragma: no cover - 命令行入口
+    main()
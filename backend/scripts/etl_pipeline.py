@@ -0,0 +1,304 @@
+"""ETL 写入流水线：读取/分块 → 向量化 → 写入向量库，各阶段独立线程、阶段之间用有界队列衔接。
+
+- 向量化（网络 I/O）与本地的读取、构建、Chroma 写入重叠进行；队列有界，快阶段不会无限堆积内存；
+- 每写完一批即把批次序号记入检查点文件（临时文件 + fsync + 原子替换），中断后重跑跳过已完成批次；
+- 运行期间定期输出各阶段吞吐与队列深度，结束时输出汇总。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+CHECKPOINT_FILE = "etl_checkpoint.json"
+CHECKPOINT_FORMAT = 1
+
+# 队列中的结束标记
+_DONE = object()
+
+
+def source_fingerprint(path: str, **params: Any) -> str:
+    """数据源与分批参数的指纹：文件或参数变化后旧检查点失效。"""
+
+    stat = os.stat(path)
+    payload = json.dumps(
+        {"path": str(Path(path).resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, **params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class Checkpoint:
+    """已写入批次的持久记录，与暂存向量库放在同一目录。"""
+
+    def __init__(self, path: Path, fingerprint: str, completed: Iterable[int] = (), records: int = 0) -> None:
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.completed: set[int] = set(completed)
+        self.records = records
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> "Checkpoint":
+        """读取检查点；文件不存在、损坏、指纹为空（不续跑）或指纹不符时返回空检查点。"""
+        if not fingerprint:
+            return cls(path, fingerprint)
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, fingerprint)
+        if payload.get("format") != CHECKPOINT_FORMAT or payload.get("fingerprint") != fingerprint:
+            return cls(path, fingerprint)
+        return cls(path, fingerprint, payload.get("completed") or [], int(payload.get("records") or 0))
+
+    def mark(self, seq: int, records: int) -> None:
+        """记录一批已写入（先写向量库再记检查点，重放的批次按相同 ID upsert，不会重复）。"""
+        with self._lock:
+            self.completed.add(seq)
+            self.records += records
+            payload = {
+                "format": CHECKPOINT_FORMAT,
+                "fingerprint": self.fingerprint,
+                "completed": sorted(self.completed),
+                "records": self.records,
+                "updated_at": time.time(),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class StageMetrics:
+    """单个阶段的累计统计：批次数、记录数与实际处理耗时（不含等待队列的时间）。"""
+
+    name: str
+    batches: int = 0
+    records: int = 0
+    busy: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, records: int, seconds: float) -> None:
+        with self._lock:
+            self.batches += 1
+            self.records += records
+            self.busy += seconds
+
+    def as_dict(self, wall: float) -> dict[str, float]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "records": self.records,
+                "busy_s": round(self.busy, 2),
+                "util": round(self.busy / wall, 2) if wall > 0 else 0.0,
+                "rec_per_s": round(self.records / self.busy, 1) if self.busy > 0 else 0.0,
+            }
+
+
+class GaugedQueue(queue.Queue):
+    """记录深度采样（每次入队后）的有界队列。"""
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        super().__init__(maxsize=maxsize)
+        self.name = name
+        self.peak = 0
+        self._depth_total = 0
+        self._samples = 0
+
+    def sample(self) -> int:
+        depth = self.qsize()
+        self.peak = max(self.peak, depth)
+        self._depth_total += depth
+        self._samples += 1
+        return depth
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "capacity": self.maxsize,
+            "peak": self.peak,
+            "mean": round(self._depth_total / self._samples, 2) if self._samples else 0.0,
+        }
+
+
+class EtlPipeline:
+    """三阶段流水线：调用线程读取批次，``embed_workers`` 个线程向量化，单线程写入（Chroma 写入需串行）。
+
+    Args:
+        embed: 文本列表 → 向量列表。
+        write: ``(ids, documents, metadatas, embeddings)`` 写入向量库。
+        checkpoint: 检查点；已完成的批次在读取阶段直接跳过。
+        queue_size: 每个阶段间队列可容纳的批次数。
+        embed_workers: 并行向量化的批次数。
+        progress_interval: 输出进度的间隔秒数，0 关闭。
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        write: Callable[[list[str], list[str], list[dict], Sequence[Sequence[float]]], None],
+        checkpoint: Checkpoint,
+        queue_size: int = 4,
+        embed_workers: int = 2,
+        progress_interval: float = 10.0,
+    ) -> None:
+        self._embed = embed
+        self._write = write
+        self.checkpoint = checkpoint
+        self.embed_workers = max(1, embed_workers)
+        self.progress_interval = progress_interval
+        self.embed_queue = GaugedQueue("embed", max(1, queue_size))
+        self.write_queue = GaugedQueue("write", max(1, queue_size))
+        self.metrics = {name: StageMetrics(name) for name in ("read", "embed", "write")}
+        self.skipped = 0
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._started = 0.0
+
+    def _put(self, target: GaugedQueue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.2)
+            except queue.Full:
+                continue
+            target.sample()
+            return True
+        return False
+
+    def _get(self, source: GaugedQueue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+        self._stop.set()
+
+    def _embed_loop(self) -> None:
+        try:
+            while True:
+                item = self._get(self.embed_queue)
+                if item is _DONE:
+                    break
+                seq, documents, metadatas, ids = item
+                started = time.perf_counter()
+                embeddings = self._embed(documents)
+                self.metrics["embed"].add(len(ids), time.perf_counter() - started)
+                if not self._put(self.write_queue, (seq, documents, metadatas, ids, embeddings)):
+                    break
+        except BaseException as exc:  # noqa: BLE001 - 交给调用线程重新抛出
+            self._fail(exc)
+        finally:
+            self._put(self.write_queue, _DONE)
+
+    def _write_loop(self) -> None:
+        finished = 0
+        try:
+            while finished < self.embed_workers:
+                item = self._get(self.write_queue)
+                if item is _DONE:
+                    if self._stop.is_set():
+                        break
+                    finished += 1
+                    continue
+                seq, documents, metadatas, ids, embeddings = item
+                started = time.perf_counter()
+                self._write(ids, documents, metadatas, embeddings)
+                self.checkpoint.mark(seq, len(ids))
+                self.metrics["write"].add(len(ids), time.perf_counter() - started)
+        except BaseException as exc:  # noqa: BLE001
+            self._fail(exc)
+
+    def _report_loop(self, done: threading.Event) -> None:
+        while not done.wait(self.progress_interval):
+            print(self.progress_line(), flush=True)
+
+    def progress_line(self) -> str:
+        wall = time.perf_counter() - self._started
+        parts = [
+            f"{name} {metrics.records} 条（{metrics.records / wall:.1f}/s）" for name, metrics in self.metrics.items()
+        ]
+        depths = [f"{q.name} {q.sample()}/{q.maxsize}" for q in (self.embed_queue, self.write_queue)]
+        return f"⏱️ {wall:.0f}s | " + "，".join(parts) + " | 队列 " + "，".join(depths)
+
+    def run(self, batches: Iterable[tuple[int, list[str], list[dict], list[str]]]) -> int:
+        """消费 ``(序号, 文本, 元数据, ID)`` 批次直到写完，返回本次写入的记录数；任一阶段出错时重新抛出。"""
+
+        self._started = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._embed_loop, name=f"etl-embed-{i}", daemon=True)
+            for i in range(self.embed_workers)
+        ]
+        workers.append(threading.Thread(target=self._write_loop, name="etl-write", daemon=True))
+        for worker in workers:
+            worker.start()
+        reporter_done = threading.Event()
+        if self.progress_interval > 0:
+            threading.Thread(target=self._report_loop, args=(reporter_done,), name="etl-progress", daemon=True).start()
+
+        try:
+            iterator = iter(batches)
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                item = next(iterator, None)
+                if item is None:
+                    break
+                seq, documents, metadatas, ids = item
+                self.metrics["read"].add(len(ids), time.perf_counter() - started)
+                if seq in self.checkpoint.completed:
+                    self.skipped += len(ids)
+                    continue
+                if ids and not self._put(self.embed_queue, item):
+                    break
+        except BaseException as exc:  # noqa: BLE001 - 包括 KeyboardInterrupt：停止各阶段后重新抛出
+            self._fail(exc)
+        finally:
+            for _ in range(self.embed_workers):
+                self._put(self.embed_queue, _DONE)
+            for worker in workers:
+                worker.join()
+            reporter_done.set()
+
+        if self._error is not None:
+            raise self._error
+        return self.metrics["write"].records
+
+    def summary(self) -> dict[str, Any]:
+        wall = time.perf_counter() - self._started
+        return {
+            "wall_s": round(wall, 2),
+            "skipped_records": self.skipped,
+            "stages": {name: metrics.as_dict(wall) for name, metrics in self.metrics.items()},
+            "queues": {q.name: q.stats() for q in (self.embed_queue, self.write_queue)},
+        }
+
+    def report(self) -> str:
+        data = self.summary()
+        lines = [f"📊 流水线耗时 {data['wall_s']}s，从检查点跳过 {data['skipped_records']} 条"]
+        for name, stats in data["stages"].items():
+            lines.append(
+                f"   {name:<6} {stats['batches']} 批 / {stats['records']} 条，处理 {stats['busy_s']}s"
+                f"（占用率 {stats['util']:.0%}，{stats['rec_per_s']} 条/s）"
+            )
+        for name, stats in data["queues"].items():
+            lines.append(f"   队列 {name:<6} 容量 {stats['capacity']}，峰值 {stats['peak']}，平均 {stats['mean']}")
+        return "\n".join(lines)
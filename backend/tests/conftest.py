@@ -9,3 +9,5 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 os.environ.setdefault("PYTHONPATH", str(ROOT))
+# 配置类要求 API 密钥，测试环境使用占位值即可（不会发起真实请求）
+os.environ.setdefault("DASHSCOPE_API_KEY", "test-key")
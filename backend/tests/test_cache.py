@@ -1,5 +1,9 @@
+import asyncio
+import threading
 import time
 
+import pytest
+
 from app.utils.cache import TTLCache
 
 
@@ -22,3 +26,84 @@ def test_cache_clear():
     stats = cache.stats()
     assert stats["hits"] == 0
     assert stats["misses"] == 1
+
+
+def test_cache_lru_eviction_by_entries_and_bytes():
+    cache = TTLCache(ttl_seconds=10, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a 变为最近使用
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    sized = TTLCache(ttl_seconds=10, max_bytes=100, sizeof=lambda v: 40 if isinstance(v, list) else 0)
+    for key in "xyz":
+        sized.set(key, [0.0])
+    assert len(sized) == 2 and sized.get("x") is None
+    assert sized.stats()["bytes"] == 80
+
+
+def test_cache_per_key_ttl_and_sweep():
+    cache = TTLCache(ttl_seconds=10)
+    now = [100.0]
+    cache._clock = lambda: now[0]
+    cache.set("short", 1, ttl=1)
+    cache.set("long", 2)
+    now[0] += 2
+    assert cache.sweep() == 1
+    assert cache.get("long") == 2
+    stats = cache.stats()
+    assert stats["size"] == 1 and stats["expirations"] == 1
+
+
+def test_get_or_compute_coalesces_threads_and_does_not_cache_errors():
+    cache = TTLCache(ttl_seconds=10)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 5 and len(calls) == 1
+
+    def boom():
+        raise RuntimeError("upstream")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("bad", boom)
+    assert cache.get_or_compute("bad", lambda: "ok") == "ok"
+
+
+def test_aget_or_compute_shares_result_and_failure():
+    cache = TTLCache(ttl_seconds=10)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("upstream")
+        return "value"
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.aget_or_compute("k", compute) for _ in range(4)), return_exceptions=True)
+        second = await asyncio.gather(*(cache.aget_or_compute("k", compute) for _ in range(4)))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert all(isinstance(item, RuntimeError) for item in first)
+    assert second == ["value"] * 4
+    assert len(calls) == 2
+    assert cache.stats()["coalesced"] == 6
@@ -0,0 +1,87 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import app.services.embedding_engine as engine_module
+from app.services.embedding_engine import EmbeddingEngine, resolve_batch_size
+from app.utils.throttle import AdaptiveConcurrencyLimiter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FakeEmbeddings:
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, input):
+        with self._lock:
+            self.calls += 1
+            call_no = self.calls
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.01)
+            if call_no <= self.fail_first:
+                raise RateLimited("slow down")
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[float(text)]) for text in input])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_engine_preserves_order_with_parallel_batches():
+    fake = FakeEmbeddings()
+    engine = EmbeddingEngine(SimpleNamespace(embeddings=fake), "text-embedding-v4", max_concurrency=4)
+    texts = [str(i) for i in range(95)]
+
+    vectors = engine.embed(texts)
+
+    assert vectors == [[float(i)] for i in range(95)]
+    assert engine.batch_size == 10
+    assert engine.stats.batches == 10
+    assert 1 < fake.peak <= 4
+    engine.shutdown()
+
+
+def test_engine_retries_and_throttles_on_rate_limit(monkeypatch):
+    monkeypatch.setattr(engine_module, "_RETRY_BASE_DELAY", 0.05)
+    fake = FakeEmbeddings(fail_first=2)
+    engine = EmbeddingEngine(SimpleNamespace(embeddings=fake), "text-embedding-v4", max_concurrency=4)
+
+    vectors = engine.embed([str(i) for i in range(10)])
+
+    assert vectors == [[float(i)] for i in range(10)]
+    assert engine.stats.retries == 2
+    assert engine.stats.throttles == 2
+    # 三次请求各约 0.01s；两次退避共至少 0.15s，不计入耗时
+    assert 0.03 <= engine.stats.elapsed < 0.1
+    assert engine.limiter_stats()["limit"] < 4
+    engine.shutdown()
+
+
+def test_resolve_batch_size_caps_to_provider_limit():
+    assert resolve_batch_size("text-embedding-v2") == 25
+    assert resolve_batch_size("text-embedding-v4", 64) == 10
+    assert resolve_batch_size("unknown-model", 4) == 4
+
+
+def test_limiter_recovers_after_successful_window():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+    limiter.on_throttle()
+    assert limiter.limit == 2
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.limit == 3
+
+
+def test_limiter_halves_once_per_cooldown_window():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+    for _ in range(3):
+        limiter.on_throttle(cooldown=60)
+    assert limiter.limit == 4 and limiter.stats()["throttles"] == 3
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.services import embedding_utils
+from app.services.embedding_store import EmbeddingStore
+
+
+def test_get_or_embed_only_computes_missing(tmp_path):
+    store = EmbeddingStore(tmp_path / "emb.sqlite3")
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+    first = store.get_or_embed("m", ["ab", "abc", "ab"], embed)
+    assert first == [[2.0, 0.5], [3.0, 0.5], [2.0, 0.5]]
+    assert calls == [["ab", "abc"]]
+
+    second = store.get_or_embed("m", ["abc", "abcd"], embed)
+    assert second == [[3.0, 0.5], [4.0, 0.5]]
+    assert calls[-1] == ["abcd"]
+    store.close()
+
+
+def test_store_persists_across_instances_and_models(tmp_path):
+    path = tmp_path / "emb.sqlite3"
+    store = EmbeddingStore(path)
+    store.put("m1", "hello", [0.25, 0.75])
+    store.close()
+
+    reopened = EmbeddingStore(path)
+    assert reopened.get("m1", "hello") == [0.25, 0.75]
+    assert reopened.get("m2", "hello") is None
+    stats = reopened.stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    reopened.close()
+
+
+def test_async_embedding_reads_and_writes_store_off_the_event_loop(monkeypatch):
+    threads = []
+
+    class _Store:
+        def get(self, model, text):
+            threads.append(("get", threading.get_ident()))
+            return None
+
+        def put(self, model, text, embedding):
+            threads.append(("put", threading.get_ident()))
+
+    async def create(model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[0.1, 0.2])])
+
+    monkeypatch.setattr(embedding_utils, "get_embedding_store", lambda: _Store())
+    monkeypatch.setattr(
+        embedding_utils.registry,
+        "async_openai_client",
+        lambda: SimpleNamespace(embeddings=SimpleNamespace(create=create)),
+    )
+
+    async def run():
+        return threading.get_ident(), await embedding_utils.aget_embedding("只在本测试出现的文本 0b7f")
+
+    loop_thread, embedding = asyncio.run(run())
+    assert embedding == [0.1, 0.2]
+    assert [name for name, _ in threads] == ["get", "put"]
+    assert all(ident != loop_thread for _, ident in threads)
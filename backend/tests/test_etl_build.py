@@ -0,0 +1,127 @@
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT / "scripts") not in sys.path:
+    sys.path.insert(0, str(ROOT / "scripts"))
+
+import ETL  # noqa: E402
+from ETL import (  # noqa: E402
+    EXPECTED_COLUMNS,
+    build_documents,
+    content_fingerprint,
+    iter_document_batches,
+    load_clean_data,
+)
+
+
+def _write_csv(path: Path) -> None:
+    rows = [
+        ("字节跳动", "秋招", "后端开发", "上海、北京", "2025-06-30"),
+        ("腾讯", "秋招", "前端开发", "深圳市", "尽快投递"),
+        ("", "秋招", "缺公司名", "上海", ""),
+        ("字节跳动", "秋招", "后端开发", "上海", "2025-07-01"),
+        ("阿里巴巴", "", "算法工程师", "", "2025/8/1"),
+        ("字节跳动", "秋招", "后端开发", "杭州", ""),
+    ]
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPECTED_COLUMNS)
+        for i, (company, batch, title, location, deadline) in enumerate(rows):
+            writer.writerow([i + 1, company, batch, "民企", "互联网", "2026届", title, "进行中",
+                             location, "", deadline, "", "官网", ""])
+
+
+def test_chunked_build_matches_whole_table(tmp_path):
+    source = tmp_path / "jobs.csv"
+    _write_csv(source)
+
+    documents, metadatas, ids = build_documents(load_clean_data(str(source)))
+    assert len(ids) == 5  # 缺公司名的行被清洗掉
+    # 重复自然键按出现次序编号，块边界不影响
+    assert ids[0] != ids[2] and ids[2] == ids[0] + "_2" and ids[4] == ids[0] + "_3"
+    assert documents[1] == (
+        "\n        公司名称: 腾讯\n        企业性质: 民企\n        行业大类: 互联网\n        招聘对象: 2026届"
+        "\n        招聘岗位: 前端开发\n        网申状态: 进行中\n        投递方式: 官网\n        "
+    )
+    assert metadatas[3]["batch"] == "未知" and metadatas[3]["deadline_ts"] > 0
+    assert metadatas[0]["loc_上海"] and metadatas[0]["loc_北京"] and metadatas[1]["deadline_ts"] == 0
+
+    batches = list(iter_document_batches(str(source), chunk_rows=2))
+    assert [len(batch[2]) for batch in batches] == [2, 1, 2]
+    assert [job_id for batch in batches for job_id in batch[2]] == ids
+    assert [meta for batch in batches for meta in batch[1]] == metadatas
+
+
+def test_content_hashes_match_fingerprint_whatever_the_key_order(tmp_path):
+    source = tmp_path / "jobs.csv"
+    _write_csv(source)
+    documents, metadatas, _ = build_documents(load_clean_data(str(source)))
+    for document, metadata in zip(documents, metadatas):
+        expected = {key: value for key, value in metadata.items() if key != "content_hash"}
+        assert metadata["content_hash"] == content_fingerprint(document, expected)
+
+    # 额外的键排在 job_id 之前、loc_* 与 location 之间及之后，指纹仍与逐行 json.dumps 一致
+    rows = [
+        {"job_id": "job_1", "loc_上海": True, "a_flag": 1, "deadline_ts": 0, "zz": None},
+        {"job_id": "job_2", "loc_北京": True, "loc_杭州": True, "loc_zz": True, "ab": "x\n\"y\""},
+    ]
+    hashes = ETL._content_hashes(["正文一", "正文二"], rows)
+    for document, metadata, content_hash in zip(["正文一", "正文二"], rows, hashes):
+        payload = json.dumps({"content": document, "metadata": metadata}, ensure_ascii=False, sort_keys=True, default=str)
+        assert content_hash == hashlib.sha256(payload.encode("utf-8")).hexdigest() == content_fingerprint(document, metadata)
+
+
+class _Collection:
+    def __init__(self, chunks):
+        self.chunks = dict(chunks)
+        self.deleted = []
+
+    def get(self, include, limit, offset):
+        ids = list(self.chunks)[offset : offset + limit]
+        return {"ids": ids, "metadatas": [self.chunks[i] for i in ids]}
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+
+class _Store:
+    def __init__(self, collection, fail=False):
+        self._collection = collection
+        self.fail = fail
+        self.embeddings = None
+
+    def add_texts(self, texts, metadatas, ids):
+        if self.fail:
+            raise RuntimeError("embedding failed")
+        self._collection.chunks.update(zip(ids, metadatas))
+
+
+@pytest.mark.parametrize("fail", [True, False])
+def test_incremental_writes_before_deleting(monkeypatch, fail):
+    collection = _Collection({
+        "job_a-0": {"job_id": "job_a", "content_hash": "old"},
+        "job_a-1": {"job_id": "job_a", "content_hash": "old"},
+        "job_b-0": {"job_id": "job_b", "content_hash": "gone"},
+    })
+    monkeypatch.setattr(ETL, "get_vector_store", lambda: _Store(collection, fail=fail))
+    monkeypatch.setattr(ETL, "write_keyword_index", lambda *args, **kwargs: None)
+    metadatas = [{"job_id": "job_a", "content_hash": "new"}]
+
+    if fail:
+        # 向量化失败时不删除任何旧分块，线上集合保持原样
+        with pytest.raises(RuntimeError):
+            ETL.run_incremental([(["短文本"], metadatas, ["job_a"])])
+        assert collection.deleted == [] and set(collection.chunks) == {"job_a-0", "job_a-1", "job_b-0"}
+    else:
+        ETL.run_incremental([(["短文本"], metadatas, ["job_a"])])
+        # 变更岗位只剩一个分块：多出的旧分块与下线岗位的分块在写入后删除
+        assert sorted(collection.deleted) == ["job_a-1", "job_b-0"]
+        assert set(collection.chunks) == {"job_a-0"} and collection.chunks["job_a-0"]["content_hash"] == "new"
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT / "scripts") not in sys.path:
+    sys.path.insert(0, str(ROOT / "scripts"))
+
+from etl_pipeline import Checkpoint, EtlPipeline  # noqa: E402
+
+
+def _batches(count):
+    for seq in range(count):
+        ids = [f"job_{seq}_{i}-0" for i in range(3)]
+        yield seq, [f"doc {chunk_id}" for chunk_id in ids], [{"job_id": chunk_id} for chunk_id in ids], ids
+
+
+def test_pipeline_resumes_from_checkpoint_after_failure(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    written: dict[str, list[float]] = {}
+    embedded: list[int] = []
+
+    def write(ids, documents, metadatas, embeddings):
+        written.update(zip(ids, embeddings))
+
+    def flaky_embed(texts):
+        if "doc job_3_0-0" in texts:
+            raise RuntimeError("network down")
+        embedded.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+    pipeline = EtlPipeline(flaky_embed, write, Checkpoint.load(path, "v1"), queue_size=1, embed_workers=1, progress_interval=0)
+    with pytest.raises(RuntimeError):
+        pipeline.run(_batches(6))
+    # 出错时仍在队列中的批次会被丢弃，检查点只记录已写入的批次
+    done = Checkpoint.load(path, "v1").completed
+    assert done <= {0, 1, 2} and len(written) == 3 * len(done)
+
+    embedded.clear()
+    resumed = EtlPipeline(
+        lambda texts: embedded.append(len(texts)) or [[1.0]] * len(texts),
+        write,
+        Checkpoint.load(path, "v1"),
+        embed_workers=2,
+        progress_interval=0,
+    )
+    remaining = 18 - 3 * len(done)
+    assert resumed.run(_batches(6)) == remaining
+    assert sum(embedded) == remaining and resumed.skipped == 3 * len(done) and len(written) == 18
+    summary = resumed.summary()
+    assert summary["stages"]["read"]["records"] == 18 and summary["stages"]["write"]["batches"] == 6 - len(done)
+    assert summary["queues"]["embed"]["peak"] <= 4
+
+    # 数据源指纹变化后旧检查点作废
+    assert Checkpoint.load(path, "v2").completed == set()
+
+
+def test_empty_fingerprint_never_resumes(tmp_path):
+    # --restart 不传指纹：中断后留下的检查点不能被下一次 --restart 沿用
+    path = tmp_path / "checkpoint.json"
+    Checkpoint(path, "").mark(0, 3)
+    assert path.exists()
+    restarted = Checkpoint.load(path, "")
+    assert restarted.completed == set() and restarted.records == 0
@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.services.ivf_index import IvfIndex, build_ivf, train_centroids
+from app.services.job_index import JobVectorIndex
+
+
+class _Collection:
+    """只实现构建用到的 count / get 分页接口。"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.ids = [f"job_{i}-0" for i in range(len(vectors))]
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include, limit, offset):
+        return {"ids": self.ids[offset : offset + limit], "embeddings": self.vectors[offset : offset + limit]}
+
+
+def _clustered(count, dim, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_ivf_search_recall_and_exhaustive_probe(tmp_path):
+    vectors = _clustered(4000, 32, clusters=40)
+    collection = _Collection(vectors)
+    stats = build_ivf(collection, tmp_path, n_lists=32, train_sample=2000, iterations=10)
+    assert stats["chunks"] == 4000 and stats["lists"] == 32
+
+    exact = JobVectorIndex(collection.ids, [""] * 4000, [{}] * 4000, vectors)
+    queries = vectors[:50] + 0.05 * np.random.default_rng(1).standard_normal((50, 32)).astype(np.float32)
+    expected, expected_scores = exact.search_many(queries, k=10)
+
+    index = JobVectorIndex(collection.ids, [""] * 4000, [{}] * 4000, vectors)
+    index.ann = IvfIndex.load(tmp_path, nprobe=4)
+    assert index.ann.matches(index.ids) and not index.ann.matches(index.ids[::-1])
+    rows, scores = index.search_many(queries, k=10)
+    assert np.mean([len(set(a) & set(b)) / 10 for a, b in zip(rows, expected)]) >= 0.9
+    assert np.allclose(scores[:, 0], expected_scores[:, 0], atol=1e-5)
+
+    # 扫描全部簇时与精确检索一致
+    index.ann = IvfIndex.load(tmp_path, nprobe=32)
+    rows, scores = index.search_many(queries, k=10)
+    assert (rows == expected).all() and np.allclose(scores, expected_scores, atol=1e-5)
+
+    # 过滤后候选稀少：自动扩大扫描范围，仍返回 k 条且都满足过滤
+    index.ann = IvfIndex.load(tmp_path, nprobe=1)
+    mask = np.zeros(4000, dtype=bool)
+    mask[::20] = True
+    rows, _ = index.search_many(queries, k=20, mask=mask)
+    assert rows.shape == (50, 20) and mask[rows].all()
+
+
+def test_train_centroids_covers_clusters_without_empty_lists():
+    vectors = _clustered(1200, 16, clusters=6, seed=3)
+    centroids = train_centroids(vectors, 24, iterations=30)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+    labels = (vectors @ centroids.T).argmax(axis=1)
+    assert np.bincount(labels, minlength=24).min() > 0
+    # 每个样本与所属质心足够接近
+    assert (vectors @ centroids.T).max(axis=1).mean() > 0.9
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.api import filters as api_filters
+from app.services.job_filters import JobFilter, MetadataMasks, filter_metadata, parse_deadline, split_locations
+from app.services.job_index import JobVectorIndex
+from app.services.registry import registry
+
+
+def _metas():
+    raw = [("上海市", "2025-05-01", "金融"), ("北京、上海", "2025年7月1日", "互联网"), ("深圳", "尽快投递", "金融")]
+    return [
+        {"job_id": f"job_{i}", "location": location, "deadline": deadline, "industry": industry,
+         **filter_metadata(location, deadline)}
+        for i, (location, deadline, industry) in enumerate(raw)
+    ]
+
+
+def test_normalization_and_where_clause():
+    assert split_locations("深圳、上海市, 未知") == ["深圳", "上海"]
+    assert parse_deadline("2025/7/1 23:59") == parse_deadline("2025年7月1日") > 0
+    assert parse_deadline("尽快投递") == 0 and filter_metadata("上海市", "未知") == {"deadline_ts": 0, "loc_上海": True}
+
+    where = JobFilter(locations=["上海,深圳"], industries=["金融"]).to_where()
+    assert where == {"$and": [{"$or": [{"loc_上海": True}, {"loc_深圳": True}]}, {"industry": {"$in": ["金融"]}}]}
+    assert JobFilter().to_where() is None and JobFilter().is_empty
+
+
+def test_masks_agree_with_row_matching_and_push_into_index():
+    metas = _metas()
+    masks = MetadataMasks(metas)
+    filters = [
+        JobFilter(locations=["上海"]),
+        JobFilter(industries=["金融"], deadline_to=parse_deadline("2025-12-31")),
+        JobFilter(deadline_from=parse_deadline("2025-06-01")),
+    ]
+    for job_filter in filters:
+        assert list(masks.mask(job_filter)) == [job_filter.matches(meta) for meta in metas]
+
+    index = JobVectorIndex(["a", "b", "c"], ["", "", ""], metas, np.eye(3, dtype=np.float32))
+    result = index.query(query_embeddings=[[0.0, 0.0, 1.0]], n_results=3, job_filter=filters[0])
+    assert result["ids"][0] and set(result["ids"][0]) == {"a", "b"}
+
+
+class _Collection:
+    def __init__(self, meta):
+        self.meta = meta
+        self.gets = 0
+
+    def get(self, limit, include):
+        self.gets += 1
+        return {"metadatas": [self.meta]}
+
+
+def test_filtered_queries_refuse_collections_without_normalized_fields(monkeypatch):
+    monkeypatch.setattr(api_filters, "knowledge_base_version", lambda: "old")
+    registry.discard(api_filters._FIELDS_CHECK_KEY)
+    legacy = _Collection({"job_id": "job_a", "location": "上海"})
+
+    api_filters.require_filter_fields(legacy, JobFilter(industries=["互联网"]))  # 不依赖新字段
+    with pytest.raises(RuntimeError, match="重新运行 scripts/ETL.py"):
+        api_filters.require_filter_fields(legacy, JobFilter(locations=["上海"]))
+    with pytest.raises(RuntimeError):
+        api_filters.require_filter_fields(legacy, JobFilter(deadline_to=1))
+    assert legacy.gets == 1  # 同一知识库版本只抽查一次
+
+    monkeypatch.setattr(api_filters, "knowledge_base_version", lambda: "rebuilt")
+    api_filters.require_filter_fields(_Collection({"job_id": "job_a", "deadline_ts": 0}), JobFilter(locations=["上海"]))
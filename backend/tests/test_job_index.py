@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.services.job_index import JobVectorIndex, pool_chunk_scores
+
+
+def _index(space="l2"):
+    vectors = np.array([[1.0, 0.0], [0.0, 2.0], [1.0, 1.0], [-1.0, 0.0]], dtype=np.float32)
+    ids = [f"job_{i}-0" for i in range(len(vectors))]
+    metas = [{"job_id": f"job_{i}"} for i in range(len(vectors))]
+    return JobVectorIndex(ids, [f"doc{i}" for i in range(len(vectors))], metas, vectors, space=space)
+
+
+def test_query_matches_exact_cosine_ranking():
+    result = _index().query(query_embeddings=[[2.0, 0.1]], n_results=3)
+
+    assert result["ids"][0] == ["job_0-0", "job_2-0", "job_1-0"]
+    assert result["metadatas"][0][0] == {"job_id": "job_0"}
+    # 平方 L2 口径：2 - 2cos，与 Chroma 默认 l2 集合返回的距离一致
+    cos = 2.0 / np.linalg.norm([2.0, 0.1])
+    assert np.isclose(result["distances"][0][0], 2 - 2 * cos, atol=1e-5)
+
+
+def test_search_many_handles_k_larger_than_corpus_and_cosine_space():
+    index = _index(space="cosine")
+    rows, scores = index.search_many([[0.0, 1.0], [-1.0, 0.0]], k=10)
+
+    assert rows.shape == (2, 4)
+    assert rows[0][0] == 1 and rows[1][0] == 3
+    assert np.all(np.diff(scores, axis=1) <= 1e-6)
+    distances = index.query(query_embeddings=[[0.0, 1.0]], n_results=1)["distances"][0]
+    assert np.isclose(distances[0], 0.0, atol=1e-6)
+
+
+def test_pool_chunk_scores_max_and_softmax():
+    keys = ["job_b", "job_a", "job_b", "job_c", "job_a"]
+    scores = [0.9, 0.8, 0.7, 0.6, 0.85]
+
+    jobs, pooled, best = pool_chunk_scores(keys, scores)
+    assert jobs == ["job_a", "job_b", "job_c"]
+    assert np.allclose(pooled, [0.85, 0.9, 0.6]) and list(best) == [4, 0, 3]
+
+    _, soft, _ = pool_chunk_scores(keys, scores, pool="softmax", temperature=0.1)
+    # 加权平均介于岗位内平均分与最高分之间，单分块岗位不变
+    assert 0.825 < soft[0] < 0.85 and 0.8 < soft[1] < 0.9 and np.isclose(soft[2], 0.6)
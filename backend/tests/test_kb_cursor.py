@@ -0,0 +1,16 @@
+import importlib
+
+import pytest
+from fastapi import HTTPException
+
+routes_kb = importlib.import_module("app.api.routes_kb")
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = routes_kb._encode_cursor(1500, "8b0029f48347")
+    assert "=" not in cursor
+    assert routes_kb._decode_cursor(cursor) == (1500, "8b0029f48347")
+
+    with pytest.raises(HTTPException) as excinfo:
+        routes_kb._decode_cursor("not-a-cursor")
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,34 @@
+from app.services.keyword_index import KeywordIndex, KeywordIndexBuilder, tokenize
+
+
+def test_tokenize_mixes_cjk_ngrams_and_words():
+    assert tokenize("后端开发 Python3, C++") == ["后", "端", "开", "发", "后端", "端开", "开发", "python3", "c++"]
+
+
+def test_bm25_ranking_and_round_trip(tmp_path):
+    index = KeywordIndex.build(
+        ["job_a", "job_b", "job_c"],
+        ["招聘岗位: 后端工程师 Python", "招聘岗位: 前端工程师 Vue", "招聘岗位: 数据分析师 SQL"],
+        [{"company": "甲公司", "location": "上海"}, {"company": "乙公司", "location": "北京"}, {"company": "丙", "location": "上海"}],
+    )
+    assert [index.ids[row] for row, _ in index.search("后端 上海", 3)] == ["job_a", "job_c", "job_b"]
+    assert index.search("不存在的词", 3) == [] and index.search("python", 0) == []
+
+    index.save(tmp_path / "kw.json")
+    loaded = KeywordIndex.load(tmp_path / "kw.json")
+    assert loaded.search("乙公司 vue", 2) == index.search("乙公司 vue", 2)
+    assert loaded.metadatas[1]["company"] == "乙公司"
+
+
+def test_builder_streams_same_file_as_build(tmp_path):
+    ids = ["job_a", "job_b", "job_c"]
+    documents = ["招聘岗位: 后端工程师 Python\n换行", "招聘岗位: 前端 \"Vue\"", "招聘岗位: 数据分析师 SQL"]
+    metadatas = [{"company": "甲公司", "deadline_ts": 0}, {"company": "乙公司", "loc_北京": True}, {"company": "丙"}]
+    KeywordIndex.build(ids, documents, metadatas).save(tmp_path / "build.json")
+
+    with KeywordIndexBuilder() as builder:
+        builder.add(ids[:2], documents[:2], metadatas[:2])
+        builder.add(ids[2:], documents[2:], metadatas[2:])
+        stats = builder.save(tmp_path / "stream.json")
+    assert stats == {"jobs": 3, "terms": KeywordIndex.load(tmp_path / "build.json").stats()["terms"]}
+    assert (tmp_path / "stream.json").read_bytes() == (tmp_path / "build.json").read_bytes()
@@ -0,0 +1,68 @@
+import asyncio
+import importlib
+
+# app.api 包内同名属性是路由对象，这里取模块本身
+routes_match = importlib.import_module("app.api.routes_match")
+
+
+def test_summary_key_ignores_scores_and_snippets_but_tracks_jobs(monkeypatch):
+    monkeypatch.setattr(routes_match, "knowledge_base_version", lambda: "kb1")
+    first = [{"job_id": "a", "score": 0.81234, "snippet": "x"}, {"job_id": "b", "score": 0.7}]
+    jittered = [{"job_id": "a", "score": 0.8124, "snippet": "x y"}, {"job_id": "b", "score": 0.69}]
+    key = routes_match._summary_cache_key("Python SQL", first)
+
+    assert routes_match._summary_cache_key("Python SQL", jittered) == key
+    assert routes_match._summary_cache_key("Python SQL", first[::-1]) != key
+    assert routes_match._summary_cache_key("Python Go", first) != key
+
+    monkeypatch.setattr(routes_match, "knowledge_base_version", lambda: "kb2")
+    assert routes_match._summary_cache_key("Python SQL", first) != key
+
+
+def test_stream_text_events_ends_with_error_on_upstream_failure():
+    async def _tokens():
+        yield "部分"
+        raise TimeoutError("upstream timeout")
+
+    async def _done(text):
+        return {"text": text}
+
+    async def _collect():
+        return [event async for event in routes_match._stream_text_events(_tokens(), _done)]
+
+    events = asyncio.run(_collect())
+    assert events[0].startswith(b"event: token") and events[-1].startswith(b"event: error")
+    assert "upstream timeout" in events[-1].decode("utf-8")
+
+
+def test_stream_endpoints_report_validation_errors_as_events(monkeypatch):
+    async def _missing_skills(resume_file):
+        raise routes_match.HTTPException(status_code=400, detail="简历缺少技能")
+
+    async def _missing_job(resume_file, job_id):
+        raise routes_match.HTTPException(status_code=404, detail="岗位未找到")
+
+    monkeypatch.setattr(routes_match, "_embed_resume", _missing_skills)
+    monkeypatch.setattr(routes_match, "_prepare_single_match", _missing_job)
+
+    async def _collect(response):
+        return [event async for event in response.body_iterator]
+
+    auto = asyncio.run(routes_match.auto_match_jobs_stream(resume_file="r.json", top_k=5, job_filter=None))
+    single = asyncio.run(routes_match.match_single_job_stream(resume_file="r.json", job_id="job_x"))
+    assert asyncio.run(_collect(auto)) == [routes_match._sse_event("error", {"detail": "简历缺少技能"})]
+    assert asyncio.run(_collect(single)) == [routes_match._sse_event("error", {"detail": "岗位未找到"})]
+
+
+def test_chunks_per_job_estimate_is_keyed_and_reset_on_kb_change(monkeypatch):
+    monkeypatch.setattr(routes_match, "knowledge_base_version", lambda: "kb1")
+    routes_match.registry.discard(routes_match._ESTIMATE_KEY)
+    estimate = routes_match._chunks_per_job_estimate()
+    initial = estimate.get(("", 5))
+
+    estimate.update(("", 5), chunks=400, jobs=10)
+    assert estimate.get(("", 5)) > initial and estimate.get(("", 10)) == initial
+    assert routes_match._chunks_per_job_estimate() is estimate
+
+    monkeypatch.setattr(routes_match, "knowledge_base_version", lambda: "kb2")
+    assert routes_match._chunks_per_job_estimate().get(("", 5)) == initial
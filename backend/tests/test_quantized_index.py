@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.services.job_index import JobVectorIndex
+from app.services.quantized_index import QuantizedJobIndex, export_vectors, quantize_rows
+
+
+class _Collection:
+    """只实现导出用到的 count / get 分页接口。"""
+
+    metadata = {"hnsw:space": "l2"}
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.ids = [f"job_{i // 2}-{i % 2}" for i in range(len(vectors))]
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include, limit, offset):
+        rows = range(offset, min(offset + limit, len(self.ids)))
+        return {
+            "ids": [self.ids[i] for i in rows],
+            "documents": [f"doc{i}" for i in rows],
+            "metadatas": [{"job_id": self.ids[i].split("-")[0]} for i in rows],
+            "embeddings": self.vectors[offset : offset + limit],
+        }
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_quantized_index_matches_float32_ranking(tmp_path, dtype):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 64)).astype(np.float32)
+    collection = _Collection(vectors)
+    stats = export_vectors(collection, tmp_path, dtype=dtype, keep_float32=True)
+    assert stats["chunks"] == 300 and stats["bytes"]["codes.npy"] < 300 * 64 * 4 // 1.9
+
+    exact = JobVectorIndex(collection.ids, [""] * 300, [{}] * 300, vectors)
+    queries = vectors[:20] + 0.3 * rng.standard_normal((20, 64)).astype(np.float32)
+    expected, expected_scores = exact.search_many(queries, k=5)
+
+    approx = QuantizedJobIndex.load(tmp_path, rescore=0)
+    assert isinstance(approx.codes, np.memmap) and not approx.codes.flags.writeable
+    rows, scores = approx.search_many(queries, k=5)
+    assert np.mean([len(set(a) & set(b)) / 5 for a, b in zip(rows, expected)]) >= 0.9
+    assert np.allclose(scores, expected_scores, atol=0.02)
+
+    # float32 精排后与精确检索一致，过滤掩码返回全局行号
+    rescored = QuantizedJobIndex.load(tmp_path, rescore=4)
+    rows, scores = rescored.search_many(queries, k=5)
+    assert (rows == expected).all() and np.allclose(scores, expected_scores, atol=1e-5)
+    mask = np.zeros(300, dtype=bool)
+    mask[::3] = True
+    assert set(rescored.search_many(queries, k=5, mask=mask)[0].ravel()) <= set(np.flatnonzero(mask))
+
+    job = rescored.get_job("job_7")
+    assert job["ids"] == ["job_7-0", "job_7-1"]
+    assert np.allclose(np.linalg.norm(job["embeddings"], axis=1), 1.0, atol=1e-5)
+
+
+def test_int8_quantization_error_is_bounded():
+    rows = np.random.default_rng(1).standard_normal((50, 128)).astype(np.float32)
+    rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+    codes, scales = quantize_rows(rows, "int8")
+    assert codes.dtype == np.int8 and scales.shape == (50,)
+    restored = codes.astype(np.float32) * scales[:, None]
+    assert np.abs(restored - rows).max() <= scales.max() / 2 + 1e-7
@@ -0,0 +1,24 @@
+import os
+import time
+
+from app.services.report_generator import ReportRenderer
+
+
+def test_reports_are_content_addressed_and_reloaded(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    template = templates / "t.html"
+    template.write_text("<p>{{ resume_name }} {{ score_percent }}</p>", encoding="utf-8")
+    renderer = ReportRenderer(templates, tmp_path / "out", "t.html", auto_reload=True)
+
+    data = {"resume_name": "张 三/", "job_title": "后端", "similarity_score": 0.5}
+    first = renderer.generate(data)
+    assert renderer.generate(dict(data)) == first
+    assert renderer.generate({**data, "similarity_score": 0.6}) != first
+    assert "/" not in os.path.basename(first) and open(first, encoding="utf-8").read() == "<p>张 三/ 50</p>"
+
+    time.sleep(0.01)
+    template.write_text("<div>{{ resume_name }}</div>", encoding="utf-8")
+    os.utime(template, (time.time() + 5, time.time() + 5))
+    assert renderer.generate(data) != first
+    assert renderer.stats()["rendered"] == 3 and renderer.stats()["reused"] == 1
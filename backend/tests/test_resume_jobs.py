@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.services import resume_jobs
+from app.services.resume_jobs import ResumeJobQueue, ResumeQueueFull
+
+
+def test_jobs_move_through_stages(tmp_path, monkeypatch):
+    async def fake_process(upload_path, json_path, on_stage=None, **kwargs):
+        for stage in ("parse", "extract", "save"):
+            on_stage(stage)
+            await asyncio.sleep(0)
+        if upload_path.name == "bad.pdf":
+            raise RuntimeError("解析文件失败")
+        return {"skills": ["Python"]}
+
+    monkeypatch.setattr(resume_jobs, "process_resume_file", fake_process)
+
+    async def scenario():
+        queue = ResumeJobQueue(workers=2, max_pending=2)
+        ok = queue.submit("a.txt", tmp_path / "a.txt", tmp_path / "a.json")
+        bad = queue.submit("bad.pdf", tmp_path / "bad.pdf", tmp_path / "bad.json")
+        assert ok.as_dict()["status"] == "queued"
+        with pytest.raises(ResumeQueueFull):
+            queue.submit("c.txt", tmp_path / "c.txt", tmp_path / "c.json")
+
+        await queue._queue.join()
+        await queue.aclose()
+        return queue, ok, bad
+
+    queue, ok, bad = asyncio.run(scenario())
+    assert ok.as_dict()["result"]["resume_data"] == {"skills": ["Python"]}
+    assert ok.as_dict()["progress"] == 100
+    assert bad.status == "failed" and "解析文件失败" in bad.error
+    assert queue.stats()["completed"] == 1 and queue.stats()["failed"] == 1
+
+
+def test_store_failures_are_not_reported_as_parse_errors(tmp_path, monkeypatch):
+    class _BrokenStore:
+        def put(self, digest, **fields):
+            raise OSError("disk full")
+
+    async def fake_parse(file_path):
+        return "简历文本"
+
+    monkeypatch.setattr(resume_jobs, "get_resume_store", lambda: _BrokenStore())
+    monkeypatch.setattr(resume_jobs, "_parse_in_executor", fake_parse)
+    upload = tmp_path / "a.txt"
+    upload.write_text("x", encoding="utf-8")
+
+    with pytest.raises(OSError, match="disk full"):
+        asyncio.run(resume_jobs.process_resume_file(upload, tmp_path / "a.json", digest="d1"))
+    assert not upload.exists()
+
+    async def broken_parse(file_path):
+        raise ValueError("不支持的格式")
+
+    monkeypatch.setattr(resume_jobs, "_parse_in_executor", broken_parse)
+    with pytest.raises(resume_jobs.ResumeParseError):
+        asyncio.run(resume_jobs.process_resume_file(upload, tmp_path / "a.json", digest="d1"))
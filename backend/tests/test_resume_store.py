@@ -0,0 +1,21 @@
+import io
+
+from app.services.resume_store import ResumeStore, copy_and_hash
+
+
+def test_lookup_reuses_text_and_extraction_per_model(tmp_path):
+    digest = copy_and_hash(io.BytesIO(b"resume bytes"), tmp_path / "upload.txt")
+    assert (tmp_path / "upload.txt").read_bytes() == b"resume bytes"
+
+    store = ResumeStore(tmp_path / "store")
+    assert store.lookup(digest, model="m1") == (None, None)
+
+    store.put(digest, text="李四 Python")
+    assert store.lookup(digest, model="m1") == ("李四 Python", None)
+
+    store.put(digest, resume_data={"skills": ["Python"]}, model="m1")
+    assert store.lookup(digest, model="m1") == ("李四 Python", {"skills": ["Python"]})
+    assert store.lookup(digest, model="m2") == ("李四 Python", None)
+
+    stats = store.stats()
+    assert (stats["hits"], stats["text_hits"], stats["misses"], stats["entries"]) == (1, 2, 1, 1)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.services.semantic_cache import SemanticCache
+
+
+def test_semantic_lookup_hits_near_hits_and_ring_eviction():
+    cache = SemanticCache(threshold=0.95, near_margin=0.1, max_entries_per_key=2)
+    base = np.array([1.0, 0.0, 0.0])
+    cache.add("job_a", base, "analysis-a")
+
+    value, similarity = cache.lookup("job_a", [0.99, 0.05, 0.0])
+    assert value == "analysis-a" and similarity > 0.95
+    assert cache.lookup("job_a", [0.9, 0.4, 0.0]) is None  # cos≈0.91：接近命中
+    assert cache.lookup("job_a", [0.0, 1.0, 0.0]) is None
+    assert cache.lookup("job_b", base) is None
+
+    cache.add("job_a", [0.0, 1.0, 0.0], "analysis-y")
+    cache.add("job_a", [0.0, 0.0, 1.0], "analysis-z")  # 覆盖最旧的 base
+    assert cache.lookup("job_a", base) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"], stats["entries"]) == (1, 1, 4, 2)
+
+
+def test_bucket_grows_lazily_up_to_capacity():
+    cache = SemanticCache(threshold=0.99, max_entries_per_key=20)
+    vectors = np.eye(32, dtype=np.float32)
+    cache.add("job_a", vectors[0], "v0")
+    assert cache._buckets["job_a"].matrix.shape == (8, 32)
+
+    for i in range(1, 25):
+        cache.add("job_a", vectors[i], f"v{i}")
+    bucket = cache._buckets["job_a"]
+    assert bucket.matrix.shape == (20, 32) and bucket.size == 20
+    # 满后覆盖最旧的条目，其余结果仍可命中
+    assert cache.lookup("job_a", vectors[4]) is None
+    assert cache.lookup("job_a", vectors[5])[0] == "v5" and cache.lookup("job_a", vectors[24])[0] == "v24"
@@ -0,0 +1,28 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services.resume_loader import load_resume_embedding, save_resume_embedding
+from app.services.similarity import cosine_scores, cosine_similarity, normalize_rows
+
+
+def test_batched_cosine_scores_match_pairwise_definition():
+    rng = np.random.default_rng(0)
+    query, matrix = rng.normal(size=16), rng.normal(size=(5, 16))
+    expected = [q @ row / (np.linalg.norm(query) * np.linalg.norm(row)) for q, row in zip([query] * 5, matrix)]
+
+    assert np.allclose(cosine_scores(query, matrix), expected, atol=1e-5)
+    assert np.allclose(cosine_scores(query, normalize_rows(matrix), normalized=True), expected, atol=1e-5)
+    assert np.isclose(cosine_similarity(query, matrix[0]), expected[0], atol=1e-5)
+    assert cosine_scores(query, np.zeros((0, 16))).shape == (0,)
+    assert cosine_scores([0.0] * 16, matrix).tolist() == [0.0] * 5
+
+
+def test_resume_embedding_sidecar_tracks_text_and_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "uploads_directory", tmp_path)
+    save_resume_embedding("resume_张三.json", "Python SQL", [0.1, 0.2])
+
+    assert (tmp_path / "resume_张三.embedding.json").exists()
+    assert load_resume_embedding("resume_张三.json", "Python SQL") == [0.1, 0.2]
+    assert load_resume_embedding("resume_张三.json", "Python SQL Rust") is None
+    monkeypatch.setattr(settings, "dashscope_embedding_model", "other-model")
+    assert load_resume_embedding("resume_张三.json", "Python SQL") is None
@@ -0,0 +1,16 @@
+import io
+import zipfile
+
+from app.utils.zipstream import ZipStreamWriter
+
+
+def test_entries_are_emitted_incrementally_and_form_a_valid_archive():
+    writer = ZipStreamWriter()
+    chunks = [writer.add("a.html", "<p>甲</p>" * 100), writer.add("b.html", b"binary")]
+    assert all(chunks)
+    chunks.append(writer.close())
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["a.html", "b.html"]
+        assert archive.read("a.html").decode("utf-8") == "<p>甲</p>" * 100
+        assert archive.testzip() is None